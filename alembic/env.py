@@ -7,7 +7,7 @@ from sqlalchemy import Connection, pool
 from alembic import context
 
 from src.db.base import Base
-from src.tasks.infrastructure.db.orm import TaskDB
+from src.tasks.infrastructure.db.orm import TaskCallbackDB, TaskDB, TaskSubmissionDB, WebhookDeliveryDB
 from src.core.config import settings
 
 # this is the Alembic Config object, which provides
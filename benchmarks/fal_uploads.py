@@ -0,0 +1,55 @@
+"""Submission latency of a 4-image elements request against a fal stub with fixed latency.
+
+Compares uploading the images one by one with FalKlingAdapter.upload_images.
+
+    python -m benchmarks.fal_uploads [--latency 0.2] [--images 4] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+
+from src.core.config import settings
+from src.integrations.infrastructure.external_api.fal.adapter import FalKlingAdapter
+from src.integrations.infrastructure.external_api.fal.mocked_client import MockedFalHttpClient
+from src.tasks.domain.dtos import TaskCreateFromMultiImageDTO
+
+
+class SerialFalKlingAdapter(FalKlingAdapter):
+    async def upload_images(self, images):
+        return [await self.upload_image(image) for image in images]
+
+
+async def measure(adapter: FalKlingAdapter, images: int, runs: int) -> list[float]:
+    task_data = TaskCreateFromMultiImageDTO(
+        app_id="benchmark", user_id="benchmark", image_list=[], prompt="benchmark", external_task_id="1"
+    )
+    timings = []
+    for _ in range(runs):
+        files = [io.BytesIO(b"\xff" * 512 * 1024) for _ in range(images)]
+        started = time.perf_counter()
+        await adapter.create_task_multiimage2video(task_data, files)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def main(latency: float, images: int, runs: int) -> None:
+    MockedFalHttpClient.latency = latency
+    for name, adapter_class in (("serial", SerialFalKlingAdapter), ("concurrent", FalKlingAdapter)):
+        timings = await measure(adapter_class(MockedFalHttpClient), images, runs)
+        print(
+            f"{name:>10}: median {statistics.median(timings) * 1000:7.1f} ms, "
+            f"max {max(timings) * 1000:7.1f} ms"
+        )
+    print(f"FAL_UPLOAD_CONCURRENCY={settings.FAL_UPLOAD_CONCURRENCY}, latency {latency * 1000:.0f} ms per request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per stubbed fal request")
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.images, args.runs))
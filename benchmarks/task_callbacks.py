@@ -0,0 +1,131 @@
+"""Database work per provider callback, from claiming it to the task update and client webhook.
+
+Queues callbacks for fresh submitted tasks, drains them with concurrent
+handle_task_callback workers against a stub source and a temporary local store, and
+counts what reached the database: pool checkouts, transactions and round trips (BEGIN,
+statements, COMMIT, ROLLBACK and pool resets). Needs the configured database with
+migrations applied.
+
+    python -m benchmarks.task_callbacks [--callbacks 200] [--workers 4] [--write-behind commit|buffer]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from sqlalchemy import delete, event
+
+from src.db.engine import engine
+from src.integrations.infrastructure.external_api.mocked_source import MockedTaskSourceClient
+from src.localstorage.infrastructure.repository import AsyncLocalStorageRepository, LocalStorageRepository
+from src.core.config import settings
+from src.tasks.application.use_cases.task_callback import enqueue_task_callback, handle_task_callback
+from src.tasks.application.use_cases.task_store import TaskResultBuffer
+from src.tasks.domain.entities import TaskCreate, TaskSource, TaskStatus, TaskUpdate
+from src.tasks.infrastructure.db.orm import TaskDB
+from src.tasks.infrastructure.db.unit_of_work import PGTaskUnitOfWork
+
+
+def _sends_rollback(dbapi_connection) -> bool:
+    # The asyncpg adapter only talks to the server if a transaction was started
+    return getattr(dbapi_connection, "_started", True)
+
+
+def count_database_work(counts: Counter) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "begin")
+    def on_begin(connection):
+        counts["transactions"] += 1
+        counts["round trips"] += 1
+
+    @event.listens_for(sync_engine, "commit")
+    def on_commit(connection):
+        counts["round trips"] += 1
+
+    @event.listens_for(sync_engine, "rollback")
+    def on_rollback(connection):
+        if _sends_rollback(connection.connection.dbapi_connection):
+            counts["rollbacks"] += 1
+            counts["round trips"] += 1
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def on_execute(connection, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+        counts["round trips"] += 1
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counts["checkouts"] += 1
+
+    @event.listens_for(sync_engine.pool, "reset")
+    def on_reset(dbapi_connection, connection_record, reset_state):
+        if not reset_state.transaction_was_reset and _sends_rollback(dbapi_connection):
+            counts["rollbacks"] += 1
+            counts["round trips"] += 1
+
+
+async def main(callbacks: int, workers: int, write_behind: str | None) -> None:
+    with tempfile.TemporaryDirectory() as path:
+        class BenchmarkStorageRepository(LocalStorageRepository):
+            storage_path = Path(path)
+
+        storage = AsyncLocalStorageRepository(BenchmarkStorageRepository(), io_mode="sync")
+        clients = {
+            source: MockedTaskSourceClient(source, result=b"\x00" * 1024) for source in TaskSource
+        }
+
+        task_ids = []
+        for _ in range(callbacks):
+            uow = PGTaskUnitOfWork()
+            async with uow:
+                task = await uow.tasks.create(TaskCreate(user_id="benchmark", app_id="benchmark"))
+                await uow.tasks.update(task.id, TaskUpdate(status=TaskStatus.submitted, source=TaskSource.fal))
+                await uow.commit()
+            await enqueue_task_callback(task.id, {"status": "OK"}, uow)
+            task_ids.append(task.id)
+
+        buffer = None
+        if write_behind:
+            settings.TASK_WRITE_BEHIND_DURABILITY = write_behind
+            buffer = TaskResultBuffer(PGTaskUnitOfWork)
+            flusher = asyncio.create_task(buffer.run())
+
+        counts = Counter()
+        count_database_work(counts)
+        started = time.perf_counter()
+        handled = 0
+
+        async def drain() -> None:
+            nonlocal handled
+            while await handle_task_callback(PGTaskUnitOfWork(), clients, storage, buffer):
+                handled += 1
+
+        await asyncio.gather(*(drain() for _ in range(workers)))
+        if buffer is not None:
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(TaskDB).filter(TaskDB.id.in_(task_ids)))
+    await engine.dispose()
+
+    print(f"{handled} callbacks in {elapsed:.2f}s, {handled / elapsed:.0f}/s")
+    for name in ("checkouts", "transactions", "statements", "rollbacks", "round trips"):
+        # The last, empty claims are counted too
+        print(f"{name:>12}: {counts[name] / handled:5.2f} per callback")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callbacks", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent callback workers")
+    parser.add_argument(
+        "--write-behind", choices=["commit", "buffer"], help="Finish callbacks through a TaskResultBuffer"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.callbacks, args.workers, args.write_behind))
@@ -0,0 +1,69 @@
+"""Share of image2video tasks each source gets from RoutingTaskSourceClient while
+fal degrades and recovers, against stub sources with injected latency and errors.
+
+    python -m benchmarks.task_routing [--phase 3] [--concurrency 8] [--decay 1]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from src.core.config import settings
+from src.integrations.infrastructure.external_api.mocked_source import MockedTaskSourceClient
+from src.integrations.infrastructure.external_api.router import RoutingTaskSourceClient
+from src.tasks.domain.dtos import TaskCreateFromImageDTO
+from src.tasks.domain.entities import TaskSource
+
+# (name, fal latency, fal error status, kling latency)
+PHASES = [
+    ("healthy", 0.05, None, 0.1),
+    ("fal slow", 0.5, None, 0.1),
+    ("fal down", 0.01, 503, 0.1),
+    ("recovered", 0.05, None, 0.1),
+]
+
+
+async def run_phase(router: RoutingTaskSourceClient, duration: float, concurrency: int) -> dict[str, int]:
+    routed = {"fal": 0, "kling": 0, "failed": 0}
+    deadline = time.monotonic() + duration
+
+    async def submit() -> None:
+        while time.monotonic() < deadline:
+            task_data = TaskCreateFromImageDTO(
+                app_id="benchmark", user_id="benchmark", prompt="benchmark", external_task_id="1"
+            )
+            try:
+                result = await router.create_task_image2video(task_data, io.BytesIO(b"\xff"), None)
+            except Exception:
+                routed["failed"] += 1
+            else:
+                routed[result.source.value] += 1
+
+    await asyncio.gather(*(submit() for _ in range(concurrency)))
+    return routed
+
+
+async def main(duration: float, concurrency: int) -> None:
+    fal = MockedTaskSourceClient(TaskSource.fal)
+    kling = MockedTaskSourceClient(TaskSource.kling)
+    router = RoutingTaskSourceClient([fal, kling])
+    for name, fal_latency, fal_status, kling_latency in PHASES:
+        fal.latency, fal.status, kling.latency = fal_latency, fal_status, kling_latency
+        routed = await run_phase(router, duration, concurrency)
+        total = sum(routed.values()) or 1
+        print(
+            f"{name:>10}: fal {routed['fal'] / total:6.1%}, kling {routed['kling'] / total:6.1%}, "
+            f"failed {routed['failed'] / total:6.1%} of {total} tasks"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phase", type=float, default=3.0, help="Seconds per phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--decay", type=float, default=1.0, help="ROUTING_DECAY for the run, in seconds")
+    args = parser.parse_args()
+    settings.ROUTING_DECAY = args.decay
+    settings.ROUTING_EJECT_TIME = args.decay
+    asyncio.run(main(args.phase, args.concurrency))
@@ -1,2 +1,3 @@
 #!/bin/bash
-gunicorn src.main:app -w 1 -k uvicorn.workers.UvicornWorker -b 0.0.0.0:80 --forwarded-allow-ips="*"
+# More than one worker needs TASK_EVENT_BUS=true, PROVIDER_* limits apply to each worker
+gunicorn src.main:app -w "${GUNICORN_WORKERS:-1}" -k uvicorn.workers.UvicornWorker -b 0.0.0.0:80 --forwarded-allow-ips="*"
@@ -9,6 +9,128 @@ class Settings(BaseSettings):
     KLING_SECRET_KEY: str
     FAL_KEY: str
     LOCAL_STORAGE_PATH: str = "storage"
+    RESULT_CHUNK_SIZE: int = 64 * 1024
+    LOCAL_STORAGE_IO_MODE: Literal["threadpool", "sync"] = "threadpool"
+    LOCAL_STORAGE_IO_WORKERS: int = 4
+    LOCAL_STORAGE_WRITE_BUFFER: int = 1024 * 1024
+    LOCAL_STORAGE_FSYNC: Literal["never", "file", "full"] = "file"
+    LOCAL_STORAGE_ORPHAN_GRACE: int = 60 * 60
+    LOCAL_STORAGE_ATIME_RESOLUTION: int = 60 * 60
+
+    RETENTION_ENABLED: bool = False
+    RETENTION_MAX_TOTAL_BYTES: int | None = None
+    RETENTION_DEFAULT_TTL: int | None = None
+    RETENTION_APP_TTLS: dict[str, int] = {}
+    RETENTION_SWEEP_INTERVAL: float = 5.0
+    # Tasks still submitted after RECONCILE_AFTER are polled, with the interval doubling up
+    # to RECONCILE_MAX_INTERVAL, and failed once RECONCILE_DEADLINE passed
+    RECONCILE_ENABLED: bool = True
+    RECONCILE_AFTER: float = 10 * 60
+    RECONCILE_INTERVAL: float = 60.0
+    RECONCILE_MAX_INTERVAL: float = 15 * 60
+    RECONCILE_DEADLINE: float = 3 * 60 * 60
+    RECONCILE_BATCH_SIZE: int = 20
+    RECONCILE_TICK: float = 30.0
+    RESULT_CACHE_MAX_AGE: int = 365 * 24 * 60 * 60
+    RESULT_ACCEL_REDIRECT_PREFIX: str | None = None
+    UPLOAD_MAX_FILE_SIZE: int = 20 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_SIZE: int = 4 * 20 * 1024 * 1024 + 1024 * 1024
+    SUBMISSION_SPOOL_PATH: str = "storage/submissions"
+    SUBMISSION_WORKERS: int = 4
+    SUBMISSION_POLL_INTERVAL: float = 1.0
+    SUBMISSION_LEASE: int = 5 * 60
+    SUBMISSION_MAX_ATTEMPTS: int = 3
+    SUBMISSION_RETRY_DELAY: float = 10.0
+    SUBMISSION_QUEUE_MAX_DEPTH: int = 500
+    SUBMISSION_RETRY_AFTER: int = 30
+    CALLBACK_WORKERS: int = 4
+    CALLBACK_POLL_INTERVAL: float = 1.0
+    # Long enough to download and store the largest result
+    CALLBACK_LEASE: int = 10 * 60
+    CALLBACK_MAX_ATTEMPTS: int = 5
+    CALLBACK_RETRY_DELAY: float = 10.0
+    # Writes the results of concurrent callbacks in shared transactions, see TaskResultBuffer.
+    # Batches grow past CALLBACK_WORKERS only with TASK_WRITE_BEHIND_DURABILITY "buffer"
+    TASK_WRITE_BEHIND: bool = False
+    TASK_WRITE_BEHIND_WINDOW: float = 0.05
+    TASK_WRITE_BEHIND_MAX_BATCH: int = 200
+    TASK_WRITE_BEHIND_DURABILITY: Literal["commit", "buffer"] = "commit"
+    # Responses of /generation/{task_id}, invalidated on commit in this process and, with
+    # TASK_EVENT_BUS, in the others; without it they see a change after TASK_CACHE_TTL at most
+    TASK_CACHE_SIZE: int = 10_000
+    TASK_CACHE_TTL: float = 2.0
+    TASK_CACHE_TERMINAL_TTL: float = 5 * 60
+    # Task event streams and long polls, woken by commits and re-reading the task every
+    # TASK_EVENTS_KEEPALIVE
+    TASK_EVENTS_QUEUE_SIZE: int = 16
+    TASK_EVENTS_KEEPALIVE: float = 15.0
+    TASK_LONG_POLL_MAX_TIMEOUT: float = 60.0
+    # Shares task changes between processes through LISTEN/NOTIFY, needed with more than
+    # one gunicorn worker or node
+    TASK_EVENT_BUS: bool = False
+    TASK_EVENT_BUS_CHANNEL: str = "task_events"
+    TASK_EVENT_BUS_PING_INTERVAL: float = 30.0
+    TASK_EVENT_BUS_MAX_RECONNECT_DELAY: float = 30.0
+    WEBHOOK_CONCURRENCY: int = 32
+    WEBHOOK_HOST_CONCURRENCY: int = 4
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_POLL_INTERVAL: float = 1.0
+    WEBHOOK_LEASE: int = 5 * 60
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_DELAY: float = 10.0
+    WEBHOOK_MAX_RETRY_DELAY: float = 60 * 60
+    # Client endpoints that accept a JSON list of tasks per request
+    WEBHOOK_BATCH_URLS: list[str] = []
+    WEBHOOK_MAX_BATCH: int = 100
+    # Keyed by provider ("kling", "fal") or provider and model ("kling:kling-v2-master"), per process
+    PROVIDER_RATE_LIMITS: dict[str, float] = {"kling": 1.0, "fal": 5.0}
+    PROVIDER_CONCURRENCY_LIMITS: dict[str, int] = {"kling": 5, "fal": 10}
+    SCHEDULER_MAX_WAIT: float = 5 * 60
+    SCHEDULER_THROTTLED_RETRIES: int = 3
+    SCHEDULER_RATE_INCREASE: float = 0.05
+    SCHEDULER_MIN_RATE_FRACTION: float = 0.05
+    HTTP_RETRY_MAX_ATTEMPTS: int = 3
+    HTTP_RETRY_BASE_DELAY: float = 0.5
+    HTTP_RETRY_MAX_DELAY: float = 10.0
+    HTTP_RETRY_BUDGET_RATIO: float = 0.2
+    HTTP_RETRY_BUDGET_BURST: int = 10
+    HTTP_BREAKER_FAILURE_THRESHOLD: int = 5
+    HTTP_BREAKER_RESET_TIMEOUT: float = 30.0
+    HTTP_DNS_CACHE_TTL: int = 5 * 60
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_KEEPALIVE_TIMEOUT: float = 60.0
+    HTTP_WEBHOOK_KEEPALIVE_TIMEOUT: float = 15.0
+    HTTP_PROVIDER_POOL_SIZE: int = 100
+    HTTP_PROVIDER_TIMEOUT: float = 60.0
+    HTTP_CDN_POOL_SIZE: int = 50
+    HTTP_CDN_HOST_POOL_SIZE: int = 20
+    HTTP_CDN_READ_TIMEOUT: float = 60.0
+    # Provider hosts connected to at startup, HTTP_PREWARM_CONNECTIONS times each
+    HTTP_PREWARM_URLS: list[str] = ["https://queue.fal.run", "https://api-singapore.klingai.com"]
+    HTTP_PREWARM_CONNECTIONS: int = 2
+    # Task sources in order of preference while their health is unknown
+    TASK_SOURCES: list[Literal["fal", "kling"]] = ["fal", "kling"]
+    ROUTING_DECAY: float = 60.0
+    ROUTING_ERROR_PENALTY: float = 4.0
+    ROUTING_EXPLORE_RATIO: float = 0.05
+    ROUTING_EJECT_FAILURES: int = 5
+    ROUTING_EJECT_TIME: float = 30.0
+    FAL_UPLOAD_CONCURRENCY: int = 4
+    FAL_CDN_TOKEN_TTL: int = 24 * 60 * 60
+    KLING_TOKEN_TTL: int = 30 * 60
+    CREDENTIAL_REFRESH_MARGIN: int = 5 * 60
+    FAL_UPLOAD_GLOBAL_CONCURRENCY: int = 16
+
+    STORAGE_BACKEND: Literal["local", "s3"] = "local"
+    S3_ENDPOINT_URL: str = "https://s3.amazonaws.com"
+    S3_PUBLIC_ENDPOINT_URL: str | None = None
+    S3_REGION: str = "us-east-1"
+    S3_BUCKET: str | None = None
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: str | None = None
+    S3_KEY_PREFIX: str = "results/"
+    S3_PART_SIZE: int = 8 * 1024 * 1024
+    S3_PRESIGN_EXPIRES: int = 60 * 60
 
     PROJECT_NAME: str = os.environ.get("PROJECT_NAME", "UNNAMED PROJECT")
     API_V1_STR: str = "/api/v1"
@@ -22,6 +144,18 @@ class Settings(BaseSettings):
     DB_PORT: str | None = os.environ.get("DB_PORT")
     DATABASE_URI: str | None = None
     ALEMBIC_DATABASE_URI: str | None = None
+    # Read-only copy for task status reads, which go to the primary for DB_REPLICA_MAX_LAG
+    # after the task changed
+    DB_REPLICA_URI: str | None = None
+    DB_REPLICA_MAX_LAG: float = 5.0
+    # Pools per workload and process: api requests, status reads and background workers
+    DB_API_POOL_SIZE: int = 5
+    DB_API_MAX_OVERFLOW: int = 5
+    DB_READ_POOL_SIZE: int = 5
+    DB_READ_MAX_OVERFLOW: int = 5
+    DB_WORKER_POOL_SIZE: int = 10
+    DB_WORKER_MAX_OVERFLOW: int = 0
+    DB_POOL_TIMEOUT: float = 30.0
 
     @staticmethod
     def _build_dsn(scheme: str, values: dict) -> str:
@@ -1,10 +1,72 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.core.config import settings
 
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Connections of the database pool: in_use, idle or limit",
+    ["pool", "state"],
+)
+db_pool_checkouts = Counter(
+    "db_pool_checkouts_total",
+    "Connections handed out by the database pool",
+    ["pool"],
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds",
+    "Time sessions waited for a database pool connection, connecting included",
+    ["pool"],
+)
+
 
 DATABASE_URL = settings.DATABASE_URI
 
-engine = create_async_engine(DATABASE_URL, pool_size=20, max_overflow=0)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    name: str
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.labels(self.name).observe(time.perf_counter() - started)
+
+
+def create_pool_engine(name: str, url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    """An engine with its own pool for one kind of work, so a spike of one doesn't starve the others"""
+    # A subclass per pool, since the engine recreates its pool from the class on dispose
+    pool_class = type(f"{name.title()}Pool", (InstrumentedPool,), {"name": name})
+    engine = create_async_engine(
+        url,
+        poolclass=pool_class,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    event.listen(engine.sync_engine, "checkout", lambda *_: db_pool_checkouts.labels(name).inc())
+    db_pool_connections.labels(name, "in_use").set_function(lambda: engine.sync_engine.pool.checkedout())
+    db_pool_connections.labels(name, "idle").set_function(lambda: engine.sync_engine.pool.checkedin())
+    db_pool_connections.labels(name, "limit").set(pool_size + max_overflow)
+    return engine
+
+
+# Requests creating and updating tasks, e.g. submissions and provider webhooks
+engine = create_pool_engine("api", DATABASE_URL, settings.DB_API_POOL_SIZE, settings.DB_API_MAX_OVERFLOW)
+# Task status polls and the panel, on the replica if there is one
+read_engine = create_pool_engine(
+    "read", settings.DB_REPLICA_URI or DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW
+)
+# Background workers: submissions, callbacks, webhooks, reconciling and retention
+worker_engine = create_pool_engine(
+    "worker", DATABASE_URL, settings.DB_WORKER_POOL_SIZE, settings.DB_WORKER_MAX_OVERFLOW
+)
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+worker_session_maker = async_sessionmaker(worker_engine, expire_on_commit=False)
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from loguru import logger
+from prometheus_client import Counter, Histogram
+from pydantic import BaseModel
+
+from src.core.config import settings
+
+credential_requests = Counter(
+    "credential_cache_requests_total",
+    "Credential lookups by outcome: hit, stale (served while refreshing) or miss",
+    ["credential", "outcome"],
+)
+credential_fetches = Counter(
+    "credential_fetches_total",
+    "Credential fetches from the issuer",
+    ["credential", "result"],
+)
+credential_fetch_duration = Histogram(
+    "credential_fetch_duration_seconds",
+    "Time spent fetching a credential from the issuer",
+    ["credential"],
+)
+
+
+class Credential(BaseModel):
+    value: str
+    expires_at: float
+
+
+CredentialFetcher = Callable[[], Awaitable[Credential]]
+
+
+class CredentialCache:
+    """Process-wide cache for one expiring credential.
+
+    Within refresh_margin of expiry the cached value is still served while a single
+    background refresh runs; once expired, all callers wait on that same refresh.
+    """
+
+    def __init__(self, name: str, refresh_margin: float = settings.CREDENTIAL_REFRESH_MARGIN):
+        self.name = name
+        self.refresh_margin = refresh_margin
+        self._credential: Credential | None = None
+        self._refresh: asyncio.Task[Credential] | None = None
+
+    async def get(self, fetch: CredentialFetcher) -> str:
+        credential = self._credential
+        now = time.time()
+        if credential is not None and now < credential.expires_at:
+            if now < credential.expires_at - self.refresh_margin:
+                credential_requests.labels(self.name, "hit").inc()
+            else:
+                credential_requests.labels(self.name, "stale").inc()
+                self._start_refresh(fetch)
+            return credential.value
+
+        credential_requests.labels(self.name, "miss").inc()
+        # Shielded so a cancelled caller doesn't cancel the refresh other callers wait on
+        return (await asyncio.shield(self._start_refresh(fetch))).value
+
+    def invalidate(self) -> None:
+        self._credential = None
+
+    def _start_refresh(self, fetch: CredentialFetcher) -> asyncio.Task[Credential]:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch(fetch), name=f"refresh {self.name}")
+            # Background refresh failures are already logged; the stale value stays until expiry
+            self._refresh.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._refresh
+
+    async def _fetch(self, fetch: CredentialFetcher) -> Credential:
+        started = time.perf_counter()
+        try:
+            credential = await fetch()
+        except BaseException as e:
+            credential_fetches.labels(self.name, "error").inc()
+            logger.warning(f"Can't refresh {self.name} credential: {e!r}")
+            raise
+        finally:
+            credential_fetch_duration.labels(self.name).observe(time.perf_counter() - started)
+        credential_fetches.labels(self.name, "success").inc()
+        self._credential = credential
+        return credential
@@ -1,8 +1,9 @@
+import asyncio
 import base64
 import datetime as dt
 import sys
 import io
-from typing import Literal
+from typing import AsyncIterator, BinaryIO, Literal
 from loguru import logger
 import time
 import aiohttp
@@ -28,8 +29,10 @@ from src.integrations.infrastructure.external_api.mappers.task import (
     TaskImageDTOToVideoRequestMapper,
     TaskTextDTOToVideoRequestMapper,
 )
-from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient
+from src.integrations.infrastructure.credentials import Credential, CredentialCache
+from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient, CdnHttpClient
 from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient
+from src.integrations.infrastructure.http.resilience import send_with_retries
 from src.integrations.infrastructure.http.services.api_client import APIClientService
 from src.tasks.domain.dtos import (
     TaskCreateFromImageDTO,
@@ -37,9 +40,11 @@ from src.tasks.domain.dtos import (
     TaskCreateFromTextDTO,
     TaskExternalDTO,
 )
-from src.tasks.domain.entities import Task
+from src.tasks.domain.entities import Task, TaskKind, TaskSource
 from src.tasks.domain.interfaces.task_source_client import (
+    GenerationFailedError,
     ITaskSourceClient,
+    TTaskKind,
     TTaskResult,
 )
 from src.core.config import settings
@@ -66,49 +71,69 @@ _domain_model_name_to_endpoint: dict[Literal["image", "text", "elements"], dict]
     }
 }
 
+_task_kind_to_endpoints: dict[TTaskKind, dict] = {
+    "text2video": _domain_model_name_to_endpoint["text"],
+    "image2video": _domain_model_name_to_endpoint["image"],
+    "multiimage2video": _domain_model_name_to_endpoint["elements"],
+}
+
+_cdn_tokens = CredentialCache("fal_cdn")
+
 
 class FalKlingAdapter(
     APIClientService,
     ITaskSourceClient[
-        TaskCreateFromTextDTO, TaskCreateFromImageDTO, KlingResponseSchema, io.BytesIO
+        TaskCreateFromTextDTO, TaskCreateFromImageDTO, KlingResponseSchema, BinaryIO
     ],
 ):
     token: str | None = settings.FAL_KEY
     log = logger.bind(name="kling")
     CDN_URL = "https://v3.fal.media"
+    # Queue requests are addressed by the app, whatever the model endpoint was
+    QUEUE_APP = "/fal-ai/kling-video"
+    source = TaskSource.fal
     webhook_domain = settings.DOMAIN
+    upload_semaphore = asyncio.Semaphore(settings.FAL_UPLOAD_GLOBAL_CONCURRENCY)
 
     def __init__(
         self,
         client: IAsyncHttpClient = AiohttpClient,
         source_url: str = "https://queue.fal.run",
         headers: dict | None = None,
+        cdn_client: IAsyncHttpClient = CdnHttpClient,
     ):
         super().__init__(client, source_url, headers)
+        self.cdn_client = cdn_client
         self._dto_mapper = TaskDTOToFalKlingRequestMapper()
-        self._cdn_token: str | None = None
-        self._cdn_token_issued_at = datetime.datetime.now()
 
     @property
     def auth_headers(self):
         return {"Authorization": f"Key {self.token}"}
 
+    def supports(self, kind: TTaskKind, model_name: str | None) -> bool:
+        return model_name in _task_kind_to_endpoints[kind]
+
+    async def _fetch_cdn_token(self) -> Credential:
+        response_data = await self.request_json(
+            "POST",
+            "https://rest.alpha.fal.ai/storage/auth/token?storage_type=fal-cdn-v3",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            data=b"{}",
+            idempotent=True,
+        )
+        expires_at = time.time() + settings.FAL_CDN_TOKEN_TTL
+        if response_data.get("expires_at"):
+            expires_at = dt.datetime.fromisoformat(response_data["expires_at"]).timestamp()
+        return Credential(
+            value=f"{response_data.get('token_type')} {response_data.get('token')}",
+            expires_at=expires_at,
+        )
+
     async def make_cdn_token(self) -> str:
-        if (
-            datetime.datetime.now() - self._cdn_token_issued_at
-        ).seconds > 24 * 60 * 60 or self._cdn_token is None:
-            response = await self.request(
-                "POST",
-                "https://rest.alpha.fal.ai/storage/auth/token?storage_type=fal-cdn-v3",
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
-                },
-                data=b"{}"
-            )
-            response_data = await response.json()
-            return f"{response_data.get('token_type')} {response_data.get('token')}"
-        return self._cdn_token
+        return await _cdn_tokens.get(self._fetch_cdn_token)
 
     async def create_task_text2video(
         self, task_data: TaskCreateFromTextDTO
@@ -120,7 +145,7 @@ class FalKlingAdapter(
         if endpoint is None:
             raise ValueError(f"Unknown model name: {task_data.model_name}")
 
-        response: aiohttp.ClientResponse = await self.request(
+        result = await self.request_json(
             method="POST",
             endpoint=endpoint,
             headers={"Content-Type": "application/json"},
@@ -129,35 +154,63 @@ class FalKlingAdapter(
                 "fal_webhook": f"https://{self.webhook_domain}/api/task/webhook/{task_data.external_task_id}"
             },
         )
-        result = await response.json()
         self.log.debug(f"Text2video fal response: {result}")
         result = FalGenerateResponse.model_validate(result)
         return TaskExternalToDomainMapper().map_one(result)
 
     @staticmethod
-    def _encode_image(image: io.BytesIO) -> str:
-        return base64.b64encode(image.getvalue()).decode()
+    def _encode_image(image: BinaryIO) -> str:
+        image.seek(0)
+        return base64.b64encode(image.read()).decode()
 
-    async def upload_image(self, image: io.BytesIO) -> str:
-        token = await self.make_cdn_token()
-        response = await self.request(
+    async def upload_image(self, image: BinaryIO, token: str | None = None) -> str:
+        token = token or await self.make_cdn_token()
+        size = image.seek(0, io.SEEK_END)
+        image.seek(0)
+        # aiohttp streams file objects from a thread instead of loading them whole
+        result = await self.request_json(
             "POST",
             self.CDN_URL + "/files/upload",
-            data=image.read(),
-            headers={"Content-Type": "image/jpeg", "Authorization": token},
+            data=image,
+            headers={
+                "Content-Type": "image/jpeg",
+                "Content-Length": str(size),
+                "Authorization": token,
+            },
+            idempotent=True,
         )
-        return (await response.json())["access_url"]
+        return result["access_url"]
+
+    async def upload_images(self, images: list[BinaryIO]) -> list[str]:
+        """Uploads concurrently, capped per call and across the process.
+
+        The first failure cancels the remaining uploads and is raised as is.
+        """
+        token = await self.make_cdn_token()
+        semaphore = asyncio.Semaphore(settings.FAL_UPLOAD_CONCURRENCY)
+
+        async def upload(image: BinaryIO) -> str:
+            async with semaphore, self.upload_semaphore:
+                return await self.upload_image(image, token)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(upload(image)) for image in images]
+        except ExceptionGroup as e:
+            raise e.exceptions[0]
+        return [task.result() for task in tasks]
 
     async def create_task_image2video(
         self,
         task_data: TaskCreateFromImageDTO,
-        image: io.BytesIO,
-        image_tail: io.BytesIO | None,
+        image: BinaryIO,
+        image_tail: BinaryIO | None,
     ) -> TaskExternalDTO:
-        image_url = await self.upload_image(image)
         image_tail_url = None
         if image_tail and task_data.model_name == 'kling-v1-6':
-            image_tail_url = await self.upload_image(image_tail)
+            image_url, image_tail_url = await self.upload_images([image, image_tail])
+        else:
+            image_url = await self.upload_image(image)
         request = self._dto_mapper.map_image2video(task_data, image_url, image_tail_url)
         self.log.info(f"image2video fal request: {request}")
 
@@ -165,7 +218,7 @@ class FalKlingAdapter(
         if endpoint is None:
             raise ValueError(f"Unknown model name: {task_data.model_name}")
 
-        response = await self.request(
+        result = await self.request_json(
             method="POST",
             endpoint=endpoint,
             headers={"Content-Type": "application/json"},
@@ -174,41 +227,60 @@ class FalKlingAdapter(
                 "fal_webhook": f"https://{self.webhook_domain}/webhook/{task_data.external_task_id}"
             },
         )
-        result = await response.json()
         self.log.debug(f"Image2video fal response: {result}")
 
         result = FalGenerateResponse.model_validate(result)
         return TaskExternalToDomainMapper().map_one(result)
 
-    async def download_result(self, url: str) -> io.BytesIO:
-        response = await self.request("GET", url)
-        assert response.content_type.startswith("video/"), (
-            f"Unexpected result content-type: {response.content_type}"
-        )
-        return io.BytesIO(await response.read())
+    async def download_result(self, url: str) -> AsyncIterator[bytes]:
+        # Through the CDN pool and without the API key, the result URLs are public
+        response = await send_with_retries("GET", url, lambda: self.cdn_client.get(url))
+        async with response:
+            response.raise_for_status()
+            assert response.content_type.startswith("video/"), (
+                f"Unexpected result content-type: {response.content_type}"
+            )
+            async for chunk in response.content.iter_chunked(settings.RESULT_CHUNK_SIZE):
+                yield chunk
 
-    async def process_task_callback(self, data: dict) -> io.BytesIO | None:
+    async def process_task_callback(self, data: dict) -> AsyncIterator[bytes] | None:
         try:
             result = FalGenerateResponse.model_validate(data)
         except ValidationError as e:
             logger.error(e)
             return None
 
+        if result.status == "ERROR":
+            raise GenerationFailedError(f"Generation failed: {result.error}")
         if result.status != "OK" or result.payload is None:
             return None
-        return await self.download_result(result.payload.video.url)
+        return self.download_result(result.payload.video.url)
+
+    async def query_task(self, external_id: str, kind: TaskKind | None) -> dict | None:
+        status = (await self.request_json("GET", f"{self.QUEUE_APP}/requests/{external_id}/status")).get("status")
+        if status != "COMPLETED":
+            return None
+
+        try:
+            payload = await self.request_json("GET", f"{self.QUEUE_APP}/requests/{external_id}")
+        except aiohttp.ClientResponseError as e:
+            if e.status == 429 or e.status >= 500:
+                raise
+            # Failed generations answer the result request with an error
+            return {"request_id": external_id, "status": "ERROR", "error": e.message}
+        return {"request_id": external_id, "status": "OK", "payload": payload}
 
     async def create_task_multiimage2video(
-        self, task_data: TaskCreateFromMultiImageDTO, images: list[io.BytesIO]
+        self, task_data: TaskCreateFromMultiImageDTO, images: list[BinaryIO]
     ) -> TaskExternalDTO:
         endpoint = _domain_model_name_to_endpoint["elements"].get(task_data.model_name)
         if endpoint is None:
             raise ValueError(f"Unknown model name: {task_data.model_name}")
 
-        images_urls = [await self.upload_image(image) for image in images]
+        images_urls = await self.upload_images(images)
         request = self._dto_mapper.map_elements(task_data, images_urls)
 
-        response = await self.request(
+        result = await self.request_json(
             method="POST",
             endpoint=endpoint,
             headers={"Content-Type": "application/json"},
@@ -217,7 +289,6 @@ class FalKlingAdapter(
                 "fal_webhook": f"https://{self.webhook_domain}/webhook/{task_data.external_task_id}"
             },
         )
-        result = await response.json()
 
         result = FalGenerateResponse.model_validate(result)
         return TaskExternalToDomainMapper().map_one(result)
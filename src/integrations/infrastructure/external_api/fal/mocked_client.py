@@ -0,0 +1,44 @@
+import asyncio
+
+from aiohttp.client import _RequestOptions
+
+from src.integrations.infrastructure.external_api.kling.mocked_client import MockResponse
+from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient
+
+
+class MockedFalHttpClient(IAsyncHttpClient[MockResponse]):
+    """Answers fal queue and CDN requests after a fixed delay, for benchmarks"""
+
+    latency: float = 0.0
+
+    @classmethod
+    async def get(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        await asyncio.sleep(cls.latency)
+        return MockResponse()
+
+    @classmethod
+    async def post(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        await asyncio.sleep(cls.latency)
+        if "/storage/auth/token" in url:
+            return MockResponse(json={"token_type": "Bearer", "token": "mocked"})
+        if url.endswith("/files/upload"):
+            return MockResponse(json={"access_url": "https://v3.fal.media/files/mocked.jpg"})
+        if "/fal-ai/kling-video/" in url:
+            return MockResponse(json={"request_id": "mocked", "status": "IN_QUEUE"})
+        return MockResponse(status=404)
+
+    @classmethod
+    async def head(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        return MockResponse()
+
+    @classmethod
+    async def put(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        return MockResponse()
+
+    @classmethod
+    async def delete(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        return MockResponse()
+
+    @classmethod
+    async def patch(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        return MockResponse()
@@ -1,8 +1,8 @@
 import base64
 import datetime
 import datetime as dt
-import io
 import time
+from typing import AsyncIterator, BinaryIO
 
 import aiohttp
 import jwt
@@ -21,8 +21,10 @@ from src.integrations.infrastructure.external_api.mappers.task import (
     TaskTextDTOToVideoRequestMapper,
     TaskMultiImageDTOToVideoRequestMapper,
 )
-from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient
+from src.integrations.infrastructure.credentials import Credential, CredentialCache
+from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient, CdnHttpClient, close_http_pools
 from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient
+from src.integrations.infrastructure.http.resilience import send_with_retries
 from src.integrations.infrastructure.http.services.api_client import APIClientService
 from src.tasks.domain.dtos import (
     TaskCreateFromImageDTO,
@@ -30,29 +32,40 @@ from src.tasks.domain.dtos import (
     TaskExternalDTO,
     TaskCreateFromMultiImageDTO,
 )
+from src.tasks.domain.entities import TaskKind, TaskSource
 from src.tasks.domain.interfaces.task_source_client import (
+    GenerationFailedError,
     ITaskSourceClient,
+    TTaskKind,
 )
 
+_tokens = CredentialCache("kling_jwt")
+
+_task_kind_to_path = {
+    TaskKind.text2video: "/v1/videos/text2video",
+    TaskKind.image2video: "/v1/videos/image2video",
+    TaskKind.multiimage2video: "/v1/videos/multi-image2video",
+}
+
 
 class KlingAdapter(
     APIClientService,
     ITaskSourceClient[
-        TaskCreateFromTextDTO, TaskCreateFromImageDTO, KlingResponseSchema, io.BytesIO
+        TaskCreateFromTextDTO, TaskCreateFromImageDTO, KlingResponseSchema, BinaryIO
     ],
 ):
-    _token: str | None = None
     log = logger.bind(name="kling")
-    _token_issue_at: datetime.datetime | None = None
+    source = TaskSource.kling
 
     def __init__(
         self,
         client: IAsyncHttpClient = AiohttpClient,
         source_url: str = "https://api-singapore.klingai.com",
         headers: dict | None = None,
+        cdn_client: IAsyncHttpClient = CdnHttpClient,
     ):
         super().__init__(client, source_url, headers)
-        self._token = None
+        self.cdn_client = cdn_client
         self._txtdto_mapper = TaskTextDTOToVideoRequestMapper()
         self._imgdto_mapper = TaskImageDTOToVideoRequestMapper()
         self._multimgdto_mapper = TaskMultiImageDTOToVideoRequestMapper()
@@ -63,29 +76,29 @@ class KlingAdapter(
         payload = {
             "iss": access_key,
             "exp": int(time.time())
-            + 1800,  # The valid time, in this example, represents the current time+1800s(30min)
+            + settings.KLING_TOKEN_TTL,  # The valid time, by default the current time+1800s(30min)
             "nbf": int(time.time())
             - 5,  # The time when it starts to take effect, in this example, represents the current time minus 5s
         }
         token = jwt.encode(payload, secret_key, headers=headers)
         return token
 
-    @property
-    def token(self):
-        if (
-            self._token is None
-            or self._token_issue_at is None
-            or (datetime.datetime.now() - self._token_issue_at).seconds > 1700
-        ):
-            self._token = self._generate_token(
-                settings.KLING_ACCESS_KEY, settings.KLING_SECRET_KEY
-            )
-            self._token_issue_at = datetime.datetime.now()
-        return self._token
+    @staticmethod
+    async def _fetch_token() -> Credential:
+        expires_at = time.time() + settings.KLING_TOKEN_TTL
+        token = KlingAdapter._generate_token(settings.KLING_ACCESS_KEY, settings.KLING_SECRET_KEY)
+        return Credential(value=token, expires_at=expires_at)
+
+    def supports(self, kind: TTaskKind, model_name: str | None) -> bool:
+        # Multi-image references are only served by v1.6 standard
+        return kind != "multiimage2video" or model_name == "kling-v1-6"
+
+    async def get_auth_headers(self) -> dict:
+        return {"Authorization": f"Bearer {await _tokens.get(self._fetch_token)}"}
 
     async def check_balance(self):
         return
-        response: aiohttp.ClientResponse = await self.request(
+        data = await self.request_json(
             method="GET",
             endpoint="/account/costs",
             headers={"Content-Type": "application/json"},
@@ -96,7 +109,6 @@ class KlingAdapter(
                 "end_time": int(dt.datetime.now().timestamp()),
             },
         )
-        data = await response.json()
 
         #  
         if data is None:
@@ -141,26 +153,26 @@ class KlingAdapter(
     ) -> TaskExternalDTO:
         request = self._txtdto_mapper.map_one(task_data)
         await self.check_balance()
-        response: aiohttp.ClientResponse = await self.request(
+        result = await self.request_json(
             method="POST",
             endpoint="/v1/videos/text2video",
             headers={"Content-Type": "application/json"},
             json=request.model_dump(mode="json", exclude_none=True),
         )
-        result = await response.json()
         self.log.debug(f"Text2video kling response: {result}")
         result = KlingResponseSchema.model_validate(result)
         return TaskExternalToDomainMapper().map_one(result)
 
     @staticmethod
-    def _encode_image(image: io.BytesIO) -> str:
-        return base64.b64encode(image.getvalue()).decode()
+    def _encode_image(image: BinaryIO) -> str:
+        image.seek(0)
+        return base64.b64encode(image.read()).decode()
 
     async def create_task_image2video(
         self,
         task_data: TaskCreateFromImageDTO,
-        image: io.BytesIO,
-        image_tail: io.BytesIO | None,
+        image: BinaryIO,
+        image_tail: BinaryIO | None,
     ) -> TaskExternalDTO:
         await self.check_balance()
 
@@ -172,39 +184,55 @@ class KlingAdapter(
         request.camera_control = None
         self.log.info(f"image2video request: {request}")
 
-        response = await self.request(
+        result = await self.request_json(
             method="POST",
             endpoint="/v1/videos/image2video",
             headers={"Content-Type": "application/json"},
             json=request.model_dump(mode="json", exclude_none=True),
         )
-        result = await response.json()
         self.log.debug(f"Image2video kling response: {result}")
 
         result = KlingResponseSchema.model_validate(result)
         return TaskExternalToDomainMapper().map_one(result)
 
-    async def process_task_callback(self, data: dict) -> io.BytesIO | None:
+    async def process_task_callback(self, data: dict) -> AsyncIterator[bytes] | None:
         try:
             task_data = KlingResponseDataSchema.model_validate(data)
         except ValidationError as e:
             logger.debug(e)
             return None
         if task_data.task_status == KlingTaskStatus.failed:
-            raise ValueError(f"Generation failed: {task_data.task_status_msg}")
+            raise GenerationFailedError(f"Generation failed: {task_data.task_status_msg}")
         if task_data.task_status != KlingTaskStatus.succeed:
             return None
         if task_data.task_result is None or not task_data.task_result.videos:
             raise ValueError(f"Unexpected response: {task_data}")
 
-        response = await self.client.get(str(task_data.task_result.videos[0].url))
-        response.raise_for_status()
+        return self.download_result(str(task_data.task_result.videos[0].url))
+
+    async def query_task(self, external_id: str, kind: TaskKind | None) -> dict | None:
+        if kind is None:
+            raise ValueError(f"Can't query Kling task {external_id} of unknown kind")
+        result = await self.request_json(
+            method="GET",
+            endpoint=f"{_task_kind_to_path[kind]}/{external_id}",
+            headers={"Content-Type": "application/json"},
+        )
+        task_data = KlingResponseSchema.model_validate(result).data
+        if task_data.task_status not in (KlingTaskStatus.succeed, KlingTaskStatus.failed):
+            return None
+        return result["data"]
 
-        result = io.BytesIO(await response.read())
-        return result
+    async def download_result(self, url: str) -> AsyncIterator[bytes]:
+        # Not through self.request: signed CDN URLs reject an extra Authorization header
+        response = await send_with_retries("GET", url, lambda: self.cdn_client.get(url))
+        async with response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(settings.RESULT_CHUNK_SIZE):
+                yield chunk
 
     async def get_limits(self) -> dict:
-        response = await self.request(
+        return await self.request_json(
             method="GET",
             endpoint="/account/costs",
             headers={"Content-Type": "application/json"},
@@ -215,10 +243,9 @@ class KlingAdapter(
                 "end_time": datetime.datetime.now().timestamp(),
             },
         )
-        return response
 
     async def create_task_multiimage2video(
-        self, task_data: TaskCreateFromMultiImageDTO, images: list[io.BytesIO]
+        self, task_data: TaskCreateFromMultiImageDTO, images: list[BinaryIO]
     ) -> TaskExternalDTO:
         request = self._multimgdto_mapper.map_one(task_data)
         await self.check_balance()
@@ -230,20 +257,22 @@ class KlingAdapter(
 
         request.image_list = image_list
 
-        response = await self.request(
+        result = await self.request_json(
             method="POST",
             endpoint="/v1/videos/multi-image2video",
             headers={"Content-Type": "application/json"},
             json=request.model_dump(mode="json", exclude_none=True),
         )
-        result = await response.json()
         result = KlingResponseSchema.model_validate(result)
         return TaskExternalToDomainMapper().map_one(result)
 
 
 async def print_kling_remaining_limits():
     adapter = KlingAdapter()
-    print(await adapter.get_limits())
+    try:
+        print(await adapter.get_limits())
+    finally:
+        await close_http_pools()
 
 
 if __name__ == "__main__":
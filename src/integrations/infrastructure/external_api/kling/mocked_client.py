@@ -9,11 +9,26 @@ from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient
 
 SIZE_POOL_AIOHTTP = 100
 
+class MockStreamReader:
+    def __init__(self, body: bytes = b""):
+        self._body = body
+
+    async def iter_chunked(self, n: int):
+        for offset in range(0, len(self._body), n):
+            yield self._body[offset:offset + n]
+
+
 class MockResponse:
     def __init__(self, text: str | None = None, status: int = 200, json: dict | None = None):
         self._text = text
         self._json = json
         self.status = status
+        self.headers = {}
+        self.content = MockStreamReader()
+
+    @property
+    def ok(self) -> bool:
+        return self.status // 100 == 2
 
     async def text(self):
         return self._text
@@ -24,6 +39,9 @@ class MockResponse:
     async def json(self):
         return self._json
 
+    def release(self):
+        pass
+
     def raise_for_status(self):
         if self.status // 100 != 2:
             raise ValueError("Mocked http error")
@@ -70,6 +88,10 @@ class MockedAsyncHttpClient(IAsyncHttpClient[MockResponse]):
             return MockResponse(json={'code': 0, 'message': 'SUCCEED', 'request_id': 'CjikY2gHPbcAAAAABlkE-w', 'data': {'task_id': 'CjikY2gHPbcAAAAABlkE-w', 'task_status': 'submitted', 'created_at': 1747233384021, 'updated_at': 1747233384021}})
         return MockResponse(status=404)
 
+    @classmethod
+    async def head(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
+        return MockResponse()
+
     @classmethod
     async def put(cls, url: str, **kwargs: _RequestOptions) -> MockResponse:
         return MockResponse()
@@ -255,6 +255,7 @@ class KlingTaskToDomainMapper:
             if task.data.task_info
             else None,
             result=self._map_task_result(task.data.task_result),
+            source=TaskSource.kling,
         )
 
     def _map_task_result(self, value: KlingResponseDataTaskResult | None) -> str | None:
@@ -275,6 +276,7 @@ class FalTaskToDomainMapper:
             status=task.status or "SENDED",
             error=task.error,
             result=self._map_task_result(task.payload),
+            source=TaskSource.fal,
         )
 
     def _map_task_result(
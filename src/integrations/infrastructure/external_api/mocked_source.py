@@ -0,0 +1,63 @@
+import asyncio
+from typing import AsyncIterator
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from src.tasks.domain.dtos import TaskExternalDTO
+from src.tasks.domain.entities import TaskKind, TaskSource
+from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient, TTaskKind
+
+
+class MockedTaskSourceClient(ITaskSourceClient):
+    """Creates tasks after an adjustable delay, or fails them with a status, for benchmarks.
+
+    Callbacks yield result, if given, as the generated video.
+    """
+
+    def __init__(
+        self, source: TaskSource, latency: float = 0.0, status: int | None = None, result: bytes | None = None
+    ):
+        self.source = source
+        self.latency = latency
+        self.status = status
+        self.result = result
+        self.created: dict[TTaskKind, int] = {}
+
+    async def _create(self, kind: TTaskKind, task_data) -> TaskExternalDTO:
+        await asyncio.sleep(self.latency)
+        if self.status is not None:
+            url = URL(f"https://{self.source.value}.invalid/{kind}")
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(url, "POST", CIMultiDictProxy(CIMultiDict()), url),
+                (),
+                status=self.status,
+            )
+        self.created[kind] = self.created.get(kind, 0) + 1
+        return TaskExternalDTO(
+            external_id=f"{self.source.value}-{self.created[kind]}",
+            id=int(task_data.external_task_id) if task_data.external_task_id else None,
+            status="submitted",
+            source=self.source,
+        )
+
+    async def create_task_text2video(self, task_data) -> TaskExternalDTO:
+        return await self._create("text2video", task_data)
+
+    async def create_task_image2video(self, task_data, image, image_tail) -> TaskExternalDTO:
+        return await self._create("image2video", task_data)
+
+    async def create_task_multiimage2video(self, task_data, images) -> TaskExternalDTO:
+        return await self._create("multiimage2video", task_data)
+
+    async def process_task_callback(self, data: dict) -> AsyncIterator[bytes] | None:
+        if self.result is None:
+            return None
+        return self._stream_result()
+
+    async def _stream_result(self) -> AsyncIterator[bytes]:
+        yield self.result
+
+    async def query_task(self, external_id: str, kind: TaskKind | None) -> dict | None:
+        return None
@@ -0,0 +1,178 @@
+import math
+import random
+import time
+from typing import Awaitable, Callable
+
+import aiohttp
+from loguru import logger
+from prometheus_client import Counter, Gauge
+
+from src.core.config import settings
+from src.integrations.infrastructure.external_api.scheduler import AdmissionTimeoutError
+from src.integrations.infrastructure.http.resilience import CircuitOpenError
+from src.tasks.domain.dtos import TaskExternalDTO
+from src.tasks.domain.entities import TaskSource
+from src.tasks.domain.interfaces.task_source_client import (
+    ITaskCreationClient,
+    ITaskSourceClient,
+    TTaskKind,
+)
+
+routed_calls = Counter(
+    "task_source_routed_total",
+    "Task creation calls by source and outcome: success, error or failover to the next source",
+    ["source", "kind", "outcome"],
+)
+source_latency = Gauge(
+    "task_source_latency_seconds",
+    "Decaying peak average of task creation latency, admission wait included",
+    ["source"],
+)
+source_error_rate = Gauge("task_source_error_rate", "Decaying average of failed task creations", ["source"])
+source_ejected = Gauge("task_source_ejected", "1 while a source is skipped after consecutive failures", ["source"])
+
+
+class SourceHealth:
+    """Decaying averages of one source's task creation latency and error rate.
+
+    The cost is peak EWMA: latency spikes count at once while recoveries are averaged in,
+    and it is multiplied by the calls in flight, so a source that starts queueing loses
+    traffic before its averages catch up.
+    """
+
+    def __init__(self, source: TaskSource):
+        self.source = source
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self._failures = 0
+        self._ejected_until = 0.0
+        self._updated_at = time.monotonic()
+
+    def cost(self) -> float:
+        # Unmeasured sources cost nothing, so each one gets tried early on
+        latency = self.latency or 0.0
+        return latency * (self.in_flight + 1) * (1 + settings.ROUTING_ERROR_PENALTY * self.error_rate)
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self._ejected_until
+
+    def observe(self, latency: float, failed: bool) -> None:
+        now = time.monotonic()
+        weight = math.exp(-(now - self._updated_at) / settings.ROUTING_DECAY)
+        self._updated_at = now
+        if self.latency is None or latency > self.latency:
+            self.latency = latency
+        else:
+            self.latency = self.latency * weight + latency * (1 - weight)
+        self.error_rate = self.error_rate * weight + float(failed) * (1 - weight)
+
+        self._failures = self._failures + 1 if failed else 0
+        if self._failures >= settings.ROUTING_EJECT_FAILURES:
+            self._failures = 0
+            self._ejected_until = now + settings.ROUTING_EJECT_TIME
+            logger.warning(f"Task source {self.source.value} ejected for {settings.ROUTING_EJECT_TIME}s")
+        self._report(now)
+
+    def _report(self, now: float) -> None:
+        source_latency.labels(self.source.value).set(self.latency or 0.0)
+        source_error_rate.labels(self.source.value).set(self.error_rate)
+        source_ejected.labels(self.source.value).set(int(self.is_ejected(now)))
+
+
+_health: dict[TaskSource, SourceHealth] = {}
+
+
+def get_source_health(source: TaskSource) -> SourceHealth:
+    if source not in _health:
+        _health[source] = SourceHealth(source)
+    return _health[source]
+
+
+def _is_refused(error: Exception) -> bool:
+    """The source refused or never received the task, so sending it elsewhere won't run it twice"""
+    if isinstance(error, (CircuitOpenError, AdmissionTimeoutError, aiohttp.ClientConnectorError)):
+        return True
+    # A 5xx or a timeout doesn't say the task wasn't accepted, failing over could pay for it twice
+    return isinstance(error, aiohttp.ClientResponseError) and error.status == 429
+
+
+def _is_source_failure(error: Exception) -> bool:
+    # Rejected requests are our fault, not a sign of an unhealthy source
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return True
+
+
+class RoutingTaskSourceClient(ITaskCreationClient):
+    """Sends each task to the cheapest healthy source that supports its model and
+    fails over to the next one when a source refused it.
+
+    Sources are tried in TASK_SOURCES order while their costs are equal. A small share
+    of calls goes to a random other source, so the health of idle sources stays known.
+    It only creates tasks, callbacks and queries go to the client of the source recorded on the task.
+    """
+
+    def __init__(self, clients: list[ITaskSourceClient]):
+        self.clients = clients
+
+    def supports(self, kind: TTaskKind, model_name: str | None) -> bool:
+        return any(client.supports(kind, model_name) for client in self.clients)
+
+    def rank(self, kind: TTaskKind, model_name: str | None) -> list[ITaskSourceClient]:
+        candidates = [client for client in self.clients if client.supports(kind, model_name)]
+        if not candidates:
+            raise ValueError(f"No task source supports {kind} with {model_name}")
+
+        now = time.monotonic()
+        healthy = sorted(
+            (client for client in candidates if not get_source_health(client.source).is_ejected(now)),
+            key=lambda client: get_source_health(client.source).cost(),
+        )
+        if len(healthy) > 1 and random.random() < settings.ROUTING_EXPLORE_RATIO:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        # Ejected sources are still the last resort
+        return healthy + [client for client in candidates if client not in healthy]
+
+    async def _call(
+        self,
+        kind: TTaskKind,
+        task_data,
+        call: Callable[[ITaskSourceClient], Awaitable[TaskExternalDTO]],
+    ) -> TaskExternalDTO:
+        ranked = self.rank(kind, getattr(task_data, "model_name", None))
+        for position, client in enumerate(ranked):
+            health = get_source_health(client.source)
+            health.in_flight += 1
+            started = time.perf_counter()
+            try:
+                result = await call(client)
+            except Exception as e:
+                health.observe(time.perf_counter() - started, _is_source_failure(e))
+                if not _is_refused(e) or position == len(ranked) - 1:
+                    routed_calls.labels(client.source.value, kind, "error").inc()
+                    raise
+                routed_calls.labels(client.source.value, kind, "failover").inc()
+                logger.warning(f"{client.source.value} refused {kind} task, failing over: {e!r}")
+                continue
+            else:
+                health.observe(time.perf_counter() - started, False)
+            finally:
+                health.in_flight -= 1
+            routed_calls.labels(client.source.value, kind, "success").inc()
+            return result
+
+    async def create_task_text2video(self, task_data) -> TaskExternalDTO:
+        return await self._call(
+            "text2video", task_data, lambda client: client.create_task_text2video(task_data)
+        )
+
+    async def create_task_image2video(self, task_data, image, image_tail) -> TaskExternalDTO:
+        return await self._call(
+            "image2video", task_data, lambda client: client.create_task_image2video(task_data, image, image_tail)
+        )
+
+    async def create_task_multiimage2video(self, task_data, images) -> TaskExternalDTO:
+        return await self._call(
+            "multiimage2video", task_data, lambda client: client.create_task_multiimage2video(task_data, images)
+        )
@@ -0,0 +1,219 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+import aiohttp
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.core.config import settings
+from src.tasks.domain.dtos import TaskExternalDTO
+from src.tasks.domain.entities import TaskKind
+from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient, TTaskKind
+
+T = TypeVar("T")
+
+admission_wait = Histogram(
+    "provider_admission_wait_seconds",
+    "Time a provider call waited for a rate limit token and a concurrency slot",
+    ["limiter"],
+)
+throttled_calls = Counter(
+    "provider_throttled_total",
+    "Provider calls rejected with 429",
+    ["limiter"],
+)
+limiter_rate = Gauge("provider_limiter_rate", "Current admitted calls per second", ["limiter"])
+limiter_concurrency = Gauge("provider_limiter_concurrency", "Current concurrency slots", ["limiter"])
+
+
+class AdmissionTimeoutError(asyncio.TimeoutError):
+    def __init__(self, limiter: str):
+        super().__init__(f"No {limiter} capacity within {settings.SCHEDULER_MAX_WAIT}s")
+        self.limiter = limiter
+
+
+class AdaptiveLimiter:
+    """Token bucket plus concurrency slots, shrunk on 429 and regrown on success (AIMD).
+
+    Waiters are admitted in arrival order: the head of the queue holds the lock while
+    it waits for a token or a free slot.
+    """
+
+    def __init__(self, name: str, rate: float | None, concurrency: int | None):
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.max_concurrency = concurrency
+        self.concurrency = concurrency
+        self._tokens = 1.0
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._successes = 0
+        self._lock = asyncio.Lock()
+        self._released = asyncio.Event()
+        self._report()
+
+    def _report(self) -> None:
+        if self.rate is not None:
+            limiter_rate.labels(self.name).set(self.rate)
+        if self.concurrency is not None:
+            limiter_concurrency.labels(self.name).set(self.concurrency)
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            self._tokens = 1.0
+        else:
+            # Bursts are capped at one second worth of tokens
+            self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.concurrency is not None and self._in_flight >= self.concurrency:
+                    self._released.clear()
+                    await self._released.wait()
+                elif now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                elif self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                else:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._released.set()
+
+    def on_success(self) -> None:
+        if self.rate is not None:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * settings.SCHEDULER_RATE_INCREASE)
+        if self.concurrency is not None:
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self._report()
+
+    def on_throttled(self, retry_after: float | None) -> None:
+        throttled_calls.labels(self.name).inc()
+        if self.rate is not None:
+            self.rate = max(self.max_rate * settings.SCHEDULER_MIN_RATE_FRACTION, self.rate / 2)
+            self._tokens = 0.0
+        if self.concurrency is not None:
+            self.concurrency = max(1, self.concurrency // 2)
+            self._successes = 0
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.warning(f"{self.name} throttled, limiting to {self.rate}/s and {self.concurrency} concurrent calls")
+        self._report()
+
+
+class AdmissionScheduler:
+    """Process-wide limiters per provider and per provider model"""
+
+    def __init__(self):
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+
+    def _get_limiter(self, name: str, rate: float | None, concurrency: int | None) -> AdaptiveLimiter | None:
+        if rate is None and concurrency is None:
+            return None
+        if name not in self._limiters:
+            self._limiters[name] = AdaptiveLimiter(name, rate, concurrency)
+        return self._limiters[name]
+
+    def get_limiters(self, provider: str, model: str | None) -> list[AdaptiveLimiter]:
+        # Always acquired model first, so two calls never wait on each other's limiters
+        names = [f"{provider}:{model}"] if model else []
+        names.append(provider)
+        limiters = [
+            self._get_limiter(
+                name, settings.PROVIDER_RATE_LIMITS.get(name), settings.PROVIDER_CONCURRENCY_LIMITS.get(name)
+            )
+            for name in names
+        ]
+        return [limiter for limiter in limiters if limiter is not None]
+
+    @asynccontextmanager
+    async def admit(self, provider: str, model: str | None) -> AsyncIterator[list[AdaptiveLimiter]]:
+        limiters = self.get_limiters(provider, model)
+        async with AsyncExitStack() as stack:
+            for limiter in limiters:
+                started = time.perf_counter()
+                try:
+                    async with asyncio.timeout(settings.SCHEDULER_MAX_WAIT):
+                        await limiter.acquire()
+                except TimeoutError:
+                    raise AdmissionTimeoutError(limiter.name) from None
+                stack.callback(limiter.release)
+                admission_wait.labels(limiter.name).observe(time.perf_counter() - started)
+            yield limiters
+
+
+scheduler = AdmissionScheduler()
+
+
+def _get_retry_after(error: aiohttp.ClientResponseError) -> float | None:
+    try:
+        return float(error.headers["Retry-After"]) if error.headers else None
+    except (KeyError, ValueError):
+        return None
+
+
+class ScheduledTaskSourceClient(ITaskSourceClient):
+    """Admits task creation calls through the provider limiters, queueing instead of
+    firing over the limit, and retries calls the provider rejected with 429.
+    """
+
+    def __init__(self, client: ITaskSourceClient, admission: AdmissionScheduler = scheduler):
+        self.client = client
+        self.source = client.source
+        self.webhook_domain = getattr(client, "webhook_domain", None)
+        self.admission = admission
+
+    def supports(self, kind: TTaskKind, model_name: str | None) -> bool:
+        return self.client.supports(kind, model_name)
+
+    async def _call(self, model: str | None, func: Callable[..., Awaitable[T]], *args) -> T:
+        for attempt in range(settings.SCHEDULER_THROTTLED_RETRIES + 1):
+            async with self.admission.admit(self.source.value, model) as limiters:
+                try:
+                    result = await func(*args)
+                except aiohttp.ClientResponseError as e:
+                    if e.status != 429:
+                        raise
+                    for limiter in limiters:
+                        limiter.on_throttled(_get_retry_after(e))
+                    if attempt == settings.SCHEDULER_THROTTLED_RETRIES:
+                        raise
+                    continue
+                for limiter in limiters:
+                    limiter.on_success()
+                return result
+
+    async def create_task_text2video(self, task_data) -> TaskExternalDTO:
+        return await self._call(
+            getattr(task_data, "model_name", None), self.client.create_task_text2video, task_data
+        )
+
+    async def create_task_image2video(self, task_data, image, image_tail) -> TaskExternalDTO:
+        return await self._call(
+            getattr(task_data, "model_name", None), self.client.create_task_image2video, task_data, image, image_tail
+        )
+
+    async def create_task_multiimage2video(self, task_data, images) -> TaskExternalDTO:
+        return await self._call(
+            getattr(task_data, "model_name", None), self.client.create_task_multiimage2video, task_data, images
+        )
+
+    async def process_task_callback(self, data: dict) -> AsyncIterator[bytes] | None:
+        return await self.client.process_task_callback(data)
+
+    async def query_task(self, external_id: str, kind: TaskKind | None) -> dict | None:
+        return await self.client.query_task(external_id, kind)
@@ -1,40 +1,185 @@
 import asyncio
-import logging
-from loguru import logger
+import time
 from socket import AF_INET
+from types import SimpleNamespace
 
 import aiohttp
 from aiohttp.client import _RequestOptions
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
 
+from src.core.config import settings
 from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient
 
-SIZE_POOL_AIOHTTP = 100
-
-
-class AiohttpClient(IAsyncHttpClient[aiohttp.ClientResponse]):
-    aiohttp_client: aiohttp.ClientSession | None = None
-    log = logger.bind(name="http")
-
-    @classmethod
-    def get_aiohttp_client(cls) -> aiohttp.ClientSession:
-        if cls.aiohttp_client is None:
-            timeout = aiohttp.ClientTimeout(total=60)
+http_pool_connections = Gauge(
+    "http_pool_connections",
+    "Connections of the HTTP pool: in_use, idle or limit",
+    ["pool", "state"],
+)
+http_pool_connects = Counter(
+    "http_pool_connects_total",
+    "Connections handed out by the HTTP pool: created or reused",
+    ["pool", "outcome"],
+)
+http_pool_wait = Histogram(
+    "http_pool_wait_seconds",
+    "Time requests queued for a free HTTP pool connection",
+    ["pool"],
+)
+
+
+class HttpPool:
+    """A tuned aiohttp session for one kind of traffic, opened and closed by the app lifespan.
+
+    Outside the app, e.g. in scripts, the session is created on first use.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        limit_per_host: int,
+        timeout: aiohttp.ClientTimeout,
+        keepalive_timeout: float,
+        prewarm_urls: list[str] | None = None,
+    ):
+        self.name = name
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.prewarm_urls = prewarm_urls or []
+        self.session: aiohttp.ClientSession | None = None
+        self._prewarm_task: asyncio.Task | None = None
+
+        http_pool_connections.labels(name, "in_use").set_function(lambda: self._count_connections()[0])
+        http_pool_connections.labels(name, "idle").set_function(lambda: self._count_connections()[1])
+        http_pool_connections.labels(name, "limit").set(limit)
+
+    def _count_connections(self) -> tuple[int, int]:
+        if self.session is None or self.session.closed:
+            return 0, 0
+        # aiohttp doesn't expose these counts, its private attributes are read with defaults
+        # so a release that renames them only zeroes the gauges instead of failing the scrape
+        connector = self.session.connector
+        acquired = getattr(connector, "_acquired", ())
+        idle = getattr(connector, "_conns", {})
+        return len(acquired), sum(len(conns) for conns in idle.values())
+
+    def _make_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_queued_start(session, ctx: SimpleNamespace, params) -> None:
+            ctx.queued_at = time.monotonic()
+
+        async def on_queued_end(session, ctx: SimpleNamespace, params) -> None:
+            http_pool_wait.labels(self.name).observe(time.monotonic() - ctx.queued_at)
+
+        async def on_create_end(session, ctx: SimpleNamespace, params) -> None:
+            http_pool_connects.labels(self.name, "created").inc()
+
+        async def on_reuseconn(session, ctx: SimpleNamespace, params) -> None:
+            http_pool_connects.labels(self.name, "reused").inc()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuseconn)
+        return trace_config
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
             connector = aiohttp.TCPConnector(
                 family=AF_INET,
-                limit_per_host=SIZE_POOL_AIOHTTP,
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=self.keepalive_timeout,
             )
-            cls.aiohttp_client = aiohttp.ClientSession(
-                timeout=timeout,
+            self.session = aiohttp.ClientSession(
+                timeout=self.timeout,
                 connector=connector,
+                trace_configs=[self._make_trace_config()],
             )
+        return self.session
+
+    async def open(self) -> None:
+        self.get_session()
+        if self.prewarm_urls and settings.HTTP_PREWARM_CONNECTIONS:
+            self._prewarm_task = asyncio.create_task(self._prewarm())
+
+    async def _prewarm(self) -> None:
+        """Resolves and connects to the known hosts ahead of the first request"""
+        async def connect(url: str) -> None:
+            try:
+                async with self.session.head(url, timeout=aiohttp.ClientTimeout(total=10)):
+                    pass
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Can't prewarm {self.name} pool connection to {url}: {e!r}")
+
+        await asyncio.gather(
+            *(connect(url) for url in self.prewarm_urls for _ in range(settings.HTTP_PREWARM_CONNECTIONS))
+        )
+        logger.debug(f"Prewarmed {self.name} pool connections to {self.prewarm_urls}")
+
+    async def close(self) -> None:
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+http_pools = {
+    # Short JSON calls to the generation APIs, connections to a few hosts kept warm
+    "provider": HttpPool(
+        "provider",
+        limit=settings.HTTP_PROVIDER_POOL_SIZE,
+        limit_per_host=settings.HTTP_PROVIDER_POOL_SIZE,
+        timeout=aiohttp.ClientTimeout(total=settings.HTTP_PROVIDER_TIMEOUT),
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        prewarm_urls=settings.HTTP_PREWARM_URLS,
+    ),
+    # Result downloads and storage uploads, long streams bounded by read stalls, not total time
+    "cdn": HttpPool(
+        "cdn",
+        limit=settings.HTTP_CDN_POOL_SIZE,
+        limit_per_host=settings.HTTP_CDN_HOST_POOL_SIZE,
+        timeout=aiohttp.ClientTimeout(
+            total=None, connect=settings.HTTP_CONNECT_TIMEOUT, sock_read=settings.HTTP_CDN_READ_TIMEOUT
+        ),
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+    ),
+    # Client webhooks, many hosts with a few connections each
+    "webhook": HttpPool(
+        "webhook",
+        limit=settings.WEBHOOK_CONCURRENCY,
+        limit_per_host=settings.WEBHOOK_HOST_CONCURRENCY,
+        timeout=aiohttp.ClientTimeout(total=settings.WEBHOOK_TIMEOUT),
+        keepalive_timeout=settings.HTTP_WEBHOOK_KEEPALIVE_TIMEOUT,
+    ),
+}
+
+
+async def open_http_pools() -> None:
+    for pool in http_pools.values():
+        await pool.open()
+
+
+async def close_http_pools() -> None:
+    for pool in http_pools.values():
+        await pool.close()
 
-        return cls.aiohttp_client
+
+class AiohttpClient(IAsyncHttpClient[aiohttp.ClientResponse]):
+    """Sends through the provider pool. Callers release responses, best with `async with response`"""
+
+    pool = "provider"
+    log = logger.bind(name="http")
 
     @classmethod
-    async def close_aiohttp_client(cls) -> None:
-        if cls.aiohttp_client:
-            await cls.aiohttp_client.close()
-            cls.aiohttp_client = None
+    def get_aiohttp_client(cls) -> aiohttp.ClientSession:
+        return http_pools[cls.pool].get_session()
 
     @classmethod
     async def get(cls, url: str, **kwargs: _RequestOptions) -> aiohttp.ClientResponse:
@@ -44,6 +189,14 @@ class AiohttpClient(IAsyncHttpClient[aiohttp.ClientResponse]):
         response = await client.get(url, **kwargs)
         return response
 
+    @classmethod
+    async def head(cls, url: str, **kwargs: _RequestOptions) -> aiohttp.ClientResponse:
+        client = cls.get_aiohttp_client()
+
+        cls.log.debug(f"Started HEAD: {url}")
+        response = await client.head(url, **kwargs)
+        return response
+
     @classmethod
     async def post(cls, url: str, **kwargs: _RequestOptions) -> aiohttp.ClientResponse:
         client = cls.get_aiohttp_client()
@@ -75,3 +228,11 @@ class AiohttpClient(IAsyncHttpClient[aiohttp.ClientResponse]):
         cls.log.debug(f"Started PATCH: {url}")
         response = await client.patch(url, **kwargs)
         return response
+
+
+class CdnHttpClient(AiohttpClient):
+    pool = "cdn"
+
+
+class WebhookHttpClient(AiohttpClient):
+    pool = "webhook"
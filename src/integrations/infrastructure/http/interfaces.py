@@ -9,6 +9,10 @@ class IAsyncHttpClient(abc.ABC, Generic[TResponse]):
     @abc.abstractmethod
     async def get(cls, url: str, **kwargs) -> TResponse: ...
 
+    @classmethod
+    @abc.abstractmethod
+    async def head(cls, url: str, **kwargs) -> TResponse: ...
+
     @classmethod
     @abc.abstractmethod
     async def post(cls, url: str, **kwargs) -> TResponse: ...
@@ -0,0 +1,205 @@
+import asyncio
+import random
+import time
+from enum import IntEnum
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit
+
+import aiohttp
+from loguru import logger
+from prometheus_client import Counter, Gauge
+
+from src.core.config import settings
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+http_attempts = Counter(
+    "http_client_attempts_total",
+    "Outgoing request attempts by outcome: success, retry, error or rejected by an open circuit",
+    ["host", "outcome"],
+)
+retry_budget_exhausted = Counter(
+    "http_client_retry_budget_exhausted_total",
+    "Retries skipped because the host retry budget was spent",
+    ["host"],
+)
+circuit_state = Gauge(
+    "http_client_circuit_state",
+    "Circuit breaker state per host: 0 closed, 1 half-open, 2 open",
+    ["host"],
+)
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    def __init__(self, host: str):
+        super().__init__(f"Circuit breaker for {host} is open")
+        self.host = host
+
+
+class CircuitState(IntEnum):
+    closed = 0
+    half_open = 1
+    open = 2
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single probe through once reset_timeout passed"""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        circuit_state.labels(host).set(self.state)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit breaker for {self.host}: {self.state.name} -> {state.name}")
+        self.state = state
+        circuit_state.labels(self.host).set(state)
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected without trying"""
+        if self.state == CircuitState.open:
+            return time.monotonic() - self._opened_at < settings.HTTP_BREAKER_RESET_TIMEOUT
+        return self.state == CircuitState.half_open and self._probing
+
+    def before_call(self) -> None:
+        if self.state == CircuitState.open:
+            if time.monotonic() - self._opened_at < settings.HTTP_BREAKER_RESET_TIMEOUT:
+                raise CircuitOpenError(self.host)
+            self._set_state(CircuitState.half_open)
+        if self.state == CircuitState.half_open:
+            if self._probing:
+                raise CircuitOpenError(self.host)
+            self._probing = True
+
+    def on_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        self._set_state(CircuitState.closed)
+
+    def release(self) -> None:
+        """Ends a call that neither succeeded nor failed, e.g. a cancelled one, so another can probe"""
+        self._probing = False
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self.state == CircuitState.half_open or self._failures >= settings.HTTP_BREAKER_FAILURE_THRESHOLD:
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.open)
+
+
+class RetryBudget:
+    """Every request earns a fraction of a retry, so retries stay a bounded share of traffic"""
+
+    def __init__(self, host: str):
+        self.host = host
+        self._tokens = float(settings.HTTP_RETRY_BUDGET_BURST)
+
+    def deposit(self) -> None:
+        self._tokens = min(settings.HTTP_RETRY_BUDGET_BURST, self._tokens + settings.HTTP_RETRY_BUDGET_RATIO)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1:
+            retry_budget_exhausted.labels(self.host).inc()
+            return False
+        self._tokens -= 1
+        return True
+
+
+class HostResilience:
+    def __init__(self, host: str):
+        self.host = host
+        self.breaker = CircuitBreaker(host)
+        self.budget = RetryBudget(host)
+
+
+_hosts: dict[str, HostResilience] = {}
+
+
+def get_host_resilience(url: str) -> HostResilience:
+    host = urlsplit(str(url)).netloc
+    if host not in _hosts:
+        _hosts[host] = HostResilience(host)
+    return _hosts[host]
+
+
+def _get_backoff(attempt: int, retry_after: str | None) -> float:
+    # Full jitter, unless the server said when to come back
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), settings.HTTP_RETRY_MAX_DELAY)
+    return random.uniform(0, min(settings.HTTP_RETRY_MAX_DELAY, settings.HTTP_RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def send_with_retries(
+    method: str,
+    url: str,
+    send: Callable[[], Awaitable[aiohttp.ClientResponse]],
+    idempotent: bool | None = None,
+    rewind: Callable[[], object] | None = None,
+) -> aiohttp.ClientResponse:
+    """Sends a request through the host circuit breaker, retrying transient failures.
+
+    Idempotent requests are retried on connection errors, timeouts and RETRYABLE_STATUSES.
+    Others are retried only when the connection was never established, so the server
+    can't have acted on them; 429s of task submissions are left to the admission scheduler.
+    Returns the last response as is, callers still check its status.
+    """
+    resilience = get_host_resilience(url)
+    host = resilience.host
+    idempotent = method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent
+    resilience.budget.deposit()
+
+    attempt = 0
+    while True:
+        last_attempt = attempt + 1 >= settings.HTTP_RETRY_MAX_ATTEMPTS
+        try:
+            resilience.breaker.before_call()
+        except CircuitOpenError:
+            http_attempts.labels(host, "circuit_open").inc()
+            raise
+
+        retry_after = None
+        try:
+            response = await send()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            resilience.breaker.on_failure()
+            retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+            if last_attempt or not retryable or not resilience.budget.withdraw():
+                http_attempts.labels(host, "error").inc()
+                raise
+            logger.warning(f"{method} {url} failed on attempt {attempt + 1}: {e!r}")
+        except asyncio.CancelledError:
+            resilience.breaker.release()
+            raise
+        except Exception:
+            resilience.breaker.on_failure()
+            http_attempts.labels(host, "error").inc()
+            raise
+        else:
+            if response.status not in RETRYABLE_STATUSES:
+                resilience.breaker.on_success()
+                http_attempts.labels(host, "success").inc()
+                return response
+
+            if response.status == 429:
+                # The host is up, it just wants less traffic
+                resilience.breaker.on_success()
+            else:
+                resilience.breaker.on_failure()
+            if last_attempt or not idempotent or not resilience.budget.withdraw():
+                http_attempts.labels(host, "error").inc()
+                return response
+            retry_after = response.headers.get("Retry-After")
+            response.release()
+            logger.warning(f"{method} {url} returned {response.status} on attempt {attempt + 1}")
+
+        http_attempts.labels(host, "retry").inc()
+        await asyncio.sleep(_get_backoff(attempt, retry_after))
+        if rewind is not None:
+            rewind()
+        attempt += 1
@@ -8,6 +8,7 @@ from urllib.parse import urljoin
 
 from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient
 from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient, TResponse
+from src.integrations.infrastructure.http.resilience import send_with_retries
 
 
 class AuthMixin:
@@ -17,6 +18,9 @@ class AuthMixin:
     def auth_headers(self):
         return {"Authorization": f'Bearer {self.token}'}
 
+    async def get_auth_headers(self) -> dict:
+        return self.auth_headers
+
 
 class APIClientService(AuthMixin):
     def __init__(
@@ -27,7 +31,7 @@ class APIClientService(AuthMixin):
     ):
         self.client = client
         self.source_url = source_url
-        self.headers = {**(headers or {}), **self.auth_headers}
+        self.headers = headers or {}
 
     async def request(
         self,
@@ -36,29 +40,54 @@ class APIClientService(AuthMixin):
         json: dict | None = None,
         params: dict | None = None,
         headers: dict | None = None,
+        idempotent: bool | None = None,
         **kwargs
     ) -> aiohttp.ClientResponse:
+        """Sends the request with retries, see send_with_retries.
+
+        Set idempotent=True for non-GET calls that are safe to repeat, e.g. file uploads.
+        """
         headers = headers or {}
         request_params = {
             "url": urljoin(self.source_url, endpoint),
-            "headers": {**self.headers, **headers},
+            "headers": {**self.headers, **await self.get_auth_headers(), **headers},
             "json": json, "params": params, **kwargs
         }
         logger.debug(request_params["headers"])
+        rewind = None
+        data = kwargs.get("data")
+        if hasattr(data, "seek"):
+            position = data.tell()
+            rewind = lambda: data.seek(position)
+
+        response = await send_with_retries(
+            method,
+            request_params["url"],
+            lambda: self._send(method, request_params),
+            idempotent=idempotent,
+            rewind=rewind,
+        )
+        if not response.ok:
+            async with response:
+                logger.warning(f"Error occured on api request: {await response.text()}")
+                response.raise_for_status()
+        logger.debug(f"Get api response to {endpoint}: {response}")
+        return response
+
+    async def request_json(self, *args, **kwargs):
+        """Sends the request like request() and reads its JSON body, releasing the connection either way"""
+        async with await self.request(*args, **kwargs) as response:
+            return await response.json()
+
+    async def _send(self, method: str, request_params: dict) -> aiohttp.ClientResponse:
         if method == "GET":
-            response = await self.client.get(**request_params)
+            return await self.client.get(**request_params)
         elif method == "POST":
-            response = await self.client.post(**request_params)
+            return await self.client.post(**request_params)
         elif method == "PUT":
-            response = await self.client.put(**request_params)
+            return await self.client.put(**request_params)
         elif method == "DELETE":
-            response = await self.client.delete(**request_params)
+            return await self.client.delete(**request_params)
         elif method == "PATCH":
-            response = await self.client.patch(**request_params)
-        else:
-            raise ValueError("Method not supported")
-        if not response.ok:
-            logger.warning(f"Error occured on api request: {await response.text()}")
-            response.raise_for_status()
-        logger.debug(f"Get api response to {endpoint}: {response}")
-        return response
+            return await self.client.patch(**request_params)
+        raise ValueError("Method not supported")
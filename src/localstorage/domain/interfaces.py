@@ -1,13 +1,61 @@
 import abc
 import io
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator
+
+from src.tasks.domain.entities import StoredFile
 
 
 class IStorageRepository(abc.ABC):
     @abc.abstractmethod
     def put_file(self, filename: str, file_body: io.BytesIO) -> None: ...
 
+    @abc.abstractmethod
+    async def put_file_stream(
+        self, filename: str, chunks: AsyncIterable[bytes]
+    ) -> None: ...
+
     @abc.abstractmethod
     def read_file(self, filename: str) -> io.BytesIO: ...
 
     @abc.abstractmethod
     def delete_file(self, filename: str) -> None: ...
+
+
+class IAsyncStorageRepository(abc.ABC):
+    @abc.abstractmethod
+    async def put_file_stream(
+        self, filename: str, chunks: AsyncIterable[bytes]
+    ) -> None: ...
+
+    @abc.abstractmethod
+    def read_file_stream(self, filename: str) -> AsyncIterator[bytes]: ...
+
+    @abc.abstractmethod
+    async def get_file_path(self, filename: str) -> Path: ...
+
+    @abc.abstractmethod
+    async def get_download_url(self, filename: str) -> str | None:
+        """URL clients can fetch the file from directly, None if it is served by the app"""
+
+    @abc.abstractmethod
+    async def delete_file(self, filename: str) -> None: ...
+
+    @abc.abstractmethod
+    async def touch_file(self, filename: str) -> None:
+        """Record an access for least-recently-used eviction"""
+
+    @abc.abstractmethod
+    async def scan_shard(self, shard: str) -> list[StoredFile]: ...
+
+    @abc.abstractmethod
+    async def compact_shard(self, shard: str) -> int:
+        """Drop unreferenced data in the shard and return the bytes still in use"""
+
+    @abc.abstractmethod
+    async def compact_temp(self) -> int:
+        """Drop writes abandoned by a crash or cancellation and return how many"""
+
+    @abc.abstractmethod
+    async def migrate_legacy_files(self) -> int:
+        """Move files stored in an older layout into the current one and return how many"""
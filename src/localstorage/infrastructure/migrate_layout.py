@@ -0,0 +1,69 @@
+"""Moves results from the legacy flat LOCAL_STORAGE_PATH layout into blobs/ and tasks/.
+
+Safe to run while the app is serving: reads fall back to the flat file until it is
+linked into the new layout, and a result written by the app in the meantime is never
+overwritten by the migrated copy.
+
+    python -m src.localstorage.infrastructure.migrate_layout [--batch-size 500] [--pause 0.5] [--gc]
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from src.core.config import settings
+from src.localstorage.infrastructure.repository import LocalStorageRepository
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.RESULT_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def migrate_flat_layout(
+    repository: LocalStorageRepository, batch_size: int = 500, pause: float = 0.5
+) -> int:
+    migrated = 0
+    with os.scandir(repository.storage_path) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                continue
+            legacy_path = Path(entry.path)
+            try:
+                digest = _hash_file(legacy_path)
+                if not repository.link_blob(legacy_path, digest, entry.name, replace=False):
+                    # The app already stored a newer result in the new layout
+                    legacy_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Can't migrate {legacy_path}: {e}")
+                continue
+
+            migrated += 1
+            if migrated % batch_size == 0:
+                logger.info(f"Migrated {migrated} files")
+                time.sleep(pause)
+    return migrated
+
+
+def collect_orphan_blobs(repository: LocalStorageRepository) -> int:
+    return sum(repository.compact_shard(f"{prefix:02x}") for prefix in range(256))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.5, help="Seconds to sleep between batches")
+    parser.add_argument("--gc", action="store_true", help="Also remove blobs no task links to")
+    args = parser.parse_args()
+
+    repository = LocalStorageRepository()
+    logger.info(f"Migrated {migrate_flat_layout(repository, args.batch_size, args.pause)} files")
+    if args.gc:
+        logger.info(f"Removed orphan blobs, {collect_orphan_blobs(repository)} bytes still in use")
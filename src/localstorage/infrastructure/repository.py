@@ -1,29 +1,338 @@
 from src.core.config import settings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Callable, Iterator, TypeVar
+import asyncio
+import hashlib
 import io
+import os
+import time
+import uuid
 
-from src.tasks.domain.interfaces.task_result_storage import ITaskStorageRepository
-from src.localstorage.domain.exceptions import FileNotFoundError
+from src.tasks.domain.interfaces.task_result_storage import (
+    IAsyncLocalTaskStorageRepository,
+    ITaskStorageRepository,
+)
+from src.localstorage.domain.exceptions import FileNotFoundError as StorageFileNotFoundError
+from src.tasks.domain.entities import StoredFile
+
+T = TypeVar("T")
+
+
+class BlobWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = open(path, "wb", buffering=settings.LOCAL_STORAGE_WRITE_BUFFER)
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        self.hash.update(data)
+        self.file.write(data)
 
 
 class LocalStorageRepository(ITaskStorageRepository):
+    """Content-addressed local store.
+
+    Layout under LOCAL_STORAGE_PATH:
+        blobs/ab/cd/<sha256>      file contents, one per distinct digest
+        tasks/ef/01/<filename>    hardlink to the blob, sharded by sha256(filename)
+        tmp/                      in-progress writes
+        <filename>                legacy flat layout, still readable until migrated
+    """
     storage_path = Path(settings.LOCAL_STORAGE_PATH)
 
+    @property
+    def blobs_path(self) -> Path:
+        return self.storage_path / "blobs"
+
+    @property
+    def tasks_path(self) -> Path:
+        return self.storage_path / "tasks"
+
+    @property
+    def temp_path(self) -> Path:
+        return self.storage_path / "tmp"
+
+    @staticmethod
+    def _shard(path: Path, key: str) -> Path:
+        return path / key[:2] / key[2:4]
+
+    def get_blob_path(self, digest: str) -> Path:
+        return self._shard(self.blobs_path, digest) / digest
+
+    def get_task_path(self, filename: str) -> Path:
+        key = hashlib.sha256(filename.encode()).hexdigest()
+        return self._shard(self.tasks_path, key) / filename
+
+    def get_legacy_path(self, filename: str) -> Path:
+        return self.storage_path / filename
+
     def put_file(self, filename: str, file_body: io.BytesIO) -> None:
-        with open(self.storage_path / filename, 'wb') as f:
-            while True:
-                chunk = file_body.read(1024)
-                if not chunk:
-                    break
-                f.write(chunk)
+        writer = self.open_temp(filename)
+        try:
+            while chunk := file_body.read(settings.RESULT_CHUNK_SIZE):
+                writer.write(chunk)
+            self.commit_temp(writer, filename)
+        except BaseException:
+            self.discard_temp(writer)
+            raise
+
+    async def put_file_stream(self, filename: str, chunks: AsyncIterable[bytes]) -> None:
+        writer = self.open_temp(filename)
+        try:
+            async for chunk in chunks:
+                writer.write(chunk)
+            self.commit_temp(writer, filename)
+        except BaseException:
+            self.discard_temp(writer)
+            raise
 
     def read_file(self, filename: str) -> io.BytesIO:
-        if not (self.storage_path / filename).exists():
-            raise FileNotFoundError(filename)
-        with open(self.storage_path / filename, "rb") as f:
+        with self.open_file(filename) as f:
             return io.BytesIO(f.read())
 
+    def get_file_path(self, filename: str) -> Path:
+        for path in (self.get_task_path(filename), self.get_legacy_path(filename)):
+            if path.is_file():
+                return path
+        raise StorageFileNotFoundError(filename)
+
+    def open_file(self, filename: str) -> BinaryIO:
+        try:
+            return open(self.get_file_path(filename), "rb")
+        except OSError:
+            raise StorageFileNotFoundError(filename)
+
     def delete_file(self, filename: str) -> None:
-        if not (self.storage_path / filename).exists():
-            raise FileNotFoundError(filename)
-        (self.storage_path / filename).unlink()
+        deleted = False
+        for path in (self.get_task_path(filename), self.get_legacy_path(filename)):
+            try:
+                path.unlink()
+                deleted = True
+            except OSError:
+                pass
+        if not deleted:
+            raise StorageFileNotFoundError(filename)
+
+    def open_temp(self, filename: str) -> BlobWriter:
+        # Inside the storage directory, so the final links never cross filesystems
+        self.temp_path.mkdir(parents=True, exist_ok=True)
+        return BlobWriter(self.temp_path / f"{filename}.{uuid.uuid4().hex}.tmp")
+
+    def commit_temp(self, writer: BlobWriter, filename: str) -> None:
+        writer.file.flush()
+        if settings.LOCAL_STORAGE_FSYNC != "never":
+            os.fsync(writer.file.fileno())
+        writer.file.close()
+        try:
+            self.link_blob(writer.path, writer.hash.hexdigest(), filename)
+        finally:
+            writer.path.unlink(missing_ok=True)
+
+    def discard_temp(self, writer: BlobWriter) -> None:
+        writer.file.close()
+        writer.path.unlink(missing_ok=True)
+
+    def link_blob(self, source: Path, digest: str, filename: str, replace: bool = True) -> bool:
+        """Store source as blob `digest` (unless it is already there) and point filename at it"""
+        blob_path = self.get_blob_path(digest)
+        task_path = self.get_task_path(filename)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        task_path.parent.mkdir(parents=True, exist_ok=True)
+
+        for _ in range(2):
+            try:
+                os.link(source, blob_path)
+            except FileExistsError:
+                pass  # Same content is already stored
+            try:
+                if replace:
+                    self._replace_link(blob_path, task_path)
+                else:
+                    os.link(blob_path, task_path)
+                break
+            except FileNotFoundError:
+                continue  # Blob was collected as an orphan in between, store it again
+            except FileExistsError:
+                return False
+        else:
+            raise StorageFileNotFoundError(filename)
+
+        self.get_legacy_path(filename).unlink(missing_ok=True)
+        if settings.LOCAL_STORAGE_FSYNC == "full":
+            self._fsync_dir(blob_path.parent)
+            self._fsync_dir(task_path.parent)
+        return True
+
+    def touch_file(self, filename: str) -> None:
+        path = self.get_file_path(filename)
+        stat = path.stat()
+        # Explicit atime update: works on noatime/relatime mounts and keeps mtime (and the ETag)
+        if time.time() - stat.st_atime >= settings.LOCAL_STORAGE_ATIME_RESOLUTION:
+            os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+
+    def scan_shard(self, shard: str) -> list[StoredFile]:
+        files = []
+        for entry in self._iter_shard(self.tasks_path / shard):
+            stat = entry.stat(follow_symlinks=False)
+            files.append(StoredFile(
+                filename=entry.name,
+                size=stat.st_size,
+                links=stat.st_nlink,
+                accessed_at=stat.st_atime,
+                modified_at=stat.st_mtime,
+                changed_at=stat.st_ctime,
+            ))
+        return files
+
+    def compact_shard(self, shard: str) -> int:
+        """Delete blobs under blobs/<shard> no task links to anymore, return bytes still in use"""
+        used = 0
+        deadline = time.time() - settings.LOCAL_STORAGE_ORPHAN_GRACE
+        for entry in self._iter_shard(self.blobs_path / shard):
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_nlink == 1 and stat.st_mtime < deadline:
+                Path(entry.path).unlink(missing_ok=True)
+            else:
+                used += stat.st_size
+        return used
+
+    def compact_temp(self) -> int:
+        """Delete writes left in tmp/ longer than the orphan grace, return how many"""
+        # Writes in progress keep their mtime fresh, a stalled download times out long before
+        removed = 0
+        deadline = time.time() - settings.LOCAL_STORAGE_ORPHAN_GRACE
+        if not self.temp_path.is_dir():
+            return removed
+        for entry in os.scandir(self.temp_path):
+            if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < deadline:
+                Path(entry.path).unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def migrate_legacy_files(self) -> int:
+        """Move files of the legacy flat layout under tasks/, return how many"""
+        moved = 0
+        if not self.storage_path.is_dir():
+            return moved
+        for entry in os.scandir(self.storage_path):
+            if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                continue
+            path = Path(entry.path)
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                while chunk := f.read(settings.RESULT_CHUNK_SIZE):
+                    digest.update(chunk)
+            # The file itself becomes the blob unless its content is already stored
+            if not self.link_blob(path, digest.hexdigest(), entry.name, replace=False):
+                path.unlink(missing_ok=True)  # Stored again in the new layout since
+            moved += 1
+        return moved
+
+    @staticmethod
+    def _iter_shard(path: Path) -> Iterator[os.DirEntry]:
+        if not path.is_dir():
+            return
+        for subshard in os.scandir(path):
+            if not subshard.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(subshard.path):
+                if not entry.name.startswith(".") and entry.is_file(follow_symlinks=False):
+                    yield entry
+
+    @staticmethod
+    def _replace_link(source: Path, target: Path) -> None:
+        temp_link = target.with_name(f".{target.name}.{uuid.uuid4().hex}.lnk")
+        os.link(source, temp_link)
+        try:
+            temp_link.replace(target)
+        except BaseException:
+            temp_link.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _fsync_dir(path: Path) -> None:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class AsyncLocalStorageRepository(IAsyncLocalTaskStorageRepository):
+    """Runs LocalStorageRepository file I/O on a bounded thread pool.
+
+    With LOCAL_STORAGE_IO_MODE=sync the same calls run inline on the event loop,
+    which is the behaviour of the plain LocalStorageRepository.
+    """
+    _executor: ThreadPoolExecutor | None = None
+
+    def __init__(
+        self,
+        repository: LocalStorageRepository | None = None,
+        io_mode: str = settings.LOCAL_STORAGE_IO_MODE,
+    ):
+        self.repository = repository or LocalStorageRepository()
+        self.io_mode = io_mode
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=settings.LOCAL_STORAGE_IO_WORKERS,
+                thread_name_prefix="localstorage",
+            )
+        return cls._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self.io_mode == "sync":
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.get_executor(), func, *args)
+
+    async def put_file_stream(self, filename: str, chunks: AsyncIterable[bytes]) -> None:
+        writer = await self._run(self.repository.open_temp, filename)
+        try:
+            buffer = bytearray()
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= settings.LOCAL_STORAGE_WRITE_BUFFER:
+                    await self._run(writer.write, buffer)
+                    buffer.clear()
+            if buffer:
+                await self._run(writer.write, buffer)
+            await self._run(self.repository.commit_temp, writer, filename)
+        except BaseException:
+            await self._run(self.repository.discard_temp, writer)
+            raise
+
+    async def read_file_stream(self, filename: str) -> AsyncIterator[bytes]:
+        f = await self._run(self.repository.open_file, filename)
+        try:
+            while chunk := await self._run(f.read, settings.RESULT_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await self._run(f.close)
+
+    async def get_file_path(self, filename: str) -> Path:
+        return await self._run(self.repository.get_file_path, filename)
+
+    async def get_download_url(self, filename: str) -> str | None:
+        return None
+
+    async def delete_file(self, filename: str) -> None:
+        await self._run(self.repository.delete_file, filename)
+
+    async def touch_file(self, filename: str) -> None:
+        await self._run(self.repository.touch_file, filename)
+
+    async def scan_shard(self, shard: str) -> list[StoredFile]:
+        return await self._run(self.repository.scan_shard, shard)
+
+    async def compact_shard(self, shard: str) -> int:
+        return await self._run(self.repository.compact_shard, shard)
+
+    async def compact_temp(self) -> int:
+        return await self._run(self.repository.compact_temp)
+
+    async def migrate_legacy_files(self) -> int:
+        return await self._run(self.repository.migrate_legacy_files)
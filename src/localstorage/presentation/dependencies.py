@@ -1,6 +1,13 @@
-from src.localstorage.domain.interfaces import IStorageRepository
-from src.localstorage.infrastructure.repository import LocalStorageRepository
+from src.localstorage.domain.interfaces import IAsyncStorageRepository, IStorageRepository
+from src.localstorage.infrastructure.repository import (
+    AsyncLocalStorageRepository,
+    LocalStorageRepository,
+)
 
 
 def get_local_storage_repository() -> IStorageRepository:
     return LocalStorageRepository()
+
+
+def get_async_local_storage_repository() -> IAsyncStorageRepository:
+    return AsyncLocalStorageRepository()
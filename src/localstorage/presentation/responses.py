@@ -0,0 +1,134 @@
+import os
+from email.utils import parsedate_to_datetime
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import (
+    FileResponse,
+    MalformedRangeHeader,
+    PlainTextResponse,
+    RangeNotSatisfiable,
+    Response,
+)
+from starlette.types import Receive, Scope, Send
+
+from src.core.config import settings
+
+
+class ResultFileResponse(FileResponse):
+    """FileResponse for immutable stored results.
+
+    Adds conditional GET (ETag / Last-Modified -> 304), rejects multi-range
+    requests and hands the body to the server through the ASGI zero-copy
+    extensions, or to nginx through X-Accel-Redirect, when those are available.
+    """
+
+    def __init__(self, *args, accel_redirect: str | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.accel_redirect = accel_redirect
+        self.headers.setdefault(
+            "cache-control", f"public, max-age={settings.RESULT_CACHE_MAX_AGE}, immutable"
+        )
+        self._extensions: dict = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._extensions = scope.get("extensions") or {}
+        if self.stat_result is None:
+            try:
+                self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                return await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+            self.set_stat_headers(self.stat_result)
+
+        headers = Headers(scope=scope)
+        if self._is_not_modified(headers):
+            return await Response(status_code=304, headers=self._validator_headers())(scope, receive, send)
+
+        http_range = headers.get("range")
+        if http_range is not None and "," in http_range:
+            return await self._range_not_satisfiable("Multiple ranges are not supported")(scope, receive, send)
+        if http_range is not None and self._is_unsatisfiable(http_range, headers.get("if-range")):
+            return await self._range_not_satisfiable("Range Not Satisfiable")(scope, receive, send)
+
+        if self.accel_redirect is not None:
+            self.headers["x-accel-redirect"] = self.accel_redirect
+            del self.headers["content-length"]
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        await super().__call__(scope, receive, send)
+
+    def _is_not_modified(self, headers: Headers) -> bool:
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = self.headers["etag"]
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat_result.st_mtime) <= since
+        return False
+
+    def _is_unsatisfiable(self, http_range: str, http_if_range: str | None) -> bool:
+        # Starlette answers these itself, but without the unit in Content-Range
+        if http_if_range is not None and not self._should_use_range(http_if_range):
+            return False
+        try:
+            self._parse_range_header(http_range, self.stat_result.st_size)
+        except RangeNotSatisfiable:
+            return True
+        except MalformedRangeHeader:
+            return False
+        return False
+
+    def _range_not_satisfiable(self, content: str) -> Response:
+        return PlainTextResponse(
+            content,
+            status_code=416,
+            headers={"content-range": f"bytes */{self.stat_result.st_size}"},
+        )
+
+    def _validator_headers(self) -> dict[str, str]:
+        return {
+            name: self.headers[name]
+            for name in ("etag", "last-modified", "cache-control")
+            if name in self.headers
+        }
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if send_header_only:
+            return await super()._handle_simple(send, send_header_only)
+        if "http.response.zerocopysend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await self._zerocopysend(send, 0, self.stat_result.st_size)
+        elif "http.response.pathsend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        else:
+            await super()._handle_simple(send, send_header_only)
+
+    async def _handle_single_range(
+        self, send: Send, start: int, end: int, file_size: int, send_header_only: bool
+    ) -> None:
+        if send_header_only or "http.response.zerocopysend" not in self._extensions:
+            return await super()._handle_single_range(send, start, end, file_size, send_header_only)
+        self.headers["content-range"] = f"bytes {start}-{end - 1}/{file_size}"
+        self.headers["content-length"] = str(end - start)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        await self._zerocopysend(send, start, end - start)
+
+    async def _zerocopysend(self, send: Send, offset: int, count: int) -> None:
+        with open(self.path, "rb") as file:
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": file,
+                "offset": offset,
+                "count": count,
+                "more_body": False,
+            })
@@ -1,14 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from sqladmin import Admin
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from src.core.config import settings
+from src.core.middlewares import BodySizeLimitMiddleware
 from src.core.logging_setup import setup_fastapi_logging
 
 from src.db.engine import engine
+from src.integrations.infrastructure.http.aiohttp_client import close_http_pools, open_http_pools
+from src.tasks.infrastructure.event_bus import task_event_bus
 from src.tasks.presentation.admin import TaskAdmin
 from src.tasks.presentation.api import tasks_router
 from src.tasks.presentation.panel import router as tasks_panel_router
+from src.tasks.presentation.workers import start_workers, stop_workers
 
 
 def setup_healthcheck_route(app: FastAPI):
@@ -17,9 +23,24 @@ def setup_healthcheck_route(app: FastAPI):
         return {"status": "ok"}
 
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_http_pools()
+    if settings.TASK_EVENT_BUS:
+        task_event_bus.start()
+    start_workers()
+    yield
+    await stop_workers()
+    await task_event_bus.stop()
+    await close_http_pools()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 setup_fastapi_logging(app)
 setup_healthcheck_route(app)
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.UPLOAD_MAX_REQUEST_SIZE)
+
+Instrumentator().instrument(app).expose(app, endpoint="/__internal_metrics__", include_in_schema=False)
 
 app.include_router(tasks_router, tags=["Task"])
 app.include_router(tasks_panel_router, include_in_schema=False, prefix="/panel")
@@ -0,0 +1,168 @@
+from typing import AsyncIterable, AsyncIterator
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+import aiohttp
+from loguru import logger
+from yarl import URL
+
+from src.core.config import settings
+from src.integrations.infrastructure.http.aiohttp_client import CdnHttpClient
+from src.integrations.infrastructure.http.interfaces import IAsyncHttpClient
+from src.integrations.infrastructure.http.resilience import send_with_retries
+from src.localstorage.domain.exceptions import FileNotFoundError
+from src.s3storage.infrastructure.signer import SigV4Signer
+from src.tasks.domain.entities import StoredFile
+from src.tasks.domain.interfaces.task_result_storage import IAsyncTaskStorageRepository
+
+
+class S3StorageRepository(IAsyncTaskStorageRepository):
+    """Stores results in an S3-compatible bucket, addressed path-style.
+
+    Uploads stream through a single S3_PART_SIZE buffer: results smaller than one
+    part go up with a plain PUT, larger ones with a multipart upload. Requests are
+    retried on transient errors, see send_with_retries. Retention is left to the
+    bucket lifecycle rules, so the shard sweep methods are no-ops.
+    """
+    log = logger.bind(name="s3")
+
+    def __init__(
+        self,
+        client: IAsyncHttpClient = CdnHttpClient,
+        endpoint_url: str = settings.S3_ENDPOINT_URL,
+        public_endpoint_url: str | None = settings.S3_PUBLIC_ENDPOINT_URL,
+        bucket: str | None = settings.S3_BUCKET,
+        key_prefix: str = settings.S3_KEY_PREFIX,
+    ):
+        self.client = client
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.public_endpoint_url = (public_endpoint_url or endpoint_url).rstrip("/")
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+        self.signer = SigV4Signer(
+            settings.S3_ACCESS_KEY_ID, settings.S3_SECRET_ACCESS_KEY, settings.S3_REGION
+        )
+
+    def _object_url(self, filename: str, endpoint_url: str | None = None) -> str:
+        key = quote(self.key_prefix + filename, safe="/-_.~")
+        return f"{endpoint_url or self.endpoint_url}/{self.bucket}/{key}"
+
+    async def _request(
+        self,
+        method: str,
+        filename: str,
+        query: dict[str, str] | None = None,
+        **kwargs,
+    ) -> aiohttp.ClientResponse:
+        url = self._object_url(filename)
+        query = query or {}
+        headers = self.signer.sign_headers(method, url, query, kwargs.pop("headers", None))
+        if query:
+            url += "?" + self.signer.canonical_query(query)
+        method_func = getattr(self.client, method.lower())
+        response = await send_with_retries(
+            method, url, lambda: method_func(URL(url, encoded=True), headers=headers, **kwargs)
+        )
+        if response.status == 404:
+            response.release()
+            raise FileNotFoundError(filename)
+        if not response.ok:
+            async with response:
+                self.log.warning(f"S3 {method} {filename} failed: {await response.text()}")
+                response.raise_for_status()
+        return response
+
+    async def put_file_stream(self, filename: str, chunks: AsyncIterable[bytes]) -> None:
+        buffer = bytearray()
+        upload_id: str | None = None
+        parts: list[tuple[int, str]] = []
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                if len(buffer) >= settings.S3_PART_SIZE:
+                    if upload_id is None:
+                        upload_id = await self._create_multipart_upload(filename)
+                    parts.append(await self._upload_part(filename, upload_id, len(parts) + 1, buffer))
+                    buffer.clear()
+
+            if upload_id is None:
+                async with await self._request(
+                    "PUT", filename, headers={"content-type": "video/mp4"}, data=bytes(buffer)
+                ):
+                    return
+            if buffer:
+                parts.append(await self._upload_part(filename, upload_id, len(parts) + 1, buffer))
+            await self._complete_multipart_upload(filename, upload_id, parts)
+        except BaseException:
+            if upload_id is not None:
+                await self._abort_multipart_upload(filename, upload_id)
+            raise
+
+    async def _create_multipart_upload(self, filename: str) -> str:
+        async with await self._request(
+            "POST", filename, {"uploads": ""}, headers={"content-type": "video/mp4"}
+        ) as response:
+            root = ElementTree.fromstring(await response.read())
+        return root.findtext("{*}UploadId")
+
+    async def _upload_part(self, filename: str, upload_id: str, number: int, body: bytearray) -> tuple[int, str]:
+        async with await self._request(
+            "PUT", filename, {"partNumber": str(number), "uploadId": upload_id}, data=bytes(body)
+        ) as response:
+            return number, response.headers["ETag"]
+
+    async def _complete_multipart_upload(
+        self, filename: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        body = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>" for number, etag in parts
+        )
+        async with await self._request(
+            "POST",
+            filename,
+            {"uploadId": upload_id},
+            data=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        ) as response:
+            # S3 may report a failed completion with 200 and an <Error> body
+            root = ElementTree.fromstring(await response.read())
+        if root.tag.endswith("Error"):
+            raise ValueError(f"Multipart upload of {filename} failed: {root.findtext('{*}Message')}")
+
+    async def _abort_multipart_upload(self, filename: str, upload_id: str) -> None:
+        try:
+            async with await self._request("DELETE", filename, {"uploadId": upload_id}):
+                pass
+        except Exception as e:
+            self.log.warning(f"Can't abort multipart upload of {filename}: {e}")
+
+    async def read_file_stream(self, filename: str) -> AsyncIterator[bytes]:
+        async with await self._request("GET", filename) as response:
+            async for chunk in response.content.iter_chunked(settings.RESULT_CHUNK_SIZE):
+                yield chunk
+
+    async def get_download_url(self, filename: str) -> str | None:
+        # Checked first, a missing result is a 404 rather than a link that fails later
+        async with await self._request("HEAD", filename):
+            pass
+        return self.signer.presign_url(
+            "GET", self._object_url(filename, self.public_endpoint_url), settings.S3_PRESIGN_EXPIRES
+        )
+
+    async def delete_file(self, filename: str) -> None:
+        async with await self._request("DELETE", filename):
+            pass
+
+    async def touch_file(self, filename: str) -> None:
+        pass
+
+    async def scan_shard(self, shard: str) -> list[StoredFile]:
+        return []
+
+    async def compact_shard(self, shard: str) -> int:
+        return 0
+
+    async def compact_temp(self) -> int:
+        return 0
+
+    async def migrate_legacy_files(self) -> int:
+        return 0
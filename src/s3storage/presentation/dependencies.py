@@ -0,0 +1,7 @@
+from src.integrations.infrastructure.http.aiohttp_client import CdnHttpClient
+from src.s3storage.infrastructure.repository import S3StorageRepository
+from src.tasks.domain.interfaces.task_result_storage import IAsyncTaskStorageRepository
+
+
+def get_s3_storage_repository() -> IAsyncTaskStorageRepository:
+    return S3StorageRepository(CdnHttpClient())
@@ -0,0 +1,69 @@
+from loguru import logger
+
+from src.core.config import settings
+from src.tasks.application.use_cases.task_store import TaskResultBuffer, duplicate_callbacks, store_task_result
+from src.tasks.domain.entities import TaskCallbackCreate, TaskSource
+from src.tasks.domain.interfaces.task_result_storage import IAsyncTaskStorageRepository
+from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+
+
+def get_provider_status(data: dict) -> str:
+    # Kling reports task_status, fal reports status
+    return str(data.get("task_status") or data.get("status") or "")
+
+
+async def enqueue_task_callback(task_id: int, data: dict, uow: ITaskUnitOfWork) -> None:
+    """Only persists the provider callback, so the provider gets its answer at once.
+
+    A callback repeating a provider status already received for the task is dropped.
+    """
+    provider_status = get_provider_status(data)
+    async with uow:
+        callback = await uow.callbacks.create(
+            TaskCallbackCreate(task_id=task_id, provider_status=provider_status, payload=data)
+        )
+        await uow.commit()
+    if callback is None:
+        duplicate_callbacks.labels("redelivered").inc()
+        logger.info(f"Dropped redelivered {provider_status!r} callback of task #{task_id}")
+        return
+    logger.info(f"Queued callback #{callback.id} of task #{task_id}")
+
+
+async def handle_task_callback(
+    uow: ITaskUnitOfWork,
+    clients: dict[TaskSource, ITaskSourceClient],
+    storage: IAsyncTaskStorageRepository,
+    buffer: TaskResultBuffer | None = None,
+) -> bool:
+    """Downloads, stores and announces the result of the next due callback, returns False if none is due.
+
+    A callback that keeps failing is dropped after CALLBACK_MAX_ATTEMPTS, the
+    reconciler then polls its task like one whose webhook never came.
+    """
+    async with uow:
+        claimed = await uow.callbacks.claim(1, settings.CALLBACK_LEASE)
+        if claimed:
+            task = await uow.tasks.get_by_pk(claimed[0].task_id)
+        await uow.commit()
+    if not claimed:
+        return False
+
+    callback = claimed[0]
+    try:
+        await store_task_result(task, callback, uow, clients, storage, buffer)
+    except Exception as e:
+        if callback.attempts < settings.CALLBACK_MAX_ATTEMPTS:
+            delay = settings.CALLBACK_RETRY_DELAY * 2 ** (callback.attempts - 1)
+            logger.warning(f"Callback #{callback.id} of task #{callback.task_id} failed, retrying in {delay}s: {e!r}")
+            async with uow:
+                await uow.callbacks.reschedule(callback.id, delay, repr(e))
+                await uow.commit()
+            return True
+        logger.exception(f"Callback #{callback.id} of task #{callback.task_id} failed: {e!r}")
+        # Removed rather than kept as processed, so a redelivery or a poll can try again
+        async with uow:
+            await uow.callbacks.delete(callback.id)
+            await uow.commit()
+    return True
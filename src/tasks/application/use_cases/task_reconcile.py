@@ -0,0 +1,50 @@
+from loguru import logger
+
+from src.core.config import settings
+from src.tasks.application.use_cases.task_callback import enqueue_task_callback
+from src.tasks.application.use_cases.task_webhook import make_webhook_delivery
+from src.tasks.domain.entities import Task, TaskSource
+from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+
+
+async def claim_stale_tasks(uow: ITaskUnitOfWork) -> list[Task]:
+    """Claims the tasks whose webhook is overdue, each poll pushes the next one back"""
+    async with uow:
+        tasks = await uow.tasks.claim_stale_submitted(
+            settings.RECONCILE_BATCH_SIZE,
+            settings.RECONCILE_AFTER,
+            settings.RECONCILE_INTERVAL,
+            settings.RECONCILE_MAX_INTERVAL,
+        )
+        await uow.commit()
+    return tasks
+
+
+async def reconcile_task(
+    task: Task, uow: ITaskUnitOfWork, clients: dict[TaskSource, ITaskSourceClient]
+) -> None:
+    """Asks the provider about a task, a finished one is queued as if its webhook came"""
+    if task.external_id is None:
+        logger.warning(f"Task #{task.id} is submitted without an external id, waiting for its deadline")
+        return
+    client = clients[task.source or TaskSource.fal]
+    data = await client.query_task(task.external_id, task.kind)
+    if data is None:
+        logger.debug(f"Task #{task.id} is still running at {client.source.value}")
+        return
+    logger.info(f"Task #{task.id} finished without a webhook, queueing the polled result")
+    await enqueue_task_callback(task.id, data, uow)
+
+
+async def fail_overdue_tasks(uow: ITaskUnitOfWork) -> int:
+    async with uow:
+        tasks = await uow.tasks.fail_overdue(
+            settings.RECONCILE_DEADLINE, "Task wasn't finished by the provider in time"
+        )
+        for task in tasks:
+            logger.warning(f"Task #{task.id} failed after {settings.RECONCILE_DEADLINE}s in submitted status")
+            if delivery := make_webhook_delivery(task):
+                await uow.webhooks.create(delivery)
+        await uow.commit()
+    return len(tasks)
@@ -0,0 +1,98 @@
+import time
+from loguru import logger
+
+from src.core.config import settings
+from src.tasks.domain.entities import StoredFile, Task
+from src.tasks.domain.interfaces.task_result_storage import IAsyncTaskStorageRepository
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+from src.localstorage.domain.exceptions import FileNotFoundError
+
+RESULT_SHARDS = [f"{i:02x}" for i in range(256)]
+_LOOKUP_BATCH_SIZE = 1000
+
+
+def _get_ttl(task: Task) -> int | None:
+    return settings.RETENTION_APP_TTLS.get(task.app_id, settings.RETENTION_DEFAULT_TTL)
+
+
+def _is_expired(task: Task | None, file: StoredFile, now: float) -> bool:
+    if task is None:
+        # Unknown rather than expired: the task may be committed after its result is stored
+        return now - file.changed_at > settings.LOCAL_STORAGE_ORPHAN_GRACE
+    ttl = _get_ttl(task)
+    if ttl is None:
+        return False
+    # Not the file's mtime, that is its blob's and shared by every task with the same content
+    stored_at = task.finished_at.timestamp() if task.finished_at is not None else file.changed_at
+    return now - stored_at > ttl
+
+
+def _get_freed_bytes(file: StoredFile) -> int:
+    # One link is the blob itself; the data is freed only with the last task link
+    return file.size if file.links <= 2 else 0
+
+
+async def sweep_task_results(
+        shard: str,
+        usage: dict[str, int],
+        uow: ITaskUnitOfWork,
+        storage: IAsyncTaskStorageRepository
+) -> list[int]:
+    if shard == RESULT_SHARDS[0]:
+        # Once per pass over the shards
+        if removed := await storage.compact_temp():
+            logger.info(f"Removed {removed} abandoned result writes")
+        if moved := await storage.migrate_legacy_files():
+            logger.info(f"Moved {moved} task results of the legacy layout")
+    # Blob usage is tracked per shard and includes orphans until their grace period ends
+    usage[shard] = await storage.compact_shard(shard)
+    files = {int(file.filename): file for file in await storage.scan_shard(shard) if file.filename.isdigit()}
+    if not files:
+        return []
+
+    tasks: dict[int, Task] = {}
+    task_ids = list(files)
+    async with uow:
+        for offset in range(0, len(task_ids), _LOOKUP_BATCH_SIZE):
+            batch = await uow.tasks.get_many(task_ids[offset:offset + _LOOKUP_BATCH_SIZE])
+            tasks.update((task.id, task) for task in batch)
+
+    now = time.time()
+    evicted: list[int] = []
+    kept: list[int] = []
+    for task_id, file in files.items():
+        if _is_expired(tasks.get(task_id), file, now):
+            evicted.append(task_id)
+        else:
+            kept.append(task_id)
+
+    # The quota is enforced once every shard has been measured at least once
+    total = sum(usage.values())
+    quota = settings.RETENTION_MAX_TOTAL_BYTES
+    if quota is not None and len(usage) == len(RESULT_SHARDS) and total > quota:
+        # Sampled LRU: free this shard's share of the overflow, least recently accessed first
+        to_free = sum(file.size for file in files.values()) * (total - quota) / total
+        to_free -= sum(_get_freed_bytes(files[task_id]) for task_id in evicted)
+        for task_id in sorted(kept, key=lambda pk: files[pk].accessed_at):
+            if to_free <= 0:
+                break
+            evicted.append(task_id)
+            to_free -= _get_freed_bytes(files[task_id])
+
+    if not evicted:
+        return []
+
+    expired = [task_id for task_id in evicted if task_id in tasks]
+    if expired:
+        async with uow:
+            await uow.tasks.mark_expired(expired)
+            await uow.commit()
+
+    for task_id in evicted:
+        try:
+            await storage.delete_file(str(task_id))
+        except FileNotFoundError:
+            pass
+
+    logger.info(f"Evicted {len(evicted)} task results from shard {shard}")
+    return evicted
@@ -2,9 +2,9 @@ from loguru import logger
 import aiohttp
 
 from src.tasks.domain.dtos import TaskExternalDTO, TaskCreateFromMultiImageDTO
-from src.tasks.domain.entities import TaskStatus, TaskUpdate
+from src.tasks.domain.entities import TaskKind, TaskStatus, TaskUpdate
 from src.tasks.domain.interfaces.task_source_client import (
-    ITaskSourceClient,
+    ITaskCreationClient,
     TImage2Video,
     TTaskResult,
     TText2Video,
@@ -17,7 +17,7 @@ async def run_task_image2video(
     schema: TImage2Video,
     image: TTaskResult,
     image_tail: TTaskResult,
-    client: ITaskSourceClient,
+    client: ITaskCreationClient,
     uow: ITaskUnitOfWork,
 ) -> None:
     try:
@@ -33,6 +33,10 @@ async def run_task_image2video(
         # if e.status != 400:  # Unexpected params, but task still generating
         raise e
         task = None
+    finally:
+        image.close()
+        if image_tail is not None:
+            image_tail.close()
     logger.info(f"Runned image2video task #{task_id}. External Response: {task}")
     async with uow:
         await uow.tasks.update(
@@ -40,13 +44,15 @@ async def run_task_image2video(
             TaskUpdate(
                 status=TaskStatus.submitted,
                 external_id=task.external_id if task else None,
+                source=task.source if task else None,
+                kind=TaskKind.image2video,
             ),
         )
         await uow.commit()
 
 
 async def run_task_text2video(
-    task_id: int, schema: TText2Video, client: ITaskSourceClient, uow: ITaskUnitOfWork
+    task_id: int, schema: TText2Video, client: ITaskCreationClient, uow: ITaskUnitOfWork
 ) -> None:
     try:
         schema.external_task_id = str(task_id)
@@ -66,6 +72,8 @@ async def run_task_text2video(
             TaskUpdate(
                 status=TaskStatus.submitted,
                 external_id=task.external_id if task else None,
+                source=task.source if task else None,
+                kind=TaskKind.text2video,
             ),
         )
         await uow.commit()
@@ -75,7 +83,7 @@ async def run_task_multiimage2video(
     task_id: int,
     schema: TaskCreateFromMultiImageDTO,
     images: list[TTaskResult],
-    client: ITaskSourceClient,
+    client: ITaskCreationClient,
     uow: ITaskUnitOfWork,
 ) -> None:
     try:
@@ -91,6 +99,9 @@ async def run_task_multiimage2video(
         # if e.status != 400:
         raise e
         task = None
+    finally:
+        for image in images:
+            image.close()
     logger.info(f"Runned multiimage2video task #{task_id}. External Response: {task}")
     async with uow:
         await uow.tasks.update(
@@ -98,6 +109,8 @@ async def run_task_multiimage2video(
             TaskUpdate(
                 status=TaskStatus.submitted,
                 external_id=task.external_id if task else None,
+                source=task.source if task else None,
+                kind=TaskKind.multiimage2video,
             ),
         )
         await uow.commit()
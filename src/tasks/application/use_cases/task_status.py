@@ -1,7 +1,7 @@
-
 from src.core.config import settings
 from src.tasks.domain.entities import Task
 from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+from src.tasks.infrastructure.cache import CachedTask, task_read_cache
 
 
 async def get_task(task_pk: int, uow: ITaskUnitOfWork) -> Task:
@@ -10,3 +10,15 @@ async def get_task(task_pk: int, uow: ITaskUnitOfWork) -> Task:
     if task.result and not task.result.startswith("http"):
         task.result = "https://" + settings.DOMAIN.rstrip("/") + "/result/" + task.result.lstrip()
     return task
+
+
+async def get_cached_task(task_pk: int, uow: ITaskUnitOfWork) -> CachedTask:
+    """The task's serialized response, read from the database only on a cache miss.
+
+    uow may read from a replica, a task that just changed is read from the primary.
+    The lookup runs on its own unit of work: it goes on when the caller stops waiting,
+    e.g. on a long poll timeout, and other callers may join it.
+    """
+    return await task_read_cache.get(
+        task_pk, lambda fresh: get_task(task_pk, uow.primary().fork() if fresh else uow.fork())
+    )
@@ -1,52 +1,210 @@
-from io import BytesIO
+import asyncio
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
 from loguru import logger
+from prometheus_client import Counter, Histogram
 
 from src.core.config import settings
 from fastapi import HTTPException
-from src.tasks.domain.entities import TaskStatus, TaskUpdate
-from src.tasks.domain.interfaces.task_result_storage import ITaskStorageRepository
-from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient
+from src.tasks.domain.entities import Task, TaskCallback, TaskSource, TaskStatus, TaskUpdate
+from src.tasks.domain.interfaces.task_result_storage import (
+    IAsyncLocalTaskStorageRepository,
+    IAsyncTaskStorageRepository,
+)
+from src.tasks.domain.interfaces.task_source_client import GenerationFailedError, ITaskSourceClient
 from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
-from src.tasks.infrastructure.http.api_client import TaskWebhookClientService
+from src.tasks.application.use_cases.task_webhook import make_webhook_delivery
 from src.localstorage.domain.exceptions import FileNotFoundError
 
 
+duplicate_callbacks = Counter(
+    "task_callbacks_duplicate_total",
+    "Provider callbacks suppressed as duplicates: redelivered status, task already final or lost race",
+    ["reason"],
+)
+write_behind_batch_size = Histogram(
+    "task_write_behind_batch_size",
+    "Callbacks finished per write-behind flush",
+    buckets=[1, 2, 5, 10, 20, 50, 100, 200, 500],
+)
+write_behind_flush = Histogram(
+    "task_write_behind_flush_seconds",
+    "Time a write-behind flush took, from its first statement to the commit",
+)
+
+
+class _PendingResult(NamedTuple):
+    task_id: int
+    callback_id: int
+    update: TaskUpdate | None
+    written: asyncio.Future | None
+
+
+class TaskResultBuffer:
+    """Write-behind for the last step of callbacks: the task update, its client webhook and
+    the processed callback mark.
+
+    Results gathered over TASK_WRITE_BEHIND_WINDOW, or until TASK_WRITE_BEHIND_MAX_BATCH of
+    them, are written in one transaction with one statement per table. With
+    TASK_WRITE_BEHIND_DURABILITY "commit" a write returns once its batch committed. With
+    "buffer" it returns at once: results lost to a crash or a failed flush leave their
+    callbacks unprocessed, and those are handled again once CALLBACK_LEASE runs out.
+    """
+
+    def __init__(self, uow_factory: Callable[[], ITaskUnitOfWork]):
+        self.uow_factory = uow_factory
+        self._pending: list[_PendingResult] = []
+        self._has_pending = asyncio.Event()
+        self._full = asyncio.Event()
+
+    async def write(self, task_id: int, callback_id: int, update: TaskUpdate | None) -> None:
+        written = None
+        if settings.TASK_WRITE_BEHIND_DURABILITY == "commit":
+            written = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingResult(task_id, callback_id, update, written))
+        self._has_pending.set()
+        if len(self._pending) >= settings.TASK_WRITE_BEHIND_MAX_BATCH:
+            self._full.set()
+        if written is not None:
+            await written
+
+    async def run(self) -> None:
+        """Flushes until cancelled, then writes whatever is still pending"""
+        flush = None
+        try:
+            while True:
+                await self._has_pending.wait()
+                try:
+                    await asyncio.wait_for(self._full.wait(), settings.TASK_WRITE_BEHIND_WINDOW)
+                except TimeoutError:
+                    pass
+                # Cancelling a flush halfway would leave its transaction open
+                flush = asyncio.create_task(self.flush())
+                await asyncio.shield(flush)
+        finally:
+            if flush is not None:
+                await flush
+            while self._pending:
+                await self.flush()
+
+    async def flush(self) -> None:
+        # A task is updated once per statement, a second result for it waits for the next batch
+        batch: list[_PendingResult] = []
+        updates: dict[int, TaskUpdate] = {}
+        rest: list[_PendingResult] = []
+        for result in self._pending:
+            if len(batch) >= settings.TASK_WRITE_BEHIND_MAX_BATCH or (
+                result.update is not None and result.task_id in updates
+            ):
+                rest.append(result)
+                continue
+            batch.append(result)
+            if result.update is not None:
+                updates[result.task_id] = result.update
+        self._pending = rest
+        if len(rest) < settings.TASK_WRITE_BEHIND_MAX_BATCH:
+            self._full.clear()
+        if not rest:
+            self._has_pending.clear()
+        if not batch:
+            return
+
+        started = time.monotonic()
+        try:
+            uow = self.uow_factory()
+            async with uow:
+                tasks = await uow.tasks.transition_many(updates, TaskStatus.submitted) if updates else []
+                deliveries = [delivery for task in tasks if (delivery := make_webhook_delivery(task))]
+                if deliveries:
+                    await uow.webhooks.create_many(deliveries)
+                await uow.callbacks.mark_processed([result.callback_id for result in batch])
+                await uow.commit()
+        except Exception as e:
+            logger.exception(f"Can't write {len(batch)} task results: {e!r}")
+            for result in batch:
+                if result.written is not None and not result.written.done():
+                    result.written.set_exception(e)
+            return
+        write_behind_flush.observe(time.monotonic() - started)
+        write_behind_batch_size.observe(len(batch))
+
+        finished = {task.id for task in tasks}
+        for result in batch:
+            if result.update is not None and result.task_id not in finished:
+                duplicate_callbacks.labels("race").inc()
+                logger.info(f"Task #{result.task_id} was finished by another callback")
+            if result.written is not None and not result.written.done():
+                result.written.set_result(None)
+
+
 async def store_task_result(
-        task_id: int,
-        data: dict,
+        task: Task,
+        callback: TaskCallback,
         uow: ITaskUnitOfWork,
-        client: ITaskSourceClient,
-        http_client: TaskWebhookClientService,
-        storage: ITaskStorageRepository
+        clients: dict[TaskSource, ITaskSourceClient],
+        storage: IAsyncTaskStorageRepository,
+        buffer: TaskResultBuffer | None = None,
 ):
-    logger.info(f"Received task webhook: {data}")
-    result = None
-    try:
-        result = await client.process_task_callback(data)
-    except Exception as e:
-        async with uow:
-            await uow.tasks.update(task_id, TaskUpdate(result=str(task_id), status=TaskStatus.failed, error=str(e)))
-            await uow.commit()
-        logger.error(e)
-
-    if result:
-        storage.put_file(str(task_id), result)
-        logger.info(f"Saved task #{task_id} result")
-
-        async with uow:
-            result = "https://" + settings.DOMAIN.rstrip("/") + "/result/" + str(task_id)
-            await uow.tasks.update(task_id, TaskUpdate(result=result, status=TaskStatus.finished))
-            await uow.commit()
+    """Stores the result and notifies the client once per task.
+
+    Takes the task as loaded with its claimed callback, so a callback costs two
+    transactions: the claim and this one. Only the callback that moves the task out of
+    submitted queues the client webhook, and every callback is marked processed along
+    with the task update; callbacks for a task that is already final return before
+    downloading anything. With a buffer, that last transaction is shared with other callbacks.
+    """
+    logger.info(f"Received task webhook: {callback.payload}")
+    update = None
+    if task.status in (TaskStatus.finished, TaskStatus.failed, TaskStatus.expired):
+        duplicate_callbacks.labels("final").inc()
+        logger.info(f"Task #{task.id} is already {task.status.value}, skipping the callback")
+    elif task.status is None:
+        # The provider called back before the submission was recorded, retried later
+        raise RuntimeError(f"Task #{task.id} isn't submitted yet")
+    else:
+        # Tasks created before routing have no source and all went through fal
+        client = clients[task.source or TaskSource.fal]
+        # Errors getting the result propagate, so the callback is retried
+        try:
+            result = await client.process_task_callback(callback.payload)
+        except GenerationFailedError as e:
+            logger.error(f"Task #{task.id} failed: {e}")
+            update = TaskUpdate(result=str(task.id), status=TaskStatus.failed, error=str(e))
+        else:
+            if result is not None:
+                await storage.put_file_stream(str(task.id), result)
+                logger.info(f"Saved task #{task.id} result")
+                url = "https://" + settings.DOMAIN.rstrip("/") + "/result/" + str(task.id)
+                update = TaskUpdate(result=url, status=TaskStatus.finished)
 
+    if buffer is not None:
+        await buffer.write(task.id, callback.id, update)
+        return
     async with uow:
-        task = await uow.tasks.get_by_pk(task_id)
-    if task.status in (TaskStatus.finished, TaskStatus.failed):
-        if task.webhook_url is not None:
-            await http_client.send_webhook(str(task.webhook_url), task)
+        if update is not None:
+            task = await uow.tasks.transition(task.id, update, TaskStatus.submitted)
+            if task is None:
+                duplicate_callbacks.labels("race").inc()
+                logger.info(f"Task #{callback.task_id} was finished by another callback")
+            elif delivery := make_webhook_delivery(task):
+                await uow.webhooks.create(delivery)
+        await uow.callbacks.mark_processed([callback.id])
+        await uow.commit()
+
+
+async def get_task_result(task_id: int, storage: IAsyncLocalTaskStorageRepository) -> Path:
+    try:
+        path = await storage.get_file_path(str(task_id))
+        await storage.touch_file(str(task_id))
+    except FileNotFoundError:
+        raise HTTPException(404)
+    return path
 
 
-def get_task_result(task_id: int, storage: ITaskStorageRepository) -> BytesIO:
+async def get_task_result_url(task_id: int, storage: IAsyncTaskStorageRepository) -> str | None:
     try:
-        return storage.read_file(str(task_id))
+        return await storage.get_download_url(str(task_id))
     except FileNotFoundError:
         raise HTTPException(404)
@@ -0,0 +1,130 @@
+from contextlib import ExitStack
+from pathlib import Path
+
+from fastapi import HTTPException
+from loguru import logger
+
+from src.core.config import settings
+from src.tasks.application.use_cases.task_run import (
+    run_task_image2video,
+    run_task_multiimage2video,
+)
+from src.tasks.application.use_cases.task_webhook import make_webhook_delivery
+from src.tasks.domain.dtos import (
+    TaskCreateDTO,
+    TaskCreateFromImageDTO,
+    TaskCreateFromMultiImageDTO,
+)
+from src.tasks.domain.entities import (
+    Task,
+    TaskCreate,
+    TaskStatus,
+    TaskSubmission,
+    TaskSubmissionCreate,
+    TaskSubmissionKind,
+    TaskUpdate,
+)
+from src.tasks.domain.interfaces.task_source_client import ITaskCreationClient
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+
+
+async def check_submission_backlog(uow: ITaskUnitOfWork) -> None:
+    async with uow:
+        depth = await uow.submissions.count()
+    if depth >= settings.SUBMISSION_QUEUE_MAX_DEPTH:
+        logger.warning(f"Submission queue is full: {depth} pending")
+        raise HTTPException(
+            503,
+            detail="Too many tasks are waiting for submission",
+            headers={"Retry-After": str(settings.SUBMISSION_RETRY_AFTER)},
+        )
+
+
+async def enqueue_task(
+    task_data: TaskCreateDTO,
+    kind: TaskSubmissionKind,
+    images: list[Path],
+    image_tail: Path | None,
+    callback_url_base: str,
+    uow: ITaskUnitOfWork,
+) -> Task:
+    """Creates the task and its pending submission in one transaction"""
+    request = TaskCreate(**task_data.model_dump(mode="json"))
+    async with uow:
+        new_task = await uow.tasks.create(request)
+        task_data.callback_url = callback_url_base + str(new_task.id)
+        await uow.submissions.create(
+            TaskSubmissionCreate(
+                task_id=new_task.id,
+                kind=kind,
+                payload=task_data.model_dump(mode="json"),
+                images=[str(path) for path in images],
+                image_tail=str(image_tail) if image_tail else None,
+            )
+        )
+        logger.info(f"Queued {kind.value} task #{new_task.id} with {request=}")
+        await uow.commit()
+    return new_task
+
+
+async def _submit(submission: TaskSubmission, client: ITaskCreationClient, uow: ITaskUnitOfWork) -> None:
+    with ExitStack() as stack:
+        images = [stack.enter_context(open(path, "rb")) for path in submission.images]
+        image_tail = None
+        if submission.image_tail:
+            image_tail = stack.enter_context(open(submission.image_tail, "rb"))
+
+        if submission.kind == TaskSubmissionKind.image2video:
+            schema = TaskCreateFromImageDTO.model_validate(submission.payload)
+            await run_task_image2video(submission.task_id, schema, images[0], image_tail, client, uow)
+        else:
+            schema = TaskCreateFromMultiImageDTO.model_validate(submission.payload)
+            await run_task_multiimage2video(submission.task_id, schema, images, client, uow)
+
+
+def _remove_spooled_images(submission: TaskSubmission) -> None:
+    for path in [*submission.images, submission.image_tail]:
+        if path:
+            Path(path).unlink(missing_ok=True)
+
+
+async def process_task_submission(
+    uow: ITaskUnitOfWork, clients: dict[TaskSubmissionKind, ITaskCreationClient]
+) -> bool:
+    """Submits the next due task to its provider, returns False if none is due.
+
+    Delivery is at-least-once: a worker dying between the provider call and the
+    row removal makes the task resubmit once its lease runs out.
+    """
+    async with uow:
+        claimed = await uow.submissions.claim(1, settings.SUBMISSION_LEASE)
+        await uow.commit()
+    if not claimed:
+        return False
+
+    submission = claimed[0]
+    try:
+        await _submit(submission, clients[submission.kind], uow)
+    except Exception as e:
+        if submission.attempts < settings.SUBMISSION_MAX_ATTEMPTS:
+            delay = settings.SUBMISSION_RETRY_DELAY * 2 ** (submission.attempts - 1)
+            logger.warning(f"Submission of task #{submission.task_id} failed, retrying in {delay}s: {e!r}")
+            async with uow:
+                await uow.submissions.reschedule(submission.id, delay, repr(e))
+                await uow.commit()
+            return True
+
+        logger.exception(f"Submission of task #{submission.task_id} failed: {e!r}")
+        async with uow:
+            task = await uow.tasks.update(submission.task_id, TaskUpdate(status=TaskStatus.failed, error=str(e)))
+            if delivery := make_webhook_delivery(task):
+                await uow.webhooks.create(delivery)
+            await uow.submissions.delete(submission.id)
+            await uow.commit()
+    else:
+        async with uow:
+            await uow.submissions.delete(submission.id)
+            await uow.commit()
+
+    _remove_spooled_images(submission)
+    return True
@@ -0,0 +1,39 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from src.core.config import settings
+from src.tasks.application.use_cases.task_status import get_cached_task
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+from src.tasks.infrastructure.cache import CachedTask
+from src.tasks.infrastructure.events import task_event_hub
+
+
+async def watch_task(task_pk: int, uow: ITaskUnitOfWork, etag: str | None = None) -> AsyncIterator[CachedTask | None]:
+    """Yields the task each time it differs from the last version seen, starting from etag, until it's finished.
+
+    Yields None after TASK_EVENTS_KEEPALIVE without a change, the task is then read again
+    in case a change was committed by another process.
+    """
+    with task_event_hub.subscribe(task_pk) as subscription:
+        while True:
+            task = await get_cached_task(task_pk, uow)
+            if task.etag != etag:
+                etag = task.etag
+                yield task
+            if task.terminal:
+                return
+            if not await subscription.wait(settings.TASK_EVENTS_KEEPALIVE):
+                yield None
+
+
+async def wait_task_change(task_pk: int, uow: ITaskUnitOfWork, etag: str | None, timeout: float) -> CachedTask:
+    """Returns the task once it differs from etag, or without etag once it's finished, at the latest after timeout"""
+    try:
+        async with asyncio.timeout(timeout), aclosing(watch_task(task_pk, uow, etag)) as updates:
+            async for task in updates:
+                if task is not None and (etag is not None or task.terminal):
+                    return task
+    except TimeoutError:
+        pass
+    return await get_cached_task(task_pk, uow)
@@ -0,0 +1,84 @@
+from loguru import logger
+from prometheus_client import Counter
+
+from src.core.config import settings
+from src.tasks.domain.entities import Task, WebhookDelivery, WebhookDeliveryCreate
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+from src.tasks.domain.mappers import TaskEntityToDTOMapper
+from src.tasks.infrastructure.http.api_client import TaskWebhookClientService
+
+webhook_deliveries = Counter(
+    "webhook_deliveries_total",
+    "Client webhook deliveries by outcome: delivered, retry or failed for good",
+    ["outcome"],
+)
+
+
+def make_webhook_delivery(task: Task) -> WebhookDeliveryCreate | None:
+    """The delivery to save along with the task's final status, None without a webhook url"""
+    if task.webhook_url is None:
+        return None
+    url = str(task.webhook_url)
+    return WebhookDeliveryCreate(
+        task_id=task.id,
+        url=url,
+        host=TaskWebhookClientService.get_host(url),
+        payload=TaskEntityToDTOMapper().map_one(task).model_dump(mode="json"),
+    )
+
+
+async def claim_webhook_deliveries(uow: ITaskUnitOfWork, limit: int) -> list[list[WebhookDelivery]]:
+    """Claims due deliveries to hosts that have capacity, grouped into requests.
+
+    Deliveries to WEBHOOK_BATCH_URLS share one request, any other is sent alone.
+    """
+    async with uow:
+        deliveries = await uow.webhooks.claim(
+            limit, settings.WEBHOOK_LEASE, TaskWebhookClientService.get_busy_hosts()
+        )
+        await uow.commit()
+
+    batches: dict[str, list[WebhookDelivery]] = {}
+    requests = []
+    for delivery in deliveries:
+        if delivery.url not in settings.WEBHOOK_BATCH_URLS:
+            requests.append([delivery])
+            continue
+        batch = batches.setdefault(delivery.url, [])
+        batch.append(delivery)
+        if len(batch) == settings.WEBHOOK_MAX_BATCH:
+            requests.append(batches.pop(delivery.url))
+    return requests + list(batches.values())
+
+
+async def deliver_webhooks(
+    deliveries: list[WebhookDelivery], uow: ITaskUnitOfWork, http_client: TaskWebhookClientService
+) -> None:
+    url = deliveries[0].url
+    pks = [delivery.id for delivery in deliveries]
+    if url in settings.WEBHOOK_BATCH_URLS:
+        payload = [delivery.payload for delivery in deliveries]
+    else:
+        payload = deliveries[0].payload
+
+    try:
+        await http_client.send_webhook(url, payload)
+    except Exception as e:
+        attempts = max(delivery.attempts for delivery in deliveries)
+        async with uow:
+            if attempts < settings.WEBHOOK_MAX_ATTEMPTS:
+                delay = min(settings.WEBHOOK_MAX_RETRY_DELAY, settings.WEBHOOK_RETRY_DELAY * 2 ** (attempts - 1))
+                logger.warning(f"Webhook to {url} for {len(pks)} tasks failed, retrying in {delay}s: {e!r}")
+                await uow.webhooks.reschedule(pks, delay, repr(e))
+                webhook_deliveries.labels("retry").inc(len(pks))
+            else:
+                logger.error(f"Webhook to {url} for {len(pks)} tasks failed for good: {e!r}")
+                await uow.webhooks.mark_failed(pks, repr(e))
+                webhook_deliveries.labels("failed").inc(len(pks))
+            await uow.commit()
+        return
+
+    async with uow:
+        await uow.webhooks.mark_delivered(pks)
+        await uow.commit()
+    webhook_deliveries.labels("delivered").inc(len(pks))
@@ -3,6 +3,8 @@ from fastapi import Depends, Form
 from pydantic import AliasChoices, BaseModel, Field, HttpUrl
 from pydantic.json_schema import SkipJsonSchema
 
+from src.tasks.domain.entities import TaskSource
+
 
 class TaskCreateDTO(BaseModel):
     app_id: str = Field(validation_alias=AliasChoices("appId", "app_id"))
@@ -233,3 +235,4 @@ class TaskExternalDTO(BaseModel):
     status: str
     error: str | None = None
     result: str | None = None
+    source: TaskSource | None = None
@@ -1,3 +1,4 @@
+import datetime as dt
 from enum import Enum
 from pydantic import BaseModel, HttpUrl
 
@@ -11,6 +12,13 @@ class TaskStatus(str, Enum):
     submitted = "submitted"
     finished = "finished"
     failed = "failed"
+    expired = "expired"
+
+
+class TaskKind(str, Enum):
+    text2video = "text2video"
+    image2video = "image2video"
+    multiimage2video = "multiimage2video"
 
 
 class Task(BaseModel):
@@ -22,6 +30,11 @@ class Task(BaseModel):
     result: str | None = None
     external_id: str | None = None
     webhook_url: HttpUrl | None = None
+    source: TaskSource | None = None
+    kind: TaskKind | None = None
+    created_at: dt.datetime | None = None
+    updated_at: dt.datetime | None = None
+    finished_at: dt.datetime | None = None
 
 
 class TaskCreate(BaseModel):
@@ -36,3 +49,62 @@ class TaskUpdate(BaseModel):
     result: str | None = None
     error: str | None = None
     external_id: str | None = None
+    source: TaskSource | None = None
+    kind: TaskKind | None = None
+
+
+class StoredFile(BaseModel):
+    filename: str
+    size: int
+    links: int
+    accessed_at: float
+    modified_at: float
+    # Inode change time: no older than the file's own link, unlike the mtime of a shared blob
+    changed_at: float
+
+
+class TaskSubmissionKind(str, Enum):
+    image2video = "image2video"
+    multiimage2video = "multiimage2video"
+
+
+class TaskSubmissionCreate(BaseModel):
+    task_id: int
+    kind: TaskSubmissionKind
+    payload: dict
+    images: list[str]
+    image_tail: str | None = None
+
+
+class TaskSubmission(TaskSubmissionCreate):
+    id: int
+    attempts: int
+
+
+class WebhookDeliveryStatus(str, Enum):
+    pending = "pending"
+    delivered = "delivered"
+    failed = "failed"
+
+
+class WebhookDeliveryCreate(BaseModel):
+    task_id: int
+    url: str
+    host: str
+    payload: dict
+
+
+class WebhookDelivery(WebhookDeliveryCreate):
+    id: int
+    attempts: int
+
+
+class TaskCallbackCreate(BaseModel):
+    task_id: int
+    provider_status: str
+    payload: dict
+
+
+class TaskCallback(TaskCallbackCreate):
+    id: int
+    attempts: int
@@ -0,0 +1,22 @@
+import abc
+
+from src.tasks.domain.entities import TaskCallback, TaskCallbackCreate
+
+
+class ITaskCallbackRepository(abc.ABC):
+    @abc.abstractmethod
+    async def create(self, callback: TaskCallbackCreate) -> TaskCallback | None:
+        """Returns None if a callback with the same task and provider status was already received"""
+
+    @abc.abstractmethod
+    async def claim(self, limit: int, lease: float) -> list[TaskCallback]:
+        """Hide up to limit due callbacks from other workers for lease seconds"""
+
+    @abc.abstractmethod
+    async def reschedule(self, pk: int, delay: float, error: str) -> None: ...
+
+    @abc.abstractmethod
+    async def mark_processed(self, pks: list[int]) -> None: ...
+
+    @abc.abstractmethod
+    async def delete(self, pk: int) -> None: ...
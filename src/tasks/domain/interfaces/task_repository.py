@@ -1,6 +1,6 @@
 import abc
 
-from src.tasks.domain.entities import TaskCreate, TaskUpdate, Task
+from src.tasks.domain.entities import TaskCreate, TaskStatus, TaskUpdate, Task
 
 
 class ITaskRepository(abc.ABC):
@@ -11,4 +11,28 @@ class ITaskRepository(abc.ABC):
     async def get_by_pk(self, pk: int) -> Task: ...
 
     @abc.abstractmethod
-    async def update(self, pk: int, task: TaskUpdate) -> None: ...
+    async def get_many(self, pks: list[int]) -> list[Task]: ...
+
+    @abc.abstractmethod
+    async def update(self, pk: int, task: TaskUpdate) -> Task: ...
+
+    @abc.abstractmethod
+    async def transition(self, pk: int, task: TaskUpdate, from_status: TaskStatus) -> Task | None:
+        """Applies the update only if the task is still in from_status, returns None otherwise"""
+
+    @abc.abstractmethod
+    async def transition_many(self, tasks: dict[int, TaskUpdate], from_status: TaskStatus) -> list[Task]:
+        """Bulk transition, returns only the tasks that were still in from_status"""
+
+    @abc.abstractmethod
+    async def mark_expired(self, pks: list[int]) -> None: ...
+
+    @abc.abstractmethod
+    async def claim_stale_submitted(
+        self, limit: int, after: float, interval: float, max_interval: float
+    ) -> list[Task]:
+        """Returns tasks submitted for longer than after that are due for a poll,
+        pushing their next poll back by interval, doubled per poll up to max_interval"""
+
+    @abc.abstractmethod
+    async def fail_overdue(self, deadline: float, error: str) -> list[Task]: ...
@@ -1,18 +1,25 @@
 import abc
-from typing import Generic, TypeVar
+from typing import AsyncIterator, Generic, Literal, TypeVar
 
 from src.tasks.domain.dtos import TaskExternalDTO
+from src.tasks.domain.entities import TaskKind, TaskSource
 
 TText2Video = TypeVar("TText2Video")
 TImage2Video = TypeVar("TImage2Video")
 TTaskResponse = TypeVar("TTaskResponse")
 TTaskResult = TypeVar("TTaskResult")
+TTaskKind = Literal["text2video", "image2video", "multiimage2video"]
 
 
-class ITaskSourceClient(
+class GenerationFailedError(ValueError):
+    """The provider reports the task as failed, unlike an error getting its result this is final"""
+
+
+class ITaskCreationClient(
     abc.ABC, Generic[TText2Video, TImage2Video, TTaskResponse, TTaskResult]
 ):
-    webhook_domain: str | None
+    def supports(self, kind: TTaskKind, model_name: str | None) -> bool:
+        return True
 
     @abc.abstractmethod
     async def create_task_text2video(
@@ -32,5 +39,19 @@ class ITaskSourceClient(
         self, task_data: TImage2Video, images: list[TTaskResult]
     ) -> TaskExternalDTO: ...
 
+
+
+class ITaskSourceClient(
+    ITaskCreationClient[TText2Video, TImage2Video, TTaskResponse, TTaskResult]
+):
+    source: TaskSource
+    webhook_domain: str | None
+
+    @abc.abstractmethod
+    async def process_task_callback(
+        self, data: dict
+    ) -> AsyncIterator[bytes] | None: ...
+
     @abc.abstractmethod
-    async def process_task_callback(self, data: dict) -> TTaskResult | None: ...
+    async def query_task(self, external_id: str, kind: TaskKind | None) -> dict | None:
+        """Returns the callback the provider would send for a finished task, None while it runs"""
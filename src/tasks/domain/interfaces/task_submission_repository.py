@@ -0,0 +1,21 @@
+import abc
+
+from src.tasks.domain.entities import TaskSubmission, TaskSubmissionCreate
+
+
+class ITaskSubmissionRepository(abc.ABC):
+    @abc.abstractmethod
+    async def create(self, submission: TaskSubmissionCreate) -> TaskSubmission: ...
+
+    @abc.abstractmethod
+    async def claim(self, limit: int, lease: float) -> list[TaskSubmission]:
+        """Hide up to limit due submissions from other workers for lease seconds"""
+
+    @abc.abstractmethod
+    async def reschedule(self, pk: int, delay: float, error: str) -> None: ...
+
+    @abc.abstractmethod
+    async def delete(self, pk: int) -> None: ...
+
+    @abc.abstractmethod
+    async def count(self) -> int: ...
@@ -1,14 +1,28 @@
 import abc
 
+from src.tasks.domain.interfaces.task_callback_repository import ITaskCallbackRepository
 from src.tasks.domain.interfaces.task_repository import ITaskRepository
+from src.tasks.domain.interfaces.task_submission_repository import ITaskSubmissionRepository
+from src.tasks.domain.interfaces.webhook_delivery_repository import IWebhookDeliveryRepository
 
 
 class ITaskUnitOfWork(abc.ABC):
     tasks: ITaskRepository
+    submissions: ITaskSubmissionRepository
+    callbacks: ITaskCallbackRepository
+    webhooks: IWebhookDeliveryRepository
 
     async def commit(self):
         await self._commit()
 
+    def primary(self) -> "ITaskUnitOfWork":
+        """A unit of work seeing every commit, for reads that a lagging replica can't serve"""
+        return self
+
+    def fork(self) -> "ITaskUnitOfWork":
+        """Another unit of work on the same database, for work that may outlive this one's block"""
+        return self
+
     @abc.abstractmethod
     async def _rollback(self):
         pass
@@ -0,0 +1,24 @@
+import abc
+
+from src.tasks.domain.entities import WebhookDelivery, WebhookDeliveryCreate
+
+
+class IWebhookDeliveryRepository(abc.ABC):
+    @abc.abstractmethod
+    async def create(self, delivery: WebhookDeliveryCreate) -> WebhookDelivery: ...
+
+    @abc.abstractmethod
+    async def create_many(self, deliveries: list[WebhookDeliveryCreate]) -> None: ...
+
+    @abc.abstractmethod
+    async def claim(self, limit: int, lease: float, exclude_hosts: list[str]) -> list[WebhookDelivery]:
+        """Hide up to limit due deliveries to other hosts from other workers for lease seconds"""
+
+    @abc.abstractmethod
+    async def reschedule(self, pks: list[int], delay: float, error: str) -> None: ...
+
+    @abc.abstractmethod
+    async def mark_delivered(self, pks: list[int]) -> None: ...
+
+    @abc.abstractmethod
+    async def mark_failed(self, pks: list[int], error: str) -> None: ...
@@ -24,5 +24,5 @@ class TaskEntityToDTOMapper:
             return 1
         if status == TaskStatus.finished:
             return 3
-        if status == TaskStatus.failed:
+        if status in (TaskStatus.failed, TaskStatus.expired):
             return 4
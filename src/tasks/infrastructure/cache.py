@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, NamedTuple
+
+from prometheus_client import Counter
+
+from src.core.config import settings
+from src.tasks.domain.dtos import TaskReadDTO
+from src.tasks.domain.entities import Task, TaskStatus
+from src.tasks.domain.mappers import TaskEntityToDTOMapper
+
+task_read_cache_requests = Counter(
+    "task_read_cache_requests_total",
+    "Task reads by outcome: hit, miss or shared (joined a lookup already running)",
+    ["outcome"],
+)
+
+# Called with True when the task changed recently and must be read from the primary
+TaskLoader = Callable[[bool], Awaitable[Task]]
+
+
+class CachedTask(NamedTuple):
+    dto: TaskReadDTO
+    body: bytes
+    etag: str
+    terminal: bool
+    expires_at: float
+
+
+class TaskReadCache:
+    """Process-wide LRU of serialized task responses.
+
+    Tasks still running are kept for TASK_CACHE_TTL, finished or failed ones for
+    TASK_CACHE_TERMINAL_TTL, unless a commit changing the task invalidates them first.
+    Concurrent misses on one task share a single lookup. For replica_lag after a change
+    the task is loaded fresh, so a replica behind the commit can't be cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float, terminal_ttl: float, replica_lag: float = 0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.terminal_ttl = terminal_ttl
+        self.replica_lag = replica_lag
+        self._entries: OrderedDict[int, CachedTask] = OrderedDict()
+        self._lookups: dict[int, asyncio.Task[CachedTask]] = {}
+        self._changed: OrderedDict[int, float] = OrderedDict()
+        self._all_changed_until = 0.0
+
+    async def get(self, pk: int, load: TaskLoader) -> CachedTask:
+        entry = self._entries.get(pk)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self._entries.move_to_end(pk)
+            task_read_cache_requests.labels("hit").inc()
+            return entry
+
+        lookup = self._lookups.get(pk)
+        if lookup is None:
+            task_read_cache_requests.labels("miss").inc()
+            lookup = self._lookups[pk] = asyncio.create_task(
+                self._load(pk, load, self._is_fresh_needed(pk)), name=f"load task #{pk}"
+            )
+            lookup.add_done_callback(lambda task: task.cancelled() or task.exception())
+        else:
+            task_read_cache_requests.labels("shared").inc()
+        # Shielded so a cancelled caller doesn't cancel the lookup other callers wait on
+        return await asyncio.shield(lookup)
+
+    def invalidate(self, pks: Iterable[int]) -> None:
+        changed_until = time.monotonic() + self.replica_lag
+        for pk in pks:
+            self._entries.pop(pk, None)
+            # A lookup already running may have read the old row, its result isn't kept
+            self._lookups.pop(pk, None)
+            if self.replica_lag:
+                self._changed[pk] = changed_until
+                self._changed.move_to_end(pk)
+        self._forget_changes()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._lookups.clear()
+        self._all_changed_until = time.monotonic() + self.replica_lag
+
+    def _is_fresh_needed(self, pk: int) -> bool:
+        now = time.monotonic()
+        return now < self._all_changed_until or now < self._changed.get(pk, 0)
+
+    def _forget_changes(self) -> None:
+        now = time.monotonic()
+        while self._changed and (len(self._changed) > self.max_size or next(iter(self._changed.values())) <= now):
+            self._changed.popitem(last=False)
+
+    async def _load(self, pk: int, load: TaskLoader, fresh: bool) -> CachedTask:
+        lookup = asyncio.current_task()
+        try:
+            task = await load(fresh)
+        finally:
+            invalidated = self._lookups.get(pk) is not lookup
+            if not invalidated:
+                del self._lookups[pk]
+
+        dto = TaskEntityToDTOMapper().map_one(task)
+        body = dto.model_dump_json().encode()
+        terminal = task.status in (TaskStatus.finished, TaskStatus.failed, TaskStatus.expired)
+        entry = CachedTask(
+            dto=dto,
+            body=body,
+            etag='"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"',
+            terminal=terminal,
+            expires_at=time.monotonic() + (self.terminal_ttl if terminal else self.ttl),
+        )
+        if not invalidated and self.max_size > 0:
+            self._entries[pk] = entry
+            self._entries.move_to_end(pk)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+task_read_cache = TaskReadCache(
+    settings.TASK_CACHE_SIZE,
+    settings.TASK_CACHE_TTL,
+    settings.TASK_CACHE_TERMINAL_TTL,
+    settings.DB_REPLICA_MAX_LAG if settings.DB_REPLICA_URI else 0,
+)
@@ -1,3 +1,7 @@
+import datetime as dt
+
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.base import Base
@@ -5,9 +9,14 @@ from src.db.base import Base
 
 class TaskDB(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("tasks_submitted_next_poll_at_idx", "next_poll_at", postgresql_where=text("status = 'submitted'")),
+        Index("tasks_status_created_at_idx", "status", "created_at"),
+        Index("tasks_user_id_app_id_idx", "user_id", "app_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    external_id: Mapped[str | None]
+    external_id: Mapped[str | None] = mapped_column(index=True)
     status: Mapped[str | None]
     user_id: Mapped[str]
     app_id: Mapped[str]
@@ -15,3 +24,66 @@ class TaskDB(Base):
     webhook_url: Mapped[str | None]
     result: Mapped[str | None]
     error: Mapped[str | None]
+    source: Mapped[str | None]
+    kind: Mapped[str | None]
+    submitted_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True))
+    next_poll_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True))
+    # When the result was stored, retention ages results from it
+    finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True))
+    polls: Mapped[int] = mapped_column(default=0, server_default="0")
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class TaskSubmissionDB(Base):
+    __tablename__ = "task_submissions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), unique=True)
+    kind: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSONB)
+    images: Mapped[list[str]] = mapped_column(JSONB)
+    image_tail: Mapped[str | None]
+    attempts: Mapped[int] = mapped_column(default=0)
+    available_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+    last_error: Mapped[str | None]
+
+
+class TaskCallbackDB(Base):
+    __tablename__ = "task_callbacks"
+    __table_args__ = (
+        # Processed callbacks are kept, so a redelivery of the same status is recognized
+        UniqueConstraint("task_id", "provider_status"),
+        Index("task_callbacks_pending_available_at_idx", "available_at", postgresql_where=text("processed_at IS NULL")),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
+    provider_status: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSONB)
+    attempts: Mapped[int] = mapped_column(default=0)
+    available_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    processed_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None]
+
+
+class WebhookDeliveryDB(Base):
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("webhook_deliveries_pending_available_at_idx", "available_at", postgresql_where=text("status = 'pending'")),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
+    url: Mapped[str]
+    host: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSONB)
+    status: Mapped[str] = mapped_column(default="pending")
+    attempts: Mapped[int] = mapped_column(default=0)
+    available_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    delivered_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None]
@@ -1,17 +1,40 @@
+import datetime as dt
+
 from fastapi import HTTPException
-from sqlalchemy import update
+from sqlalchemy import Integer, String, case, column, delete, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.tasks.infrastructure.db.orm import TaskDB
-from src.tasks.domain.entities import Task, TaskCreate, TaskStatus, TaskUpdate
+from src.tasks.infrastructure.db.orm import TaskCallbackDB, TaskDB, TaskSubmissionDB, WebhookDeliveryDB
+from src.tasks.domain.entities import (
+    Task,
+    TaskCallback,
+    TaskCallbackCreate,
+    TaskCreate,
+    TaskKind,
+    TaskSource,
+    TaskStatus,
+    TaskSubmission,
+    TaskSubmissionCreate,
+    TaskSubmissionKind,
+    TaskUpdate,
+    WebhookDelivery,
+    WebhookDeliveryCreate,
+    WebhookDeliveryStatus,
+)
+from src.tasks.domain.interfaces.task_callback_repository import ITaskCallbackRepository
 from src.tasks.domain.interfaces.task_repository import ITaskRepository
+from src.tasks.domain.interfaces.task_submission_repository import ITaskSubmissionRepository
+from src.tasks.domain.interfaces.webhook_delivery_repository import IWebhookDeliveryRepository
 
 
 class PGTaskRepository(ITaskRepository):
     def __init__(self, session: AsyncSession):
         super().__init__()
         self.session = session
+        # Tasks whose client-visible fields were written, see PGTaskUnitOfWork._commit
+        self.changed_pks: set[int] = set()
 
     async def create(self, task: TaskCreate) -> Task:
         model = TaskDB(**task.model_dump(mode="json"))
@@ -26,6 +49,7 @@ class PGTaskRepository(ITaskRepository):
                 detail = "Task can't be created due to integrity error."
             raise HTTPException(409, detail=detail)
 
+        self.changed_pks.add(model.id)
         return self._to_domain(model)
 
     async def get_by_pk(self, pk: int) -> Task:
@@ -34,17 +58,126 @@ class PGTaskRepository(ITaskRepository):
             raise HTTPException(404)
         return self._to_domain(model)
 
-    async def update(self, pk: int, task: TaskUpdate) -> None:
-        query = update(TaskDB).values(**task.model_dump(mode="json", exclude_none=True)).filter_by(id=pk)
-        await self.session.execute(query)
+    async def get_many(self, pks: list[int]) -> list[Task]:
+        query = select(TaskDB).filter(TaskDB.id.in_(pks))
+        models = (await self.session.scalars(query)).all()
+        return [self._to_domain(model) for model in models]
+
+    async def update(self, pk: int, task: TaskUpdate) -> Task:
+        values = task.model_dump(mode="json", exclude_none=True)
+        if task.status == TaskStatus.submitted:
+            values.update(submitted_at=func.now(), next_poll_at=None, polls=0)
+        elif task.status == TaskStatus.finished:
+            values.update(finished_at=func.now())
+        query = (
+            update(TaskDB)
+            .values(**values)
+            .filter_by(id=pk)
+            .returning(TaskDB)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
         try:
-            await self.session.flush()
+            model = await self.session.scalar(query)
         except IntegrityError as e:
             try:
                 detail = "Task can't be updated. " + str(e.orig).split('\nDETAIL:  ')[1]
             except IndexError:
                 detail = "Task can't be updated due to integrity error."
             raise HTTPException(409, detail=detail)
+        if model is None:
+            raise HTTPException(404)
+        self.changed_pks.add(pk)
+        return self._to_domain(model)
+
+    async def transition(self, pk: int, task: TaskUpdate, from_status: TaskStatus) -> Task | None:
+        values = task.model_dump(mode="json", exclude_none=True)
+        if task.status == TaskStatus.finished:
+            values.update(finished_at=func.now())
+        query = (
+            update(TaskDB)
+            .values(**values)
+            .filter(TaskDB.id == pk, TaskDB.status == from_status.value)
+            .returning(TaskDB)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        model = await self.session.scalar(query)
+        if model is None:
+            return None
+        self.changed_pks.add(pk)
+        return self._to_domain(model)
+
+    async def transition_many(self, tasks: dict[int, TaskUpdate], from_status: TaskStatus) -> list[Task]:
+        # One UPDATE ... FROM (VALUES ...), fields left None in an update keep their value
+        fields = list(TaskUpdate.model_fields)
+        rows = values(
+            column("id", Integer), *(column(field, String) for field in fields), name="updates"
+        ).data([
+            (pk, *(task.model_dump(mode="json")[field] for field in fields)) for pk, task in tasks.items()
+        ])
+        query = (
+            update(TaskDB)
+            .values({
+                **{field: func.coalesce(rows.c[field], getattr(TaskDB, field)) for field in fields},
+                "finished_at": case(
+                    (rows.c.status == TaskStatus.finished.value, func.now()), else_=TaskDB.finished_at
+                ),
+            })
+            .filter(TaskDB.id == rows.c.id, TaskDB.status == from_status.value)
+            .returning(TaskDB)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        models = (await self.session.scalars(query)).all()
+        self.changed_pks.update(model.id for model in models)
+        return [self._to_domain(model) for model in models]
+
+    async def mark_expired(self, pks: list[int]) -> None:
+        query = (
+            update(TaskDB)
+            .values(status=TaskStatus.expired.value, result=None, error="Task result expired")
+            .filter(TaskDB.id.in_(pks))
+        )
+        await self.session.execute(query)
+        self.changed_pks.update(pks)
+
+    async def claim_stale_submitted(
+        self, limit: int, after: float, interval: float, max_interval: float
+    ) -> list[Task]:
+        due = (
+            select(TaskDB.id)
+            .filter(
+                TaskDB.status == TaskStatus.submitted.value,
+                TaskDB.submitted_at <= func.now() - dt.timedelta(seconds=after),
+                or_(TaskDB.next_poll_at.is_(None), TaskDB.next_poll_at <= func.now()),
+            )
+            .order_by(TaskDB.next_poll_at.nulls_first())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        backoff = func.least(interval * func.power(2, TaskDB.polls), max_interval)
+        query = (
+            update(TaskDB)
+            .filter(TaskDB.id.in_(due.scalar_subquery()))
+            .values(polls=TaskDB.polls + 1, next_poll_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, backoff))
+            .returning(TaskDB)
+            .execution_options(synchronize_session=False)
+        )
+        models = (await self.session.scalars(query)).all()
+        return [self._to_domain(model) for model in models]
+
+    async def fail_overdue(self, deadline: float, error: str) -> list[Task]:
+        query = (
+            update(TaskDB)
+            .filter(
+                TaskDB.status == TaskStatus.submitted.value,
+                TaskDB.submitted_at <= func.now() - dt.timedelta(seconds=deadline),
+            )
+            .values(status=TaskStatus.failed.value, error=error)
+            .returning(TaskDB)
+            .execution_options(synchronize_session=False)
+        )
+        models = (await self.session.scalars(query)).all()
+        self.changed_pks.update(model.id for model in models)
+        return [self._to_domain(model) for model in models]
 
     @staticmethod
     def _to_domain(model: TaskDB) -> Task:
@@ -55,5 +188,212 @@ class PGTaskRepository(ITaskRepository):
             app_id=model.app_id,
             result=model.result,
             error=model.error,
-            webhook_url=model.webhook_url
+            external_id=model.external_id,
+            webhook_url=model.webhook_url,
+            source=(TaskSource(model.source) if model.source else None),
+            kind=(TaskKind(model.kind) if model.kind else None),
+            created_at=model.created_at,
+            updated_at=model.updated_at,
+            finished_at=model.finished_at,
+        )
+
+
+class PGTaskSubmissionRepository(ITaskSubmissionRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__()
+        self.session = session
+
+    async def create(self, submission: TaskSubmissionCreate) -> TaskSubmission:
+        model = TaskSubmissionDB(**submission.model_dump(mode="json"))
+        self.session.add(model)
+        await self.session.flush()
+        return self._to_domain(model)
+
+    async def claim(self, limit: int, lease: float) -> list[TaskSubmission]:
+        due = (
+            select(TaskSubmissionDB.id)
+            .filter(TaskSubmissionDB.available_at <= func.now())
+            .order_by(TaskSubmissionDB.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(TaskSubmissionDB)
+            .filter(TaskSubmissionDB.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=TaskSubmissionDB.attempts + 1,
+                available_at=func.now() + dt.timedelta(seconds=lease),
+            )
+            .returning(TaskSubmissionDB)
+            .execution_options(synchronize_session=False)
+        )
+        models = (await self.session.scalars(query)).all()
+        return [self._to_domain(model) for model in models]
+
+    async def reschedule(self, pk: int, delay: float, error: str) -> None:
+        query = (
+            update(TaskSubmissionDB)
+            .values(available_at=func.now() + dt.timedelta(seconds=delay), last_error=error)
+            .filter_by(id=pk)
+        )
+        await self.session.execute(query)
+
+    async def delete(self, pk: int) -> None:
+        await self.session.execute(delete(TaskSubmissionDB).filter_by(id=pk))
+
+    async def count(self) -> int:
+        return await self.session.scalar(select(func.count()).select_from(TaskSubmissionDB))
+
+    @staticmethod
+    def _to_domain(model: TaskSubmissionDB) -> TaskSubmission:
+        return TaskSubmission(
+            id=model.id,
+            task_id=model.task_id,
+            kind=TaskSubmissionKind(model.kind),
+            payload=model.payload,
+            images=model.images,
+            image_tail=model.image_tail,
+            attempts=model.attempts,
+        )
+
+
+class PGTaskCallbackRepository(ITaskCallbackRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__()
+        self.session = session
+
+    async def create(self, callback: TaskCallbackCreate) -> TaskCallback | None:
+        query = (
+            insert(TaskCallbackDB)
+            .values(**callback.model_dump(mode="json"))
+            .on_conflict_do_nothing(index_elements=[TaskCallbackDB.task_id, TaskCallbackDB.provider_status])
+            .returning(TaskCallbackDB)
+        )
+        try:
+            model = await self.session.scalar(query)
+        except IntegrityError:
+            raise HTTPException(404, detail=f"Task #{callback.task_id} not found")
+        return self._to_domain(model) if model is not None else None
+
+    async def claim(self, limit: int, lease: float) -> list[TaskCallback]:
+        due = (
+            select(TaskCallbackDB.id)
+            .filter(TaskCallbackDB.processed_at.is_(None), TaskCallbackDB.available_at <= func.now())
+            .order_by(TaskCallbackDB.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(TaskCallbackDB)
+            .filter(TaskCallbackDB.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=TaskCallbackDB.attempts + 1,
+                available_at=func.now() + dt.timedelta(seconds=lease),
+            )
+            .returning(TaskCallbackDB)
+            .execution_options(synchronize_session=False)
+        )
+        models = (await self.session.scalars(query)).all()
+        return [self._to_domain(model) for model in models]
+
+    async def reschedule(self, pk: int, delay: float, error: str) -> None:
+        query = (
+            update(TaskCallbackDB)
+            .values(available_at=func.now() + dt.timedelta(seconds=delay), last_error=error)
+            .filter_by(id=pk)
+        )
+        await self.session.execute(query)
+
+    async def mark_processed(self, pks: list[int]) -> None:
+        query = update(TaskCallbackDB).values(processed_at=func.now()).filter(TaskCallbackDB.id.in_(pks))
+        await self.session.execute(query)
+
+    async def delete(self, pk: int) -> None:
+        await self.session.execute(delete(TaskCallbackDB).filter_by(id=pk))
+
+    @staticmethod
+    def _to_domain(model: TaskCallbackDB) -> TaskCallback:
+        return TaskCallback(
+            id=model.id,
+            task_id=model.task_id,
+            provider_status=model.provider_status,
+            payload=model.payload,
+            attempts=model.attempts,
+        )
+
+
+class PGWebhookDeliveryRepository(IWebhookDeliveryRepository):
+    def __init__(self, session: AsyncSession):
+        super().__init__()
+        self.session = session
+
+    async def create(self, delivery: WebhookDeliveryCreate) -> WebhookDelivery:
+        model = WebhookDeliveryDB(**delivery.model_dump(mode="json"))
+        self.session.add(model)
+        await self.session.flush()
+        return self._to_domain(model)
+
+    async def create_many(self, deliveries: list[WebhookDeliveryCreate]) -> None:
+        query = insert(WebhookDeliveryDB).values([delivery.model_dump(mode="json") for delivery in deliveries])
+        await self.session.execute(query)
+
+    async def claim(self, limit: int, lease: float, exclude_hosts: list[str]) -> list[WebhookDelivery]:
+        due = (
+            select(WebhookDeliveryDB.id)
+            .filter(
+                WebhookDeliveryDB.status == WebhookDeliveryStatus.pending.value,
+                WebhookDeliveryDB.available_at <= func.now(),
+            )
+            .order_by(WebhookDeliveryDB.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if exclude_hosts:
+            due = due.filter(WebhookDeliveryDB.host.not_in(exclude_hosts))
+        query = (
+            update(WebhookDeliveryDB)
+            .filter(WebhookDeliveryDB.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=WebhookDeliveryDB.attempts + 1,
+                available_at=func.now() + dt.timedelta(seconds=lease),
+            )
+            .returning(WebhookDeliveryDB)
+            .execution_options(synchronize_session=False)
+        )
+        models = (await self.session.scalars(query)).all()
+        return [self._to_domain(model) for model in models]
+
+    async def reschedule(self, pks: list[int], delay: float, error: str) -> None:
+        query = (
+            update(WebhookDeliveryDB)
+            .values(available_at=func.now() + dt.timedelta(seconds=delay), last_error=error)
+            .filter(WebhookDeliveryDB.id.in_(pks))
+        )
+        await self.session.execute(query)
+
+    async def mark_delivered(self, pks: list[int]) -> None:
+        query = (
+            update(WebhookDeliveryDB)
+            .values(status=WebhookDeliveryStatus.delivered.value, delivered_at=func.now())
+            .filter(WebhookDeliveryDB.id.in_(pks))
+        )
+        await self.session.execute(query)
+
+    async def mark_failed(self, pks: list[int], error: str) -> None:
+        query = (
+            update(WebhookDeliveryDB)
+            .values(status=WebhookDeliveryStatus.failed.value, last_error=error)
+            .filter(WebhookDeliveryDB.id.in_(pks))
+        )
+        await self.session.execute(query)
+
+    @staticmethod
+    def _to_domain(model: WebhookDeliveryDB) -> WebhookDelivery:
+        return WebhookDelivery(
+            id=model.id,
+            task_id=model.task_id,
+            url=model.url,
+            host=model.host,
+            payload=model.payload,
+            attempts=model.attempts,
         )
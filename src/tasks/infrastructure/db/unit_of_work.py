@@ -1,25 +1,66 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
 
+from src.core.config import settings
 from src.db.engine import async_session_maker
-from src.tasks.infrastructure.db.repositories import PGTaskRepository
+from src.tasks.infrastructure.cache import task_read_cache
+from src.tasks.infrastructure.event_bus import task_event_bus
+from src.tasks.infrastructure.events import task_event_hub
+from src.tasks.infrastructure.db.repositories import (
+    PGTaskCallbackRepository,
+    PGTaskRepository,
+    PGTaskSubmissionRepository,
+    PGWebhookDeliveryRepository,
+)
 
 
 class PGTaskUnitOfWork(ITaskUnitOfWork):
-    def __init__(self, session_factory=async_session_maker):
+    """Each `async with` block is one session and one transaction.
+
+    The same object can be entered again once the block exits, never while it is open.
+    """
+
+    def __init__(self, session_factory=async_session_maker, primary_session_factory=None):
         self.session_factory = session_factory
+        # Set when session_factory connects to a replica
+        self.primary_session_factory = primary_session_factory
+        self.session: AsyncSession | None = None
+
+    def primary(self) -> ITaskUnitOfWork:
+        if self.primary_session_factory is None:
+            return self
+        return PGTaskUnitOfWork(self.primary_session_factory)
+
+    def fork(self) -> ITaskUnitOfWork:
+        return PGTaskUnitOfWork(self.session_factory, self.primary_session_factory)
 
     async def __aenter__(self):
-        self.session: AsyncSession = self.session_factory()
+        if self.session is not None:
+            raise RuntimeError("Unit of work is already open, use another one for concurrent work")
+        self.session = self.session_factory()
         self.tasks = PGTaskRepository(self.session)
+        self.submissions = PGTaskSubmissionRepository(self.session)
+        self.callbacks = PGTaskCallbackRepository(self.session)
+        self.webhooks = PGWebhookDeliveryRepository(self.session)
         return await super().__aenter__()
 
     async def __aexit__(self, *args):
-        await super().__aexit__(*args)
-        await self.session.close()
+        try:
+            await super().__aexit__(*args)
+        finally:
+            await self.session.close()
+            self.session = None
 
     async def _commit(self):
+        if settings.TASK_EVENT_BUS and self.tasks.changed_pks:
+            await task_event_bus.notify(self.session, self.tasks.changed_pks)
         await self.session.commit()
+        # After the commit, so a lookup can't cache the old row once the new one is visible
+        task_read_cache.invalidate(self.tasks.changed_pks)
+        task_event_hub.publish(self.tasks.changed_pks)
+        self.tasks.changed_pks.clear()
 
     async def _rollback(self):
-        await self.session.rollback()
+        # Nothing to undo after a commit, unless work started again since
+        if self.session.in_transaction():
+            await self.session.rollback()
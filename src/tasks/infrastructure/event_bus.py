@@ -0,0 +1,127 @@
+import asyncio
+from typing import Iterable
+
+import asyncpg
+from loguru import logger
+from prometheus_client import Counter
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.tasks.infrastructure.cache import task_read_cache
+from src.tasks.infrastructure.events import task_event_hub
+
+task_event_bus_notifications = Counter(
+    "task_event_bus_notifications_total",
+    "Task change notifications sent to or received from the database",
+    ["direction"],
+)
+task_event_bus_reconnects = Counter(
+    "task_event_bus_reconnects_total",
+    "Times the task event bus lost its connection or couldn't connect",
+)
+
+# Postgres rejects payloads of 8000 bytes and more
+_MAX_PAYLOAD = 7900
+_MIN_RECONNECT_DELAY = 1.0
+
+
+class PGTaskEventBus:
+    """Broadcasts the tasks a commit changed to every process through Postgres LISTEN/NOTIFY.
+
+    Notifications are sent in the committing transaction, so they arrive only once the
+    change is visible, and received on a dedicated connection outside the engine's pool.
+    Each one invalidates the cached task and wakes the requests waiting on it.
+    """
+
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self._listener: asyncio.Task | None = None
+
+    async def notify(self, session: AsyncSession, pks: Iterable[int]) -> None:
+        for payload in self._make_payloads(pks):
+            await session.execute(select(func.pg_notify(self.channel, payload)))
+            task_event_bus_notifications.labels("sent").inc()
+
+    @staticmethod
+    def _make_payloads(pks: Iterable[int]) -> list[str]:
+        payloads, payload = [], ""
+        for pk in sorted(pks):
+            if len(payload) + len(str(pk)) + 1 > _MAX_PAYLOAD:
+                payloads.append(payload)
+                payload = ""
+            payload = f"{payload},{pk}" if payload else str(pk)
+        if payload:
+            payloads.append(payload)
+        return payloads
+
+    def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen(), name="task event bus")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def _listen(self) -> None:
+        """Keeps a listening connection until cancelled, whatever error ends the previous one"""
+        delay = _MIN_RECONNECT_DELAY
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                task_event_bus_reconnects.inc()
+                logger.warning(f"Can't connect the task event bus, retrying in {delay}s: {e!r}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.TASK_EVENT_BUS_MAX_RECONNECT_DELAY)
+                continue
+
+            delay = _MIN_RECONNECT_DELAY
+            try:
+                await self._serve(connection)
+            except (OSError, asyncpg.PostgresError, TimeoutError) as e:
+                task_event_bus_reconnects.inc()
+                logger.warning(f"Task event bus connection lost, reconnecting in {delay}s: {e!r}")
+            except Exception:
+                task_event_bus_reconnects.inc()
+                logger.exception(f"Task event bus failed, reconnecting in {delay}s")
+            finally:
+                connection.terminate()
+            # Waiters time out on their own meanwhile, and the reconnect wakes them all
+            await asyncio.sleep(delay)
+
+    async def _serve(self, connection: asyncpg.Connection) -> None:
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        await connection.add_listener(self.channel, self._on_notification)
+        # Changes committed while nobody listened are unknown, so everything is read again
+        task_read_cache.clear()
+        task_event_hub.publish_all()
+        logger.info(f"Task event bus listening on {self.channel!r}")
+
+        while not closed.is_set():
+            try:
+                await asyncio.wait_for(closed.wait(), settings.TASK_EVENT_BUS_PING_INTERVAL)
+            except TimeoutError:
+                # A silently dropped connection only shows when it's used
+                await connection.execute("SELECT 1", timeout=settings.TASK_EVENT_BUS_PING_INTERVAL)
+        raise ConnectionError("Task event bus connection closed")
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        task_event_bus_notifications.labels("received").inc()
+        try:
+            pks = [int(pk) for pk in payload.split(",")]
+        except ValueError:
+            logger.warning(f"Ignored malformed task event {payload!r}")
+            return
+        task_read_cache.invalidate(pks)
+        task_event_hub.publish(pks)
+
+
+task_event_bus = PGTaskEventBus(
+    make_url(settings.DATABASE_URI).set(drivername="postgresql").render_as_string(hide_password=False),
+    settings.TASK_EVENT_BUS_CHANNEL,
+)
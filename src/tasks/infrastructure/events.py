@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from prometheus_client import Counter, Gauge
+
+from src.core.config import settings
+
+task_event_subscribers = Gauge(
+    "task_event_subscribers",
+    "Requests waiting for a task to change",
+)
+task_events_dropped = Counter(
+    "task_events_dropped_total",
+    "Task events dropped from the full queue of a slow subscriber",
+)
+
+
+class TaskSubscription:
+    def __init__(self, pk: int, queue_size: int):
+        self.pk = pk
+        self._queue: asyncio.Queue[int] = asyncio.Queue(queue_size)
+
+    def put(self, pk: int) -> None:
+        # Every event means "read the task again", so dropping the oldest loses nothing
+        if self._queue.full():
+            self._queue.get_nowait()
+            task_events_dropped.inc()
+        self._queue.put_nowait(pk)
+
+    async def wait(self, timeout: float) -> bool:
+        """Waits for the task to change, False if it didn't within timeout"""
+        try:
+            await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return False
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        return True
+
+
+class TaskEventHub:
+    """Wakes up the requests waiting on a task when a commit changes it.
+
+    Commits of other processes only get here through the PGTaskEventBus.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[TaskSubscription]] = {}
+
+    @contextmanager
+    def subscribe(self, pk: int) -> Iterator[TaskSubscription]:
+        subscription = TaskSubscription(pk, self.queue_size)
+        self._subscriptions.setdefault(pk, set()).add(subscription)
+        task_event_subscribers.inc()
+        try:
+            yield subscription
+        finally:
+            task_event_subscribers.dec()
+            subscriptions = self._subscriptions[pk]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[pk]
+
+    def publish(self, pks: Iterable[int]) -> None:
+        for pk in pks:
+            for subscription in self._subscriptions.get(pk, ()):
+                subscription.put(pk)
+
+    def publish_all(self) -> None:
+        self.publish(list(self._subscriptions))
+
+
+task_event_hub = TaskEventHub(settings.TASK_EVENTS_QUEUE_SIZE)
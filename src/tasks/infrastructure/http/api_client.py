@@ -1,23 +1,74 @@
+import asyncio
+from urllib.parse import urlsplit
+
 import aiohttp
 from loguru import logger
 
-from src.tasks.domain.entities import Task
+from src.core.config import settings
+from src.integrations.infrastructure.http.aiohttp_client import WebhookHttpClient
+from src.integrations.infrastructure.http.resilience import get_host_resilience
 from src.tasks.domain.interfaces.http_client import IAsyncHttpClient, TResponse
-from src.tasks.domain.mappers import TaskEntityToDTOMapper
-from src.tasks.infrastructure.http.http_client import TaskAiohttpClient
 
 
 class TaskWebhookClientService:
+    """Posts client webhooks, at most WEBHOOK_HOST_CONCURRENCY at a time per host and
+    through the host circuit breaker, so one slow client can't take all delivery slots.
+    """
+
+    _in_flight: dict[str, int] = {}
+    _slots: dict[str, asyncio.Semaphore] = {}
+
     def __init__(
         self,
-        client: IAsyncHttpClient[TResponse] = TaskAiohttpClient,
+        client: IAsyncHttpClient[TResponse] = WebhookHttpClient,
         headers: dict | None = None,
     ):
         self.client = client
         self.headers = headers or {}
 
-    async def send_webhook(self, url: str, task: Task) -> aiohttp.ClientResponse:
-        data = TaskEntityToDTOMapper().map_one(task)
-        response = await self.client.post(url, json=data.model_dump(), headers=self.headers)
-        logger.info(f"Sended webhook for task #{task.id}. Response: {response}")
-        return response
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlsplit(url).netloc
+
+    @classmethod
+    def get_busy_hosts(cls) -> list[str]:
+        """Hosts that can't take another delivery right now"""
+        busy = [host for host, count in cls._in_flight.items() if count >= settings.WEBHOOK_HOST_CONCURRENCY]
+        busy += [
+            host
+            for host in cls._in_flight
+            if host not in busy and get_host_resilience(f"//{host}").breaker.is_open()
+        ]
+        return busy
+
+    async def send_webhook(self, url: str, payload: dict | list[dict]) -> None:
+        host = self.get_host(url)
+        breaker = get_host_resilience(url).breaker
+        slot = self._slots.setdefault(host, asyncio.Semaphore(settings.WEBHOOK_HOST_CONCURRENCY))
+        self._in_flight[host] = self._in_flight.get(host, 0) + 1
+        try:
+            async with slot:
+                breaker.before_call()
+                try:
+                    response = await self.client.post(url, json=payload, headers=self.headers)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    breaker.on_failure()
+                    raise
+                except BaseException:
+                    # Cancelled or a bug of ours, nothing learned about the host
+                    breaker.release()
+                    raise
+                async with response:
+                    # Only the host being down counts against it, a rejecting client is its own problem
+                    if response.status >= 500:
+                        breaker.on_failure()
+                    else:
+                        breaker.on_success()
+                    logger.info(f"Sent webhook to {url}. Response: {response.status}")
+                    response.raise_for_status()
+        finally:
+            self._in_flight[host] -= 1
+            # Waiters on the slot are counted too, so nobody holds it anymore
+            if not self._in_flight[host]:
+                del self._in_flight[host]
+                del self._slots[host]
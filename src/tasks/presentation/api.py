@@ -1,41 +1,40 @@
 """All paths are the same as HailuoAPI for fotobudka compability"""
 
-import io
 from loguru import logger
-from pathlib import Path
 from fastapi import (
     APIRouter,
     Body,
     Depends,
     File,
+    Header,
+    Query,
     UploadFile,
     HTTPException,
-    BackgroundTasks,
 )
-from fastapi.responses import Response, FileResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 
 from src.core.config import settings
-from src.integrations.infrastructure.external_api.kling.adapter import KlingAdapter
-from src.integrations.presentation.dependencies import get_kling_adapter
-from src.localstorage.infrastructure.repository import LocalStorageRepository
-from src.localstorage.presentation.dependencies import get_local_storage_repository
-from src.tasks.application.use_cases.task_store import store_task_result
+from src.localstorage.presentation.responses import ResultFileResponse
 from src.tasks.domain.dtos import (
     TaskCreateFromImageDTO,
     TaskCreateFromTextDTO,
     TaskReadDTO,
     TaskCreateFromMultiImageDTO,
 )
-from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient
+from src.tasks.domain.entities import TaskSubmissionKind
+from src.tasks.domain.interfaces.task_source_client import ITaskCreationClient
 from src.tasks.domain.mappers import TaskEntityToDTOMapper
+from src.tasks.infrastructure.cache import CachedTask
 from src.tasks.presentation.dependencies import (
-    TaskWebhookClientServiceDepend,
+    TaskStorageDepend,
+    TaskReadUoWDepend,
     TaskUoWDepend,
     get_task_source_client,
 )
+from src.tasks.presentation.uploads import remove_spooled, spool_upload
 
 from src.tasks.application.use_cases.task_create import create_task as uc_create_task
-from src.tasks.application.use_cases.task_status import get_task as uc_get_task
+from src.tasks.application.use_cases.task_status import get_cached_task as uc_get_cached_task
 from src.tasks.application.use_cases.task_store import (
     get_task_result as uc_get_task_result,
 )
@@ -55,9 +54,20 @@ from src.tasks.application.use_cases.task_run import (
 from src.tasks.application.use_cases.task_run import (
     run_task_text2video as uc_run_task_text2video,
 )
-from src.tasks.application.use_cases.task_status import get_task as uc_get_task
 from src.tasks.application.use_cases.task_store import (
     get_task_result as uc_get_task_result,
+    get_task_result_url as uc_get_task_result_url,
+)
+from src.tasks.application.use_cases.task_wait_finish import (
+    wait_task_change as uc_wait_task_change,
+    watch_task as uc_watch_task,
+)
+from src.tasks.application.use_cases.task_callback import (
+    enqueue_task_callback as uc_enqueue_task_callback,
+)
+from src.tasks.application.use_cases.task_submit import (
+    check_submission_backlog as uc_check_submission_backlog,
+    enqueue_task as uc_enqueue_task,
 )
 
 tasks_router = APIRouter()
@@ -67,7 +77,7 @@ tasks_router = APIRouter()
 async def create_task_from_text(
     task_data: TaskCreateFromTextDTO,
     uow: TaskUoWDepend,
-    task_source: ITaskSourceClient = Depends(get_task_source_client),
+    task_source: ITaskCreationClient = Depends(get_task_source_client),
 ):
     task = await uc_create_task(task_data, uow)
     task_data.callback_url = "https://" + settings.DOMAIN + "/webhook/" + str(task.id)
@@ -77,51 +87,89 @@ async def create_task_from_text(
 
 @tasks_router.post("/generate", response_model=TaskReadDTO)
 async def create_task_from_image(
-    background_tasks: BackgroundTasks,
     uow: TaskUoWDepend,
     image_tail: UploadFile | None = File(None),
-    task_source: ITaskSourceClient = Depends(get_task_source_client),
     file: UploadFile = File(),
     task_data: TaskCreateFromImageDTO = Depends(TaskCreateFromImageDTO.as_form),
 ):
-    task = await uc_create_task(task_data, uow)
-    task_data.callback_url = "https://" + settings.DOMAIN + "/webhook/" + str(task.id)
-    image = io.BytesIO(await file.read())
-    image_tail_data = None
-    if image_tail is not None:
-        image_tail_data = io.BytesIO(await image_tail.read())
-    background_tasks.add_task(
-        uc_run_task_image2video,
-        task.id,
-        task_data,
-        image,
-        image_tail_data,
-        task_source,
-        uow,
-    )
+    await uc_check_submission_backlog(uow)
+    image, image_tail_path = None, None
+    try:
+        image = await spool_upload(file)
+        if image_tail is not None:
+            image_tail_path = await spool_upload(image_tail)
+        task = await uc_enqueue_task(
+            task_data,
+            TaskSubmissionKind.image2video,
+            [image],
+            image_tail_path,
+            "https://" + settings.DOMAIN + "/webhook/",
+            uow,
+        )
+    except BaseException:
+        remove_spooled([image, image_tail_path])
+        raise
     return TaskEntityToDTOMapper().map_one(task)
 
 
 @tasks_router.get("/generation/{task_id}", response_model=TaskReadDTO)
-async def get_task(task_id: int, uow: TaskUoWDepend):
-    task = await uc_get_task(task_id, uow)
-    return TaskEntityToDTOMapper().map_one(task)
+async def get_task(task_id: int, uow: TaskReadUoWDepend, if_none_match: str | None = Header(None)):
+    task = await uc_get_cached_task(task_id, uow)
+    return _task_response(task, if_none_match)
 
 
-@tasks_router.post("/webhook/{task_id}", include_in_schema=False)
-async def task_result_webhook(
+@tasks_router.get("/generation/{task_id}/wait", response_model=TaskReadDTO)
+async def wait_task(
     task_id: int,
-    uow: TaskUoWDepend,
-    task_api_client: TaskWebhookClientServiceDepend,
-    body: dict = Body(),
-    storage: LocalStorageRepository = Depends(get_local_storage_repository),
-    task_source: ITaskSourceClient = Depends(get_task_source_client),
+    uow: TaskReadUoWDepend,
+    if_none_match: str | None = Header(None),
+    timeout: float = Query(30, gt=0, le=settings.TASK_LONG_POLL_MAX_TIMEOUT),
 ):
+    """Long poll: answers once the task differs from the If-None-Match version, or without
+    If-None-Match once it's finished, and with the current version after timeout seconds"""
+    etag = if_none_match.strip().removeprefix("W/") if if_none_match else None
+    task = await uc_wait_task_change(task_id, uow, etag, timeout)
+    return _task_response(task, if_none_match)
+
+
+@tasks_router.get("/generation/{task_id}/events", response_class=StreamingResponse)
+async def watch_task(task_id: int, uow: TaskReadUoWDepend, last_event_id: str | None = Header(None)):
+    """Server-sent events: a `task` event with the task's JSON on every change, until it's finished"""
+    # Reads the task once up front, so an unknown one gets a 404 instead of an empty stream
+    task = await uc_get_cached_task(task_id, uow)
+    if task.terminal and task.etag == last_event_id:
+        # Tells a reconnecting EventSource that there is nothing more to wait for
+        return Response(status_code=204)
+
+    async def stream():
+        async for task in uc_watch_task(task_id, uow, last_event_id):
+            if task is None:
+                yield b": keepalive\n\n"
+            else:
+                yield b"event: task\nid: " + task.etag.encode() + b"\ndata: " + task.body + b"\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+    )
+
+
+def _task_response(task: CachedTask, if_none_match: str | None) -> Response:
+    # Pollers revalidate every time, a 304 spares them the body and, on a cache hit, the database
+    headers = {"etag": task.etag, "cache-control": "no-cache"}
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or task.etag in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(task.body, media_type="application/json", headers=headers)
+
+
+@tasks_router.post("/webhook/{task_id}", include_in_schema=False)
+async def task_result_webhook(task_id: int, uow: TaskUoWDepend, body: dict = Body()):
     logger.debug(body)
     try:
-        await store_task_result(
-            task_id, body, uow, task_source, task_api_client, storage
-        )
+        await uc_enqueue_task_callback(task_id, body, uow)
     except HTTPException as e:
         logger.warning(e)
 
@@ -129,8 +177,6 @@ async def task_result_webhook(
 @tasks_router.post("/generatemulti", response_model=TaskReadDTO)
 async def create_task_from_multi_image(
     uow: TaskUoWDepend,
-    background_tasks: BackgroundTasks,
-    task_source: KlingAdapter = Depends(get_kling_adapter),
     files: list[UploadFile] = File(..., description="Up to 4 images"),
     task_data: TaskCreateFromMultiImageDTO = Depends(
         TaskCreateFromMultiImageDTO.as_form
@@ -141,29 +187,39 @@ async def create_task_from_multi_image(
     if len(files) == 0:
         raise HTTPException(status_code=400, detail="At least 1 image required")
 
-    task = await uc_create_task(task_data, uow)
-    task_data.callback_url = "https://" + settings.DOMAIN + "/webhook/" + str(task.id)
-
+    await uc_check_submission_backlog(uow)
     images = []
-    for file in files:
-        image_data = io.BytesIO(await file.read())
-        images.append(image_data)
-
-    background_tasks.add_task(
-        uc_run_task_multiimage2video, task.id, task_data, images, task_source, uow
-    )
+    try:
+        for file in files:
+            images.append(await spool_upload(file))
+        task = await uc_enqueue_task(
+            task_data,
+            TaskSubmissionKind.multiimage2video,
+            images,
+            None,
+            "https://" + settings.DOMAIN + "/webhook/",
+            uow,
+        )
+    except BaseException:
+        remove_spooled(images)
+        raise
     return TaskEntityToDTOMapper().map_one(task)
 
 
-@tasks_router.get("/result/{task_id}", response_class=Response)
-async def get_task_result(
-    task_id: int,
-    storage: LocalStorageRepository = Depends(get_local_storage_repository),
-):
-    return FileResponse(
-        path=Path(settings.LOCAL_STORAGE_PATH) / str(task_id),
+@tasks_router.api_route("/result/{task_id}", methods=["GET", "HEAD"], response_class=Response)
+async def get_task_result(task_id: int, storage: TaskStorageDepend):
+    url = await uc_get_task_result_url(task_id, storage)
+    if url is not None:
+        return RedirectResponse(url, status_code=307)
+
+    path = await uc_get_task_result(task_id, storage)
+    accel_redirect = None
+    if settings.RESULT_ACCEL_REDIRECT_PREFIX:
+        relative_path = path.relative_to(settings.LOCAL_STORAGE_PATH).as_posix()
+        accel_redirect = settings.RESULT_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative_path
+    return ResultFileResponse(
+        path=path,
         media_type="video/mp4",
         filename=f"{task_id}.mp4",
+        accel_redirect=accel_redirect,
     )
-    buffer = uc_get_task_result(task_id, storage)
-    return Response(content=buffer.getvalue(), media_type="video/mp4")
@@ -1,26 +1,57 @@
 from typing import Annotated
 from fastapi import Depends
 
+from src.core.config import settings
+from src.db.engine import async_session_maker, read_session_maker, worker_session_maker
 from src.integrations.infrastructure.external_api.fal.adapter import FalKlingAdapter
-from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient
-from src.tasks.domain.interfaces.task_source_client import ITaskSourceClient
+from src.integrations.infrastructure.external_api.router import RoutingTaskSourceClient
+from src.integrations.infrastructure.external_api.scheduler import ScheduledTaskSourceClient
+from src.integrations.infrastructure.http.aiohttp_client import AiohttpClient, WebhookHttpClient
+from src.integrations.presentation.dependencies import get_kling_adapter
+from src.localstorage.presentation.dependencies import get_async_local_storage_repository
+from src.s3storage.presentation.dependencies import get_s3_storage_repository
+from src.tasks.domain.entities import TaskSource
+from src.tasks.domain.interfaces.task_result_storage import IAsyncTaskStorageRepository
+from src.tasks.domain.interfaces.task_source_client import ITaskCreationClient, ITaskSourceClient
 from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
 from src.tasks.infrastructure.db.unit_of_work import PGTaskUnitOfWork
 from src.tasks.infrastructure.http.api_client import TaskWebhookClientService
-from src.tasks.infrastructure.http.http_client import TaskAiohttpClient
 
 
 def get_task_uow() -> ITaskUnitOfWork:
     return PGTaskUnitOfWork()
 
 
+def get_task_read_uow() -> ITaskUnitOfWork:
+    return PGTaskUnitOfWork(read_session_maker, async_session_maker if settings.DB_REPLICA_URI else None)
+
+
+def get_task_worker_uow() -> ITaskUnitOfWork:
+    return PGTaskUnitOfWork(worker_session_maker)
+
+
 def get_task_webhook_client() -> TaskWebhookClientService:
-    return TaskWebhookClientService(TaskAiohttpClient())
+    return TaskWebhookClientService(WebhookHttpClient())
+
+
+def get_task_source_clients() -> dict[TaskSource, ITaskSourceClient]:
+    return {TaskSource.fal: FalKlingAdapter(AiohttpClient()), TaskSource.kling: get_kling_adapter()}
+
+
+def get_task_source_client() -> ITaskCreationClient:
+    clients = get_task_source_clients()
+    return RoutingTaskSourceClient(
+        [ScheduledTaskSourceClient(clients[TaskSource(source)]) for source in settings.TASK_SOURCES]
+    )
 
 
-def get_task_source_client() -> ITaskSourceClient:
-    return FalKlingAdapter(AiohttpClient())
+def get_task_storage_repository() -> IAsyncTaskStorageRepository:
+    if settings.STORAGE_BACKEND == "s3":
+        return get_s3_storage_repository()
+    return get_async_local_storage_repository()
 
 
 TaskUoWDepend = Annotated[ITaskUnitOfWork, Depends(get_task_uow)]
+TaskReadUoWDepend = Annotated[ITaskUnitOfWork, Depends(get_task_read_uow)]
 TaskWebhookClientServiceDepend = Annotated[TaskWebhookClientService, Depends(get_task_webhook_client)]
+TaskStorageDepend = Annotated[IAsyncTaskStorageRepository, Depends(get_task_storage_repository)]
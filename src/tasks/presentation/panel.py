@@ -2,9 +2,8 @@ from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
-from src.tasks.application.use_cases.task_status import get_task
-from src.tasks.domain.entities import TaskStatus
-from src.tasks.presentation.dependencies import TaskUoWDepend
+from src.tasks.application.use_cases.task_status import get_cached_task
+from src.tasks.presentation.dependencies import TaskReadUoWDepend
 
 
 router = APIRouter()
@@ -27,11 +26,13 @@ async def image2video_page(request: Request):
 
 
 @router.get("/task/{task_id}", response_class=HTMLResponse)
-async def task_page(request: Request, task_id: int, uow: TaskUoWDepend):
-    task = await get_task(task_id, uow)
-    if task.status == TaskStatus.failed:
-        return templates.TemplateResponse("task_failed.html", {"request": request, "message": task.error})
-    elif task.status != TaskStatus.finished:
-        return templates.TemplateResponse("task_processing.html", {"request": request})
-    elif task.status == TaskStatus.finished:
-        return templates.TemplateResponse("task_finished.html", {"request": request, "result_url": task.result})
+async def task_page(request: Request, task_id: int, uow: TaskReadUoWDepend):
+    task = (await get_cached_task(task_id, uow)).dto
+    # Statuses as mapped by TaskEntityToDTOMapper: 3 is finished, 4 failed or expired
+    if task.data.status == 4:
+        message = task.messages[0] if task.messages else None
+        return templates.TemplateResponse("task_failed.html", {"request": request, "message": message})
+    elif task.data.status != 3:
+        return templates.TemplateResponse("task_processing.html", {"request": request, "task_id": task_id})
+    else:
+        return templates.TemplateResponse("task_finished.html", {"request": request, "result_url": task.data.result})
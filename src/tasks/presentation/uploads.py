@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from src.core.config import settings
+
+
+async def spool_upload(upload: UploadFile) -> Path:
+    """Copies an upload under SUBMISSION_SPOOL_PATH, where it waits for the submit workers.
+
+    The spool has to outlive the request and the process, so in a multi-node setup it
+    must be on storage shared by all app nodes.
+    """
+    if upload.size is not None and upload.size > settings.UPLOAD_MAX_FILE_SIZE:
+        raise HTTPException(413, f"File {upload.filename} is too large")
+
+    os.makedirs(settings.SUBMISSION_SPOOL_PATH, exist_ok=True)
+    spooled = NamedTemporaryFile(dir=settings.SUBMISSION_SPOOL_PATH, prefix="upload-", delete=False)
+    try:
+        size = 0
+        while chunk := await upload.read(settings.RESULT_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.UPLOAD_MAX_FILE_SIZE:
+                raise HTTPException(413, f"File {upload.filename} is too large")
+            await run_in_threadpool(spooled.write, chunk)
+    except BaseException:
+        spooled.close()
+        os.unlink(spooled.name)
+        raise
+    spooled.close()
+    return Path(spooled.name)
+
+
+def remove_spooled(paths: list[Path | None]) -> None:
+    for path in paths:
+        if path is not None:
+            path.unlink(missing_ok=True)
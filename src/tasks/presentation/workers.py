@@ -0,0 +1,156 @@
+import asyncio
+from loguru import logger
+
+from src.core.config import settings
+from src.localstorage.presentation.dependencies import get_async_local_storage_repository
+from src.tasks.application.use_cases.task_retention import (
+    RESULT_SHARDS,
+    sweep_task_results as uc_sweep_task_results,
+)
+from src.tasks.application.use_cases.task_callback import (
+    handle_task_callback as uc_handle_task_callback,
+)
+from src.tasks.application.use_cases.task_store import TaskResultBuffer
+from src.tasks.application.use_cases.task_reconcile import (
+    claim_stale_tasks as uc_claim_stale_tasks,
+    fail_overdue_tasks as uc_fail_overdue_tasks,
+    reconcile_task as uc_reconcile_task,
+)
+from src.tasks.application.use_cases.task_submit import (
+    process_task_submission as uc_process_task_submission,
+)
+from src.tasks.application.use_cases.task_webhook import (
+    claim_webhook_deliveries as uc_claim_webhook_deliveries,
+    deliver_webhooks as uc_deliver_webhooks,
+)
+from src.tasks.domain.entities import Task, TaskSubmissionKind
+from src.tasks.presentation.dependencies import (
+    get_task_source_client,
+    get_task_source_clients,
+    get_task_storage_repository,
+    get_task_webhook_client,
+    get_task_worker_uow,
+)
+
+_workers: list[asyncio.Task] = []
+_buffers: list[asyncio.Task] = []
+
+
+async def run_retention_sweeper() -> None:
+    """Visits one result shard per tick, so the store is never scanned in one go"""
+    usage: dict[str, int] = {}
+    while True:
+        for shard in RESULT_SHARDS:
+            try:
+                await uc_sweep_task_results(
+                    shard, usage, get_task_worker_uow(), get_async_local_storage_repository()
+                )
+            except Exception as e:
+                logger.exception(e)
+            await asyncio.sleep(settings.RETENTION_SWEEP_INTERVAL)
+
+
+async def run_submission_worker() -> None:
+    """Drains the task submission queue, polling while it is empty"""
+    client = get_task_source_client()
+    clients = {kind: client for kind in TaskSubmissionKind}
+    while True:
+        try:
+            if await uc_process_task_submission(get_task_worker_uow(), clients):
+                continue
+        except Exception as e:
+            logger.exception(e)
+        await asyncio.sleep(settings.SUBMISSION_POLL_INTERVAL)
+
+
+async def run_callback_worker(buffer: TaskResultBuffer | None) -> None:
+    """Processes queued provider callbacks, polling while there are none"""
+    clients = get_task_source_clients()
+    while True:
+        try:
+            if await uc_handle_task_callback(get_task_worker_uow(), clients, get_task_storage_repository(), buffer):
+                continue
+        except Exception as e:
+            logger.exception(e)
+        await asyncio.sleep(settings.CALLBACK_POLL_INTERVAL)
+
+
+async def _reconcile(task: Task) -> None:
+    try:
+        await uc_reconcile_task(task, get_task_worker_uow(), get_task_source_clients())
+    except Exception as e:
+        logger.error(f"Can't reconcile task #{task.id}: {e!r}")
+
+
+async def run_reconciler() -> None:
+    """Polls providers for tasks whose webhook never came, a batch of tasks at a time"""
+    while True:
+        tasks = []
+        try:
+            await uc_fail_overdue_tasks(get_task_worker_uow())
+            tasks = await uc_claim_stale_tasks(get_task_worker_uow())
+            async with asyncio.TaskGroup() as group:
+                for task in tasks:
+                    group.create_task(_reconcile(task))
+        except Exception as e:
+            logger.exception(e)
+        if len(tasks) < settings.RECONCILE_BATCH_SIZE:
+            await asyncio.sleep(settings.RECONCILE_TICK)
+
+
+def _log_delivery_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.opt(exception=task.exception()).error(f"Webhook delivery failed: {task.exception()!r}")
+
+
+async def run_webhook_dispatcher() -> None:
+    """Keeps up to WEBHOOK_CONCURRENCY webhook requests in flight without waiting on any of them,
+    so a slow client only holds its own host's slots
+    """
+    http_client = get_task_webhook_client()
+    in_flight: set[asyncio.Task] = set()
+    try:
+        while True:
+            requests = []
+            capacity = settings.WEBHOOK_CONCURRENCY - len(in_flight)
+            if capacity > 0:
+                try:
+                    requests = await uc_claim_webhook_deliveries(get_task_worker_uow(), capacity)
+                except Exception as e:
+                    logger.exception(e)
+            for deliveries in requests:
+                task = asyncio.create_task(uc_deliver_webhooks(deliveries, get_task_worker_uow(), http_client))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                task.add_done_callback(_log_delivery_error)
+            if not requests:
+                await asyncio.sleep(settings.WEBHOOK_POLL_INTERVAL)
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+def start_workers() -> None:
+    for number in range(settings.SUBMISSION_WORKERS):
+        _workers.append(asyncio.create_task(run_submission_worker(), name=f"submission-{number}"))
+    buffer = None
+    if settings.TASK_WRITE_BEHIND:
+        buffer = TaskResultBuffer(get_task_worker_uow)
+        _buffers.append(asyncio.create_task(buffer.run(), name="write-behind"))
+    for number in range(settings.CALLBACK_WORKERS):
+        _workers.append(asyncio.create_task(run_callback_worker(buffer), name=f"callback-{number}"))
+    _workers.append(asyncio.create_task(run_webhook_dispatcher(), name="webhooks"))
+    if settings.RECONCILE_ENABLED:
+        _workers.append(asyncio.create_task(run_reconciler(), name="reconciler"))
+    # Objects in S3 expire through the bucket lifecycle rules instead
+    if settings.RETENTION_ENABLED and settings.STORAGE_BACKEND == "local":
+        _workers.append(asyncio.create_task(run_retention_sweeper(), name="retention"))
+
+
+async def stop_workers() -> None:
+    # Buffers are stopped, and flushed, once nothing writes to them anymore
+    for workers in (_workers, _buffers):
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        workers.clear()
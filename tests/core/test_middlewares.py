@@ -0,0 +1,110 @@
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.core.middlewares import BodySizeLimitMiddleware
+
+LIMIT = 16
+CHUNK = b"x" * 4
+
+
+class RecordingApp:
+    """Buffers the whole request body, like a form or JSON parser would"""
+
+    def __init__(self):
+        self.called = False
+        self.body = b""
+
+    async def __call__(self, scope, receive, send):
+        self.called = True
+        while True:
+            message = await receive()
+            self.body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+class EndlessBody:
+    """Streams chunks forever, counting how many were pulled"""
+
+    def __init__(self):
+        self.chunks = 0
+
+    async def __call__(self):
+        self.chunks += 1
+        return {"type": "http.request", "body": CHUNK, "more_body": True}
+
+
+def run(app, headers: list[tuple[bytes, bytes]], receive) -> list[dict]:
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": headers}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(BodySizeLimitMiddleware(app, max_body_size=LIMIT)(scope, receive, send))
+    return sent
+
+
+def status_of(sent: list[dict]) -> int:
+    return next(message["status"] for message in sent if message["type"] == "http.response.start")
+
+
+def test_declared_oversized_body_is_rejected_unread():
+    app = RecordingApp()
+    body = EndlessBody()
+
+    sent = run(app, [(b"content-length", str(LIMIT + 1).encode())], body)
+
+    assert status_of(sent) == 413
+    assert (b"connection", b"close") in sent[0]["headers"]
+    assert not app.called
+    assert body.chunks == 0
+
+
+def test_chunked_body_is_cut_off_at_the_limit():
+    app = RecordingApp()
+    body = EndlessBody()
+
+    sent = run(app, [(b"transfer-encoding", b"chunked")], body)
+
+    assert status_of(sent) == 413
+    assert body.chunks == LIMIT // len(CHUNK) + 1
+    assert len(app.body) <= LIMIT
+
+
+def test_body_within_the_limit_reaches_the_app():
+    app = RecordingApp()
+    messages = iter([
+        {"type": "http.request", "body": CHUNK, "more_body": True},
+        {"type": "http.request", "body": CHUNK, "more_body": False},
+    ])
+
+    async def receive():
+        return next(messages)
+
+    sent = run(app, [(b"content-length", b"8")], receive)
+
+    assert status_of(sent) == 200
+    assert app.body == CHUNK * 2
+
+
+def test_chunked_upload_through_the_app_gets_413():
+    def upload():
+        for _ in range(100):
+            yield CHUNK
+
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=LIMIT)
+
+    @app.post("/upload")
+    async def receive_upload(request: Request):
+        return {"size": len(await request.body())}
+
+    # No Content-Length, so only the received bytes can trip the limit
+    response = TestClient(app).post("/upload", content=upload())
+
+    assert response.status_code == 413
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from src.integrations.infrastructure.credentials import Credential, CredentialCache
+
+
+class Issuer:
+    def __init__(self, lifetime: float):
+        self.lifetime = lifetime
+        self.minted = 0
+
+    async def mint(self) -> Credential:
+        self.minted += 1
+        await asyncio.sleep(0.01)
+        return Credential(value=f"token-{self.minted}", expires_at=time.time() + self.lifetime)
+
+
+def test_concurrent_misses_mint_one_token():
+    cache = CredentialCache("test", refresh_margin=60)
+    issuer = Issuer(lifetime=3600)
+
+    async def main():
+        return await asyncio.gather(*(cache.get(issuer.mint) for _ in range(50)))
+
+    assert asyncio.run(main()) == ["token-1"] * 50
+    assert issuer.minted == 1
+
+
+def test_fresh_token_is_served_from_the_cache():
+    cache = CredentialCache("test", refresh_margin=60)
+    issuer = Issuer(lifetime=3600)
+
+    async def main():
+        await cache.get(issuer.mint)
+        return await asyncio.gather(*(cache.get(issuer.mint) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["token-1"] * 10
+    assert issuer.minted == 1
+
+
+def test_token_near_expiry_is_served_while_one_refresh_runs():
+    cache = CredentialCache("test", refresh_margin=60)
+    # Expires within the refresh margin
+    issuer = Issuer(lifetime=30)
+
+    async def main():
+        await cache.get(issuer.mint)
+        issuer.lifetime = 3600
+        stale = await asyncio.gather(*(cache.get(issuer.mint) for _ in range(10)))
+        await asyncio.sleep(0.05)
+        return stale, await cache.get(issuer.mint)
+
+    stale, refreshed = asyncio.run(main())
+
+    # Nobody waited on the refresh, and it ran once for all of them
+    assert stale == ["token-1"] * 10
+    assert refreshed == "token-2"
+    assert issuer.minted == 2
+
+
+def test_expired_token_makes_callers_wait_for_one_refresh():
+    cache = CredentialCache("test", refresh_margin=60)
+    issuer = Issuer(lifetime=-1)
+
+    async def main():
+        await cache.get(issuer.mint)
+        return await asyncio.gather(*(cache.get(issuer.mint) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["token-2"] * 10
+    assert issuer.minted == 2
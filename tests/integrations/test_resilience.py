@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.integrations.infrastructure.http.resilience import (
+    CircuitOpenError,
+    CircuitState,
+    get_host_resilience,
+    send_with_retries,
+)
+
+
+class FakeResponse:
+    status = 200
+    headers: dict = {}
+
+    def release(self) -> None:
+        pass
+
+
+def open_breaker(url: str):
+    breaker = get_host_resilience(url).breaker
+    breaker._set_state(CircuitState.open)
+    breaker._opened_at = time.monotonic() - settings.HTTP_BREAKER_RESET_TIMEOUT - 1
+    return breaker
+
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    url = "https://cancelled-probe.test/task"
+    breaker = open_breaker(url)
+
+    async def main():
+        probe = asyncio.create_task(send_with_retries("GET", url, lambda: asyncio.sleep(60)))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitState.half_open
+        with pytest.raises(CircuitOpenError):
+            await send_with_retries("GET", url, lambda: asyncio.sleep(0, FakeResponse()))
+
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await send_with_retries("GET", url, lambda: asyncio.sleep(0, FakeResponse()))
+
+    assert asyncio.run(main()).status == 200
+    assert breaker.state == CircuitState.closed
+
+
+def test_unexpected_probe_error_reopens_the_breaker():
+    url = "https://failed-probe.test/task"
+    breaker = open_breaker(url)
+
+    async def send():
+        raise ValueError("Unexpected")
+
+    with pytest.raises(ValueError):
+        asyncio.run(send_with_retries("GET", url, send))
+    assert breaker.state == CircuitState.open
+    assert not breaker._probing
@@ -0,0 +1,69 @@
+import asyncio
+import io
+
+import aiohttp
+import pytest
+
+from src.core.config import settings
+from src.integrations.infrastructure.external_api import router as router_module
+from src.integrations.infrastructure.external_api.mocked_source import MockedTaskSourceClient
+from src.integrations.infrastructure.external_api.router import RoutingTaskSourceClient
+from src.tasks.domain.dtos import TaskCreateFromImageDTO
+from src.tasks.domain.entities import TaskSource
+
+
+@pytest.fixture(autouse=True)
+def routing(monkeypatch):
+    monkeypatch.setattr(router_module, "_health", {})
+    monkeypatch.setattr(settings, "ROUTING_EXPLORE_RATIO", 0.0)
+
+
+def make_sources(fal_latency: float, kling_latency: float):
+    fal = MockedTaskSourceClient(TaskSource.fal, fal_latency)
+    kling = MockedTaskSourceClient(TaskSource.kling, kling_latency)
+    return fal, kling, RoutingTaskSourceClient([fal, kling])
+
+
+async def submit(router: RoutingTaskSourceClient, tasks: int) -> dict[TaskSource, int]:
+    routed = {TaskSource.fal: 0, TaskSource.kling: 0}
+    for _ in range(tasks):
+        task_data = TaskCreateFromImageDTO(app_id="test", user_id="test", prompt="test")
+        result = await router.create_task_image2video(task_data, io.BytesIO(b"\xff"), None)
+        routed[result.source] += 1
+    return routed
+
+
+def test_traffic_moves_away_from_a_source_that_slows_down():
+    fal, kling, router = make_sources(0.01, 0.05)
+
+    async def main():
+        healthy = await submit(router, 10)
+        fal.latency = 0.2
+        slow = await submit(router, 10)
+        return healthy, slow
+
+    healthy, slow = asyncio.run(main())
+
+    # Each source is tried once while unmeasured, then the faster one gets the rest
+    assert healthy == {TaskSource.fal: 9, TaskSource.kling: 1}
+    # The peak average takes the first slow call in at once
+    assert slow == {TaskSource.fal: 1, TaskSource.kling: 9}
+
+
+def test_rate_limited_task_fails_over():
+    fal, kling, router = make_sources(0, 0)
+    fal.status = 429
+
+    routed = asyncio.run(submit(router, 1))
+
+    assert routed == {TaskSource.fal: 0, TaskSource.kling: 1}
+
+
+def test_server_error_is_not_failed_over():
+    fal, kling, router = make_sources(0, 0)
+    fal.status = 503
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(submit(router, 1))
+
+    assert kling.created == {}
@@ -0,0 +1,189 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from src.core.config import settings
+from src.integrations.infrastructure.external_api import scheduler as scheduler_module
+from src.integrations.infrastructure.external_api.mocked_source import MockedTaskSourceClient
+from src.integrations.infrastructure.external_api.scheduler import (
+    AdaptiveLimiter,
+    AdmissionScheduler,
+    AdmissionTimeoutError,
+    ScheduledTaskSourceClient,
+)
+from src.tasks.domain.dtos import TaskCreateFromTextDTO
+from src.tasks.domain.entities import TaskSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+class ThrottledSource(MockedTaskSourceClient):
+    """Rejects the first calls with 429"""
+
+    def __init__(self, throttled: int):
+        super().__init__(TaskSource.fal)
+        self.throttled = throttled
+        self.calls = 0
+
+    async def _create(self, kind, task_data):
+        self.calls += 1
+        self.status = 429 if self.calls <= self.throttled else None
+        return await super()._create(kind, task_data)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {"fal": 10.0})
+    monkeypatch.setattr(settings, "PROVIDER_CONCURRENCY_LIMITS", {"fal": 8})
+    monkeypatch.setattr(settings, "SCHEDULER_RATE_INCREASE", 0.05)
+    monkeypatch.setattr(settings, "SCHEDULER_MIN_RATE_FRACTION", 0.05)
+
+
+async def is_admitted(limiter: AdaptiveLimiter, timeout: float = 0.05) -> bool:
+    try:
+        await asyncio.wait_for(limiter.acquire(), timeout)
+    except TimeoutError:
+        return False
+    return True
+
+
+def test_throttling_halves_rate_and_concurrency(clock, limits):
+    limiter = AdaptiveLimiter("fal", 10.0, 8)
+
+    limiter.on_throttled(None)
+    assert (limiter.rate, limiter.concurrency) == (5.0, 4)
+    limiter.on_throttled(None)
+    assert (limiter.rate, limiter.concurrency) == (2.5, 2)
+
+
+def test_throttling_stops_at_the_minimum(clock, limits):
+    limiter = AdaptiveLimiter("fal", 10.0, 8)
+
+    for _ in range(10):
+        limiter.on_throttled(None)
+
+    assert (limiter.rate, limiter.concurrency) == (0.5, 1)
+
+
+def test_successes_regrow_the_limits_additively(clock, limits):
+    limiter = AdaptiveLimiter("fal", 10.0, 8)
+    limiter.on_throttled(None)
+
+    limiter.on_success()
+    assert limiter.rate == 5.5
+    # One more slot per window of successful calls
+    assert limiter.concurrency == 4
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.concurrency == 5
+
+    for _ in range(100):
+        limiter.on_success()
+    assert (limiter.rate, limiter.concurrency) == (10.0, 8)
+
+
+def test_tokens_refill_at_the_current_rate(clock, limits):
+    limiter = AdaptiveLimiter("fal", 2.0, None)
+
+    async def main():
+        assert await is_admitted(limiter)
+        assert not await is_admitted(limiter)
+        clock.now += 0.5
+        assert await is_admitted(limiter)
+
+    asyncio.run(main())
+
+
+def test_retry_after_pauses_admission(clock, limits):
+    limiter = AdaptiveLimiter("fal", None, 8)
+    limiter.on_throttled(30)
+
+    async def main():
+        assert not await is_admitted(limiter)
+        clock.now += 30
+        assert await is_admitted(limiter)
+
+    asyncio.run(main())
+
+
+def test_admission_times_out_after_max_wait(limits, monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {})
+    monkeypatch.setattr(settings, "PROVIDER_CONCURRENCY_LIMITS", {"fal": 1})
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_WAIT", 0.05)
+    admission = AdmissionScheduler()
+
+    async def main():
+        async with admission.admit("fal", None):
+            with pytest.raises(AdmissionTimeoutError):
+                async with admission.admit("fal", None):
+                    pass
+
+    asyncio.run(main())
+
+
+def test_cancelled_call_releases_its_slot(limits, monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {})
+    monkeypatch.setattr(settings, "PROVIDER_CONCURRENCY_LIMITS", {"fal": 1})
+    admission = AdmissionScheduler()
+    limiter = admission.get_limiters("fal", None)[0]
+
+    async def hold():
+        async with admission.admit("fal", None):
+            await asyncio.sleep(10)
+
+    async def main():
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        # Cancelling both the admitted call and one still queued leaks no slot
+        holder.cancel()
+        waiter.cancel()
+        await asyncio.gather(holder, waiter, return_exceptions=True)
+        assert await is_admitted(limiter)
+
+    asyncio.run(main())
+
+
+def test_throttled_call_is_retried_with_lower_limits(limits, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_THROTTLED_RETRIES", 3)
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {})
+    admission = AdmissionScheduler()
+    source = ThrottledSource(throttled=2)
+    client = ScheduledTaskSourceClient(source, admission)
+
+    task = asyncio.run(client.create_task_text2video(TaskCreateFromTextDTO(app_id="a", user_id="u", prompt="p")))
+
+    assert task.source == TaskSource.fal
+    assert source.calls == 3
+    # Halved twice, then one success within the smaller window
+    assert admission.get_limiters("fal", None)[0].concurrency == 2
+
+
+def test_call_throttled_past_the_retries_fails(limits, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_THROTTLED_RETRIES", 1)
+    monkeypatch.setattr(settings, "PROVIDER_RATE_LIMITS", {})
+    source = ThrottledSource(throttled=5)
+    client = ScheduledTaskSourceClient(source, AdmissionScheduler())
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(client.create_task_text2video(TaskCreateFromTextDTO(app_id="a", user_id="u", prompt="p")))
+
+    assert source.calls == 2
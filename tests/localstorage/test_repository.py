@@ -0,0 +1,51 @@
+import hashlib
+import os
+
+from src.localstorage.infrastructure.repository import LocalStorageRepository
+
+
+def make_repository(tmp_path) -> LocalStorageRepository:
+    repository = LocalStorageRepository()
+    repository.storage_path = tmp_path
+    return repository
+
+
+def test_blob_collected_while_linking_is_stored_again(tmp_path, monkeypatch):
+    repository = make_repository(tmp_path)
+    source = tmp_path / "upload"
+    source.write_bytes(b"video")
+    digest = hashlib.sha256(b"video").hexdigest()
+
+    replace_link = LocalStorageRepository._replace_link
+    attempts = []
+
+    def collect_then_link(blob_path, task_path):
+        attempts.append(blob_path)
+        if len(attempts) == 1:
+            # The orphan sweep deletes the blob before the task links to it
+            blob_path.unlink()
+        replace_link(blob_path, task_path)
+
+    monkeypatch.setattr(repository, "_replace_link", collect_then_link)
+
+    assert repository.link_blob(source, digest, "1")
+
+    assert len(attempts) == 2
+    assert repository.get_file_path("1").read_bytes() == b"video"
+    assert repository.get_blob_path(digest).stat().st_nlink == 3
+
+
+def test_legacy_file_moves_to_the_sharded_layout(tmp_path):
+    repository = make_repository(tmp_path)
+    legacy_path = repository.get_legacy_path("2")
+    legacy_path.write_bytes(b"video")
+    os.utime(legacy_path, (1000, 1000))
+
+    assert repository.migrate_legacy_files() == 1
+
+    assert not legacy_path.exists()
+    path = repository.get_file_path("2")
+    assert path == repository.get_task_path("2")
+    assert path.read_bytes() == b"video"
+    assert path.stat().st_mtime == 1000
+    assert repository.migrate_legacy_files() == 0
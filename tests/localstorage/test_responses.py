@@ -0,0 +1,98 @@
+import os
+from email.utils import formatdate
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.localstorage.presentation.responses import ResultFileResponse
+
+CONTENT = b"0123456789"
+MTIME = 1_700_000_000
+
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    path = tmp_path / "1"
+    path.write_bytes(CONTENT)
+    os.utime(path, (MTIME, MTIME))
+
+    app = FastAPI()
+
+    @app.get("/result")
+    async def result():
+        return ResultFileResponse(path=path, media_type="video/mp4")
+
+    return TestClient(app)
+
+
+def test_full_result_has_validators(client):
+    response = client.get("/result")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "etag" in response.headers
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_range_gets_partial_content(client):
+    response = client.get("/result", headers={"Range": "bytes=2-5"})
+
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+    assert response.headers["content-length"] == "4"
+
+
+def test_open_ended_range_goes_to_the_end(client):
+    response = client.get("/result", headers={"Range": "bytes=7-"})
+
+    assert response.status_code == 206
+    assert response.content == b"789"
+    assert response.headers["content-range"] == "bytes 7-9/10"
+
+
+def test_unsatisfiable_range_is_rejected(client):
+    response = client.get("/result", headers={"Range": "bytes=20-30"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+
+def test_multiple_ranges_are_rejected(client):
+    response = client.get("/result", headers={"Range": "bytes=0-1,4-5"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+
+def test_matching_etag_is_not_modified(client):
+    etag = client.get("/result").headers["etag"]
+
+    response = client.get("/result", headers={"If-None-Match": f'"other", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_other_etag_gets_the_result(client):
+    response = client.get("/result", headers={"If-None-Match": '"other"'})
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_unchanged_since_is_not_modified(client):
+    response = client.get("/result", headers={"If-Modified-Since": formatdate(MTIME, usegmt=True)})
+
+    assert response.status_code == 304
+    assert "last-modified" in response.headers
+
+
+def test_changed_since_gets_the_result(client):
+    response = client.get("/result", headers={"If-Modified-Since": formatdate(MTIME - 60, usegmt=True)})
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
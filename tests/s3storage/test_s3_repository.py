@@ -0,0 +1,108 @@
+import asyncio
+
+import aiohttp
+import boto3
+import pytest
+from moto.server import ThreadedMotoServer
+
+from src.core.config import settings
+from src.integrations.infrastructure.http.aiohttp_client import CdnHttpClient, close_http_pools
+from src.localstorage.domain.exceptions import FileNotFoundError
+from src.s3storage.infrastructure.repository import S3StorageRepository
+
+BUCKET = "results"
+
+
+@pytest.fixture(scope="module")
+def endpoint_url():
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    url = f"http://{host}:{port}"
+    boto3.client(
+        "s3", endpoint_url=url, region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+    ).create_bucket(Bucket=BUCKET)
+    yield url
+    server.stop()
+
+
+@pytest.fixture
+def storage(endpoint_url, monkeypatch) -> S3StorageRepository:
+    monkeypatch.setattr(settings, "S3_ACCESS_KEY_ID", "test")
+    monkeypatch.setattr(settings, "S3_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr(settings, "HTTP_RETRY_BASE_DELAY", 0.01)
+    return S3StorageRepository(CdnHttpClient, endpoint_url, None, BUCKET, "results/")
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_http_pools()
+
+    return asyncio.run(main())
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def read(storage: S3StorageRepository, filename: str) -> bytes:
+    return b"".join([chunk async for chunk in storage.read_file_stream(filename)])
+
+
+def test_small_result_round_trip(storage):
+    async def main():
+        await storage.put_file_stream("1", chunked(b"video" * 1000, 1024))
+        return await read(storage, "1")
+
+    assert run(main()) == b"video" * 1000
+
+
+def test_multipart_result_round_trip(storage, monkeypatch):
+    monkeypatch.setattr(settings, "S3_PART_SIZE", 5 * 1024 * 1024)
+    data = bytes(range(256)) * (6 * 4096)
+
+    async def main():
+        await storage.put_file_stream("2", chunked(data, 1024 * 1024))
+        return await read(storage, "2")
+
+    assert run(main()) == data
+
+
+def test_download_url_serves_the_result(storage):
+    async def main():
+        await storage.put_file_stream("3", chunked(b"video", 1024))
+        url = await storage.get_download_url("3")
+        async with aiohttp.ClientSession() as session, session.get(url) as response:
+            return response.status, await response.read()
+
+    assert run(main()) == (200, b"video")
+
+
+def test_download_url_of_a_missing_result_is_not_found(storage):
+    with pytest.raises(FileNotFoundError):
+        run(storage.get_download_url("missing"))
+
+
+def test_transient_error_is_retried(storage, monkeypatch):
+    calls = []
+
+    class FlakyClient(CdnHttpClient):
+        @classmethod
+        async def put(cls, url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                raise asyncio.TimeoutError
+            return await super().put(url, **kwargs)
+
+    storage.client = FlakyClient
+
+    async def main():
+        await storage.put_file_stream("4", chunked(b"video", 1024))
+        return await read(storage, "4")
+
+    assert run(main()) == b"video"
+    assert len(calls) == 2
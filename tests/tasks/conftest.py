@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core.config import settings
+
+
+@pytest.fixture
+def session_factory():
+    """Sessions on the migrated database at DATABASE_URI, the test is skipped without one"""
+    engine = create_async_engine(settings.DATABASE_URI, poolclass=NullPool)
+
+    async def connect():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    try:
+        asyncio.run(connect())
+    except Exception as e:
+        pytest.skip(f"No database at DATABASE_URI: {e!r}")
+    return async_sessionmaker(engine, expire_on_commit=False)
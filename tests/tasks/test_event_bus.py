@@ -0,0 +1,76 @@
+import asyncio
+
+import asyncpg
+import pytest
+
+from src.core.config import settings
+from src.tasks.infrastructure import event_bus as event_bus_module
+from src.tasks.infrastructure.event_bus import PGTaskEventBus
+from src.tasks.infrastructure.events import task_event_hub
+
+
+class FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.broken = False
+
+    def add_termination_listener(self, callback) -> None:
+        pass
+
+    async def add_listener(self, channel: str, callback) -> None:
+        self.listeners[channel] = callback
+
+    async def execute(self, query: str, timeout: float | None = None) -> None:
+        if self.broken:
+            raise asyncpg.InterfaceError("cannot call Connection.execute(): connection has been released")
+
+    def terminate(self) -> None:
+        self.listeners.clear()
+
+    def notify(self, channel: str, payload: str) -> None:
+        self.listeners[channel](self, 1, channel, payload)
+
+
+@pytest.fixture
+def connections(monkeypatch) -> list[FakeConnection]:
+    connections = []
+
+    async def connect(dsn: str) -> FakeConnection:
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(event_bus_module.asyncpg, "connect", connect)
+    monkeypatch.setattr(event_bus_module, "_MIN_RECONNECT_DELAY", 0.01)
+    monkeypatch.setattr(settings, "TASK_EVENT_BUS_PING_INTERVAL", 0.01)
+    return connections
+
+
+async def wait_listening(connections: list[FakeConnection], count: int) -> FakeConnection:
+    while len(connections) < count or "tasks" not in connections[-1].listeners:
+        await asyncio.sleep(0.01)
+    return connections[-1]
+
+
+def test_notifications_resume_after_the_connection_breaks(connections):
+    bus = PGTaskEventBus("postgresql://test", "tasks")
+
+    async def main():
+        with task_event_hub.subscribe(7) as subscription:
+            bus.start()
+            try:
+                first = await asyncio.wait_for(wait_listening(connections, 1), 1)
+                await subscription.wait(0.01)
+                first.notify("tasks", "7")
+                assert await subscription.wait(1)
+
+                first.broken = True
+                second = await asyncio.wait_for(wait_listening(connections, 2), 1)
+                # The reconnect wakes everyone, changes may have been missed meanwhile
+                assert await subscription.wait(0.01)
+                assert not await subscription.wait(0.05)
+                second.notify("tasks", "7")
+                assert await subscription.wait(1)
+            finally:
+                await bus.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from src.tasks.application.use_cases.task_status import get_cached_task
+from src.tasks.domain.entities import Task, TaskCreate, TaskStatus, TaskUpdate
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+from src.tasks.infrastructure.cache import task_read_cache
+from src.tasks.infrastructure.db.orm import TaskDB
+from src.tasks.infrastructure.db.unit_of_work import PGTaskUnitOfWork
+from src.tasks.presentation.api import tasks_router
+from src.tasks.presentation.dependencies import get_task_read_uow
+
+
+class FakeTaskRepository:
+    def __init__(self, task: Task):
+        self.task = task
+        self.reads = 0
+
+    async def get_by_pk(self, pk: int) -> Task:
+        self.reads += 1
+        if pk != self.task.id:
+            raise HTTPException(404)
+        return self.task.model_copy()
+
+
+class FakeUnitOfWork(ITaskUnitOfWork):
+    def __init__(self, tasks: FakeTaskRepository):
+        self.tasks = tasks
+
+    async def _commit(self):
+        pass
+
+    async def _rollback(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    task_read_cache.clear()
+    yield task_read_cache
+    task_read_cache.clear()
+
+
+@pytest.fixture
+def tasks() -> FakeTaskRepository:
+    return FakeTaskRepository(Task(id=1, status=TaskStatus.submitted, user_id="user", app_id="app"))
+
+
+@pytest.fixture
+def client(tasks) -> TestClient:
+    app = FastAPI()
+    app.include_router(tasks_router)
+    app.dependency_overrides[get_task_read_uow] = lambda: FakeUnitOfWork(tasks)
+    return TestClient(app)
+
+
+def test_matching_etag_gets_not_modified_from_the_cache(client, tasks):
+    response = client.get("/generation/1")
+    assert response.status_code == 200
+    assert response.json()["data"]["status"] == 1
+    etag = response.headers["etag"]
+
+    revalidated = client.get("/generation/1", headers={"If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert tasks.reads == 1
+
+
+def test_changed_task_gets_a_new_etag(client, tasks, cache):
+    etag = client.get("/generation/1").headers["etag"]
+
+    tasks.task = tasks.task.model_copy(update={"status": TaskStatus.finished, "result": "https://example.com/r"})
+    # What the unit of work does for every task its commit changed
+    cache.invalidate([1])
+    response = client.get("/generation/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["status"] == 3
+    assert response.headers["etag"] != etag
+
+
+def test_lookup_overtaken_by_a_change_is_not_cached(tasks, cache):
+    async def main():
+        uow = FakeUnitOfWork(tasks)
+        lookup = asyncio.create_task(get_cached_task(1, uow))
+        await asyncio.sleep(0)
+        # Committed while the lookup may already have read the old row
+        cache.invalidate([1])
+        tasks.task = tasks.task.model_copy(update={"status": TaskStatus.finished})
+        await lookup
+        return await get_cached_task(1, uow)
+
+    assert asyncio.run(main()).dto.data.status == 3
+    assert tasks.reads == 2
+
+
+def test_committed_transition_invalidates_the_cached_task(session_factory):
+    async def main():
+        uow = PGTaskUnitOfWork(session_factory)
+        async with uow:
+            task = await uow.tasks.create(TaskCreate(user_id="user", app_id="app"))
+            await uow.tasks.update(task.id, TaskUpdate(status=TaskStatus.submitted))
+            await uow.commit()
+        try:
+            before = await get_cached_task(task.id, uow)
+            async with uow:
+                await uow.tasks.transition(task.id, TaskUpdate(status=TaskStatus.finished), TaskStatus.submitted)
+                await uow.commit()
+            return before, await get_cached_task(task.id, uow)
+        finally:
+            async with uow:
+                await uow.session.execute(delete(TaskDB).filter_by(id=task.id))
+                await uow.commit()
+
+    before, after = asyncio.run(main())
+
+    assert before.dto.data.status == 1
+    assert after.dto.data.status == 3
+    assert after.etag != before.etag
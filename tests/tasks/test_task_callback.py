@@ -0,0 +1,59 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from src.tasks.application.use_cases.task_callback import enqueue_task_callback
+from src.tasks.domain.entities import TaskCallback, TaskCallbackCreate
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+
+
+class FakeCallbackRepository:
+    """Keeps one callback per task and provider status, like the unique constraint"""
+
+    def __init__(self):
+        self.callbacks: dict[tuple[int, str], TaskCallback] = {}
+
+    async def create(self, callback: TaskCallbackCreate) -> TaskCallback | None:
+        key = (callback.task_id, callback.provider_status)
+        if key in self.callbacks:
+            return None
+        self.callbacks[key] = TaskCallback(id=len(self.callbacks) + 1, attempts=0, **callback.model_dump())
+        return self.callbacks[key]
+
+
+class FakeUnitOfWork(ITaskUnitOfWork):
+    def __init__(self):
+        self.callbacks = FakeCallbackRepository()
+        self.commits = 0
+
+    async def _commit(self):
+        self.commits += 1
+
+    async def _rollback(self):
+        pass
+
+
+def redelivered() -> float:
+    return REGISTRY.get_sample_value("task_callbacks_duplicate_total", {"reason": "redelivered"}) or 0
+
+
+def test_redelivered_status_is_dropped():
+    uow = FakeUnitOfWork()
+    before = redelivered()
+
+    asyncio.run(enqueue_task_callback(1, {"status": "OK", "request_id": "a"}, uow))
+    asyncio.run(enqueue_task_callback(1, {"status": "OK", "request_id": "a"}, uow))
+
+    assert list(uow.callbacks.callbacks) == [(1, "OK")]
+    assert redelivered() == before + 1
+
+
+def test_new_status_of_the_same_task_is_queued():
+    uow = FakeUnitOfWork()
+    before = redelivered()
+
+    asyncio.run(enqueue_task_callback(1, {"task_status": "processing"}, uow))
+    asyncio.run(enqueue_task_callback(1, {"task_status": "succeed"}, uow))
+
+    assert list(uow.callbacks.callbacks) == [(1, "processing"), (1, "succeed")]
+    assert redelivered() == before
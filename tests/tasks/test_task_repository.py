@@ -0,0 +1,29 @@
+import asyncio
+
+from src.tasks.domain.entities import TaskCreate, TaskStatus, TaskUpdate
+from src.tasks.infrastructure.db.unit_of_work import PGTaskUnitOfWork
+
+
+def test_buffered_update_skips_tasks_no_longer_submitted(session_factory):
+    async def main():
+        # Never committed, the unit of work rolls back on exit
+        async with PGTaskUnitOfWork(session_factory) as uow:
+            pending = await uow.tasks.create(TaskCreate(user_id="user", app_id="app"))
+            done = await uow.tasks.create(TaskCreate(user_id="user", app_id="app"))
+            await uow.tasks.update(pending.id, TaskUpdate(status=TaskStatus.submitted))
+            await uow.tasks.update(done.id, TaskUpdate(status=TaskStatus.finished, result="stored"))
+
+            changed = await uow.tasks.transition_many(
+                {
+                    pending.id: TaskUpdate(status=TaskStatus.finished, result="new"),
+                    done.id: TaskUpdate(status=TaskStatus.failed, error="late"),
+                },
+                TaskStatus.submitted,
+            )
+            return pending.id, changed, await uow.tasks.get_by_pk(done.id)
+
+    pending_id, changed, done = asyncio.run(main())
+
+    assert [(task.id, task.status, task.result) for task in changed] == [(pending_id, TaskStatus.finished, "new")]
+    assert changed[0].finished_at is not None
+    assert (done.status, done.result, done.error) == (TaskStatus.finished, "stored", None)
@@ -0,0 +1,111 @@
+import asyncio
+import datetime as dt
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.tasks.application.use_cases.task_retention import sweep_task_results
+from src.tasks.domain.entities import StoredFile, Task, TaskStatus
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+
+HOUR = 60 * 60
+
+
+class FakeStorage:
+    def __init__(self, files: list[StoredFile]):
+        self.files = files
+        self.deleted: list[str] = []
+
+    async def compact_temp(self) -> int:
+        return 0
+
+    async def migrate_legacy_files(self) -> int:
+        return 0
+
+    async def compact_shard(self, shard: str) -> int:
+        return sum(file.size for file in self.files)
+
+    async def scan_shard(self, shard: str) -> list[StoredFile]:
+        return self.files
+
+    async def delete_file(self, filename: str) -> None:
+        self.deleted.append(filename)
+
+
+class FakeTaskRepository:
+    def __init__(self, tasks: list[Task]):
+        self.tasks = {task.id: task for task in tasks}
+        self.expired: list[int] = []
+
+    async def get_many(self, pks: list[int]) -> list[Task]:
+        return [self.tasks[pk] for pk in pks if pk in self.tasks]
+
+    async def mark_expired(self, pks: list[int]) -> None:
+        self.expired.extend(pks)
+
+
+class FakeUnitOfWork(ITaskUnitOfWork):
+    def __init__(self, tasks: list[Task]):
+        self.tasks = FakeTaskRepository(tasks)
+
+    async def _commit(self):
+        pass
+
+    async def _rollback(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def retention(monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_DEFAULT_TTL", 24 * HOUR)
+    monkeypatch.setattr(settings, "RETENTION_MAX_TOTAL_BYTES", None)
+
+
+def stored_file(task_id: int, modified_ago: float, changed_ago: float) -> StoredFile:
+    now = time.time()
+    return StoredFile(
+        filename=str(task_id),
+        size=100,
+        links=3,
+        accessed_at=now,
+        modified_at=now - modified_ago,
+        changed_at=now - changed_ago,
+    )
+
+
+def finished_task(task_id: int, finished_ago: float) -> Task:
+    now = dt.datetime.now(dt.timezone.utc)
+    return Task(
+        id=task_id,
+        status=TaskStatus.finished,
+        user_id="user",
+        app_id="app",
+        finished_at=now - dt.timedelta(seconds=finished_ago),
+        # Touched since, e.g. by a reconcile, which must not postpone expiry
+        updated_at=now,
+    )
+
+
+def sweep(files: list[StoredFile], tasks: list[Task]) -> list[int]:
+    return asyncio.run(sweep_task_results("00", {}, FakeUnitOfWork(tasks), FakeStorage(files)))
+
+
+def test_results_age_from_the_task_finish():
+    files = [
+        # Same content as a result stored long ago, the shared blob's mtime is old
+        stored_file(1, modified_ago=30 * 24 * HOUR, changed_ago=HOUR),
+        stored_file(2, modified_ago=HOUR, changed_ago=HOUR),
+    ]
+    tasks = [finished_task(1, HOUR), finished_task(2, 25 * HOUR)]
+
+    assert sweep(files, tasks) == [2]
+
+
+def test_result_without_a_task_is_kept_for_the_grace_period():
+    files = [
+        stored_file(1, modified_ago=30 * 24 * HOUR, changed_ago=60),
+        stored_file(2, modified_ago=30 * 24 * HOUR, changed_ago=settings.LOCAL_STORAGE_ORPHAN_GRACE + 60),
+    ]
+
+    assert sweep(files, []) == [2]
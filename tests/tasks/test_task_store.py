@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from src.core.config import settings
+from src.tasks.application.use_cases.task_store import TaskResultBuffer
+from src.tasks.domain.entities import Task, TaskStatus, TaskUpdate
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+
+
+class FakeTaskRepository:
+    """Applies updates only to tasks still in from_status, like the SQL guard"""
+
+    def __init__(self, tasks: list[Task]):
+        self.tasks = {task.id: task for task in tasks}
+        self.statements: list[dict[int, TaskUpdate]] = []
+
+    async def transition_many(self, tasks: dict[int, TaskUpdate], from_status: TaskStatus) -> list[Task]:
+        self.statements.append(dict(tasks))
+        changed = []
+        for pk, update in tasks.items():
+            task = self.tasks.get(pk)
+            if task is not None and task.status == from_status:
+                task = self.tasks[pk] = task.model_copy(update=update.model_dump(exclude_none=True))
+                changed.append(task)
+        return changed
+
+
+class FakeCallbackRepository:
+    def __init__(self):
+        self.processed: list[int] = []
+
+    async def mark_processed(self, pks: list[int]) -> None:
+        self.processed.extend(pks)
+
+
+class FakeWebhookRepository:
+    async def create_many(self, deliveries) -> None:
+        pass
+
+
+class FakeUnitOfWork(ITaskUnitOfWork):
+    def __init__(self, tasks: FakeTaskRepository, callbacks: FakeCallbackRepository):
+        self.tasks = tasks
+        self.callbacks = callbacks
+        self.webhooks = FakeWebhookRepository()
+        self.commits = 0
+
+    async def _commit(self):
+        self.commits += 1
+
+    async def _rollback(self):
+        pass
+
+
+class Store:
+    def __init__(self, *statuses: TaskStatus):
+        self.tasks = FakeTaskRepository([
+            Task(id=pk, status=status, user_id="user", app_id="app") for pk, status in enumerate(statuses, 1)
+        ])
+        self.callbacks = FakeCallbackRepository()
+        self.buffer = TaskResultBuffer(lambda: FakeUnitOfWork(self.tasks, self.callbacks))
+
+
+@pytest.fixture(autouse=True)
+def write_behind(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_WRITE_BEHIND_WINDOW", 10.0)
+    monkeypatch.setattr(settings, "TASK_WRITE_BEHIND_MAX_BATCH", 3)
+    monkeypatch.setattr(settings, "TASK_WRITE_BEHIND_DURABILITY", "buffer")
+
+
+def finished(result: str) -> TaskUpdate:
+    return TaskUpdate(status=TaskStatus.finished, result=result)
+
+
+async def run_buffer(store: Store, writes, wait: float) -> None:
+    runner = asyncio.create_task(store.buffer.run())
+    for task_id, callback_id, update in writes:
+        await store.buffer.write(task_id, callback_id, update)
+    await asyncio.sleep(wait)
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+
+
+def test_full_batch_is_flushed_before_the_window_ends():
+    store = Store(TaskStatus.submitted, TaskStatus.submitted, TaskStatus.submitted)
+
+    async def main():
+        runner = asyncio.create_task(store.buffer.run())
+        for pk in (1, 2, 3):
+            await store.buffer.write(pk, pk, finished(str(pk)))
+        await asyncio.sleep(0.05)
+        processed = list(store.callbacks.processed)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return processed
+
+    assert asyncio.run(main()) == [1, 2, 3]
+    assert len(store.tasks.statements) == 1
+
+
+def test_partial_batch_is_flushed_after_the_window(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_WRITE_BEHIND_WINDOW", 0.02)
+    store = Store(TaskStatus.submitted)
+
+    async def main():
+        runner = asyncio.create_task(store.buffer.run())
+        await store.buffer.write(1, 1, finished("1"))
+        await asyncio.sleep(0.1)
+        processed = list(store.callbacks.processed)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return processed
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_pending_results_are_flushed_on_shutdown():
+    store = Store(TaskStatus.submitted, TaskStatus.submitted)
+
+    asyncio.run(run_buffer(store, [(1, 1, finished("1")), (2, 2, finished("2")), (2, 3, None)], 0.01))
+
+    assert store.callbacks.processed == [1, 2, 3]
+    assert store.tasks.tasks[1].status == TaskStatus.finished
+    assert store.tasks.tasks[2].status == TaskStatus.finished
+
+
+def test_commit_durability_returns_once_written(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_WRITE_BEHIND_DURABILITY", "commit")
+    monkeypatch.setattr(settings, "TASK_WRITE_BEHIND_WINDOW", 0.02)
+    store = Store(TaskStatus.submitted)
+
+    async def main():
+        runner = asyncio.create_task(store.buffer.run())
+        await store.buffer.write(1, 1, finished("1"))
+        processed = list(store.callbacks.processed)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return processed
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_results_for_one_task_update_it_once():
+    store = Store(TaskStatus.submitted, TaskStatus.submitted)
+    writes = [(1, 1, finished("first")), (1, 2, finished("second")), (2, 3, finished("other"))]
+
+    asyncio.run(run_buffer(store, writes, 0.01))
+
+    # The later result goes to the next statement, by then the task isn't submitted anymore
+    assert [list(statement) for statement in store.tasks.statements] == [[1, 2], [1]]
+    assert store.tasks.tasks[1].result == "first"
+    assert store.callbacks.processed == [1, 3, 2]
+
+
+def test_result_for_a_finished_task_is_dropped():
+    store = Store(TaskStatus.finished)
+    store.tasks.tasks[1] = store.tasks.tasks[1].model_copy(update={"result": "stored"})
+
+    asyncio.run(run_buffer(store, [(1, 1, TaskUpdate(status=TaskStatus.failed, error="late"))], 0.01))
+
+    assert store.tasks.tasks[1].status == TaskStatus.finished
+    assert store.tasks.tasks[1].result == "stored"
+    assert store.callbacks.processed == [1]
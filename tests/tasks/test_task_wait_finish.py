@@ -0,0 +1,65 @@
+import asyncio
+
+from src.tasks.application.use_cases.task_wait_finish import wait_task_change
+from src.tasks.domain.entities import Task, TaskStatus
+from src.tasks.domain.interfaces.task_uow import ITaskUnitOfWork
+from src.tasks.infrastructure.cache import task_read_cache
+
+
+class SlowTaskRepository:
+    """The first read stalls, and a commit changes the task while it does"""
+
+    def __init__(self):
+        self.reads = 0
+
+    async def get_by_pk(self, pk: int) -> Task:
+        self.reads += 1
+        if self.reads == 1:
+            task_read_cache.invalidate([pk])
+            await asyncio.sleep(0.2)
+        return Task(id=pk, status=TaskStatus.finished, user_id="user", app_id="app")
+
+
+class FakeUnitOfWork(ITaskUnitOfWork):
+    """Refuses to be entered while open, like the database one"""
+
+    def __init__(self, tasks: SlowTaskRepository):
+        self.tasks = tasks
+        self.is_open = False
+
+    def fork(self) -> ITaskUnitOfWork:
+        return FakeUnitOfWork(self.tasks)
+
+    async def __aenter__(self):
+        if self.is_open:
+            raise RuntimeError("Unit of work is already open")
+        self.is_open = True
+        return self
+
+    async def __aexit__(self, *excinfo):
+        self.is_open = False
+
+    async def _commit(self):
+        pass
+
+    async def _rollback(self):
+        pass
+
+
+def test_wait_timing_out_during_a_slow_load_reads_the_task_again():
+    tasks = SlowTaskRepository()
+    task_read_cache.clear()
+
+    async def wait():
+        task = await wait_task_change(1, FakeUnitOfWork(tasks), None, 0.05)
+        # Lets the abandoned lookup finish
+        await asyncio.sleep(0.3)
+        return task
+
+    try:
+        task = asyncio.run(wait())
+    finally:
+        task_read_cache.clear()
+
+    assert task.terminal
+    assert tasks.reads == 2